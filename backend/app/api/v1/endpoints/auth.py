@@ -107,7 +107,7 @@ async def forgot_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Request password reset - sends email if configured"""
-    from app.core.email import send_password_reset_email
+    from app.core.email import queue_password_reset_email
 
     email = email_data.get("email")
     if not email:
@@ -136,12 +136,14 @@ async def forgot_password(
         expires_delta=timedelta(hours=1)
     )
 
-    # Try to send email
-    email_sent = await send_password_reset_email(
+    # Queue email for the outbox worker
+    email_sent = queue_password_reset_email(
+        db,
         to_email=email,
         reset_token=reset_token,
         user_name=profile.full_name if profile else None
     )
+    await db.commit()
 
     if email_sent:
         return {
@@ -9,6 +9,7 @@ from datetime import date
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
 from app.core.redis_client import get_cache, set_cache, delete_cache_pattern
+from app.core.unread_counts import get_unread_count
 from app.models.user import Profile
 from app.models.property import Property
 from app.models.lease import Lease
@@ -43,6 +44,10 @@ async def get_dashboard(
     # Try cache first
     cached_data = await get_cache(cache_key)
     if cached_data:
+        # The badge count is live even when the rest of the dashboard is cached
+        unread = await get_unread_count(current_user.id)
+        if unread is not None:
+            cached_data["stats"]["unread_notifications"] = unread
         return DashboardData(**cached_data)
     
     user_id = current_user.id
@@ -105,7 +110,7 @@ async def get_dashboard(
             float(p.amount) for p in payments 
             if p.payment_date.month == date.today().month and p.status == "paid"
         ),
-        "unread_notifications": sum(1 for n in notifications if not n.read)
+        "unread_notifications": await get_unread_count(user_id, db)
     }
     
     # Build response
@@ -1,26 +1,33 @@
 """
 Documents endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, BackgroundTasks
+from fastapi.responses import Response, FileResponse, StreamingResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, exists
+from typing import List, Optional, Tuple
 from uuid import UUID
 import os
-from pathlib import Path
 from app.core.database import get_db
+from app.core.config import settings
 from app.core.auth import get_current_active_user
 from app.core.redis_client import delete_cache_pattern
-from app.core.config import settings
+from app.core.blob_store import (
+    spool_upload, add_reference, release_reference, delete_released_blob, discard_spooled, get_storage_stats
+)
+from app.core.storage import get_storage, LocalStorage, content_disposition
+from app.core.archive import ArchiveEntry, stream_zip, unique_name
+from app.core.images import (
+    DERIVATIVE_SIZES, derivative_key, failure_key, generate_derivatives, delete_derivatives, is_image
+)
 from app.models.user import Profile
 from app.models.document import Document
 from app.schemas.document import Document as DocumentSchema, DocumentCreate
 
 router = APIRouter()
 
-# Create uploads directory
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Documents uploaded before the blob store keep paths relative to the working directory
+LEGACY_STORAGE = LocalStorage(os.curdir)
 
 
 @router.get("", response_model=List[DocumentSchema])
@@ -56,8 +63,96 @@ async def get_documents(
     return [DocumentSchema.model_validate(d) for d in result.scalars().all()]
 
 
+@router.get("/storage-stats")
+async def get_document_storage_stats(
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Deduplication ratio and reclaimed bytes for the current user's uploads"""
+    return await get_storage_stats(db, user_id=current_user.id)
+
+
+@router.get("/export")
+async def export_documents(
+    property_id: UUID = None,
+    lease_id: UUID = None,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download every document of a property or lease as a streamed ZIP archive"""
+    if not property_id and not lease_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="property_id or lease_id is required"
+        )
+    
+    # Verify access to the whole scope up front
+    if property_id:
+        from app.models.property import Property
+        if current_user.role == "landlord":
+            allowed = await db.scalar(select(exists().where(
+                Property.id == property_id,
+                Property.landlord_id == current_user.id
+            )))
+        else:
+            from app.models.lease import Lease
+            allowed = await db.scalar(select(exists().where(
+                Lease.property_id == property_id,
+                Lease.tenant_id == current_user.id
+            )))
+        if not allowed:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found or access denied")
+    if lease_id:
+        from app.models.lease import Lease
+        owner = Lease.landlord_id if current_user.role == "landlord" else Lease.tenant_id
+        allowed = await db.scalar(select(exists().where(Lease.id == lease_id, owner == current_user.id)))
+        if not allowed:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lease not found or access denied")
+    
+    # Served by the property_id / lease_id indexes; only the columns we need
+    query = select(
+        Document.file_name, Document.file_path, Document.content_hash,
+        Document.file_size, Document.mime_type, Document.document_type, Document.created_at
+    ).order_by(Document.document_type, Document.created_at)
+    if property_id:
+        query = query.where(Document.property_id == property_id)
+    if lease_id:
+        query = query.where(Document.lease_id == lease_id)
+    if current_user.role != "landlord":
+        # Same scope as get_documents: tenants only see documents of their own leases
+        from app.models.lease import Lease
+        query = query.where(Document.lease_id.in_(
+            select(Lease.id).where(Lease.tenant_id == current_user.id)
+        ))
+    rows = (await db.execute(query)).all()
+    
+    storage = get_storage()
+    seen = set()
+    entries = [
+        ArchiveEntry(
+            name=unique_name(f"{row.document_type or 'other'}/{os.path.basename(row.file_name)}", seen),
+            storage=storage if row.content_hash else LEGACY_STORAGE,
+            key=row.file_path,
+            size=row.file_size,
+            mime_type=row.mime_type,
+            modified=row.created_at,
+        )
+        for row in rows
+    ]
+    
+    archive_name = f"documents-{property_id or lease_id}.zip"
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": content_disposition(archive_name, inline=False),
+        }
+    )
+
+
 @router.post("", response_model=DocumentSchema, status_code=status.HTTP_201_CREATED)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     property_id: UUID = None,
     lease_id: UUID = None,
@@ -66,20 +161,22 @@ async def upload_document(
     current_user: Profile = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload a document"""
-    # Save file
-    file_path = UPLOAD_DIR / f"{current_user.id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    """Upload a document (content is deduplicated by SHA-256)"""
+    spooled = await spool_upload(file.file)
+    try:
+        file_path = await add_reference(db, spooled, file.content_type)
+    except Exception:
+        discard_spooled(spooled)
+        raise
     
     new_document = Document(
         property_id=property_id,
         lease_id=lease_id,
         uploaded_by=current_user.id,
         file_name=file.filename,
-        file_path=str(file_path),
-        file_size=len(content),
+        file_path=file_path,
+        content_hash=spooled.sha256,
+        file_size=spooled.size,
         mime_type=file.content_type,
         document_type=document_type,
         description=description
@@ -88,6 +185,10 @@ async def upload_document(
     await db.commit()
     await db.refresh(new_document)
     
+    # Thumbnails and previews are rendered after the response is sent
+    if is_image(file.content_type, document_type):
+        background_tasks.add_task(generate_derivatives, spooled.sha256, file_path)
+    
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
     
@@ -110,13 +211,183 @@ async def delete_document(
     if document.uploaded_by != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
-    # Delete file
-    if os.path.exists(document.file_path):
-        os.remove(document.file_path)
-    
     await db.delete(document)
+    
+    # Shared blobs only go with their last reference
+    released = None
+    if document.content_hash:
+        released = await release_reference(db, document.content_hash)
+    
     await db.commit()
     
+    # Files are removed only once the rows are gone for good
+    if released:
+        if await delete_released_blob(released) and is_image(document.mime_type, document.document_type):
+            await delete_derivatives(document.content_hash)
+    elif not document.content_hash and os.path.exists(document.file_path):
+        os.remove(document.file_path)
+    
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
 
+
+
+async def _get_accessible_document(db: AsyncSession, document_id: UUID, user: Profile) -> Document:
+    """Load a document the user may read (uploader, property landlord or lease tenant)"""
+    result = await db.execute(select(Document).where(Document.id == document_id))
+    document = result.scalar_one_or_none()
+    
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    
+    if document.uploaded_by == user.id:
+        return document
+    
+    if user.role == "landlord" and document.property_id:
+        from app.models.property import Property
+        allowed = await db.scalar(select(exists().where(
+            Property.id == document.property_id,
+            Property.landlord_id == user.id
+        )))
+    elif user.role == "tenant" and document.lease_id:
+        from app.models.lease import Lease
+        allowed = await db.scalar(select(exists().where(
+            Lease.id == document.lease_id,
+            Lease.tenant_id == user.id
+        )))
+    else:
+        allowed = False
+    
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return document
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into inclusive (start, end)
+    Multi-range requests are answered with the full body, as RFC 9110 allows
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    
+    start_str, _, end_str = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(end_str), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate If-None-Match against a strong ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+@router.get("/{document_id}/content")
+async def download_document(
+    document_id: UUID,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    size: Optional[str] = None,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download document content, or a resized derivative with size=thumb|preview
+    Supports Range and If-None-Match; S3 downloads may redirect to a presigned URL
+    """
+    if size is not None and size not in DERIVATIVE_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"size must be one of: {', '.join(DERIVATIVE_SIZES)}"
+        )
+    
+    document = await _get_accessible_document(db, document_id, current_user)
+    
+    storage = get_storage() if document.content_hash else LEGACY_STORAGE
+    file_key = document.file_path
+    file_name = document.file_name
+    media_type = document.mime_type or "application/octet-stream"
+    etag = f'"{document.content_hash}"' if document.content_hash else None
+    
+    if size and document.content_hash and is_image(document.mime_type, document.document_type):
+        derivative = derivative_key(document.content_hash, size)
+        if await storage.exists(derivative):
+            file_key = derivative
+            file_name = f"{os.path.splitext(document.file_name)[0]}_{size}{os.path.splitext(derivative)[1]}"
+            media_type = DERIVATIVE_SIZES[size][2]
+            etag = f'"{document.content_hash}-{size}"'
+        elif not await storage.exists(failure_key(document.content_hash)):
+            # Not rendered yet - serve the original meanwhile
+            background_tasks.add_task(generate_derivatives, document.content_hash, document.file_path)
+    
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(file_name),
+        "Cache-Control": "private, max-age=3600",
+    }
+    if etag:
+        # Content-addressed, so the hash is a strong validator
+        headers["ETag"] = etag
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={
+                "ETag": headers["ETag"],
+                "Cache-Control": headers["Cache-Control"],
+            })
+    
+    if storage.name == "s3" and settings.S3_PRESIGNED_REDIRECT:
+        url = await storage.presigned_url(
+            file_key,
+            file_name=file_name,
+            content_type=media_type,
+            expires_in=settings.S3_PRESIGNED_URL_TTL
+        )
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    
+    if storage.name == "local" and settings.LOCAL_ACCEL_REDIRECT_PREFIX and storage is not LEGACY_STORAGE:
+        # nginx serves the file with sendfile and handles Range itself; the
+        # prefix maps to the upload root, so legacy paths are served below
+        headers["X-Accel-Redirect"] = f"{settings.LOCAL_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{file_key}"
+        return Response(media_type=media_type, headers=headers)
+    
+    try:
+        content_length = await storage.size(file_key)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document content missing")
+    
+    byte_range = _parse_range(request.headers.get("range"), content_length)
+    if byte_range is None:
+        if storage.name == "local":
+            return FileResponse(storage.path(file_key), media_type=media_type, headers=headers)
+        headers["Content-Length"] = str(content_length)
+        return StreamingResponse(storage.iter_chunks(file_key), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{content_length}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.iter_chunks(file_key, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
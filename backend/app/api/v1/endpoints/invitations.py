@@ -1,24 +1,37 @@
 """
 Tenant invitation endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, tuple_
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
+from uuid import UUID
+import csv
+import hashlib
+import io
 import secrets
+import uuid
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis_client import get_cache, set_cache, delete_cache
 from app.core.auth import get_current_active_user, create_access_token, get_password_hash
-from app.core.email import send_tenant_invitation_email
+from app.core.email import (
+    queue_tenant_invitation_email, queue_emails, render_tenant_invitation_email,
+    email_configured, EmailMessage
+)
 from app.models.user import User, Profile
 from app.models.property import Property
 from app.models.invitation import Invitation
 from app.models.lease import Lease
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError
 
 router = APIRouter()
 
+BULK_INVITE_MAX_ROWS = 1000
+BULK_INVITE_MAX_CSV_BYTES = 2 * 1024 * 1024
+
 
 class InvitationCreate(BaseModel):
     email: EmailStr
@@ -40,6 +53,26 @@ class InvitationResponse(BaseModel):
         from_attributes = True
 
 
+class BulkInvitationRequest(BaseModel):
+    invitations: List[dict]
+
+
+class BulkInvitationRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    property_id: Optional[str] = None
+    status: str  # created or error
+    invitation_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkInvitationResponse(BaseModel):
+    created: int
+    failed: int
+    emails_queued: int
+    results: List[BulkInvitationRowResult]
+
+
 class AcceptInvitationRequest(BaseModel):
     token: str
     full_name: str
@@ -102,16 +135,17 @@ async def invite_tenant(
         end_date=datetime.fromisoformat(invitation_data.end_date) if invitation_data.end_date else None
     )
     db.add(invitation)
-    await db.commit()
 
-    # Send invitation email
+    # Queue invitation email in the same transaction; the outbox worker delivers it
     property_address = f"{property.address}, {property.city}, {property.state}"
-    email_sent = await send_tenant_invitation_email(
+    email_sent = queue_tenant_invitation_email(
+        db,
         to_email=invitation_data.email,
         landlord_name=current_user.full_name or current_user.email,
         property_address=property_address,
         invitation_token=token
     )
+    await db.commit()
 
     return {
         "message": "Invitation sent successfully" if email_sent else "Invitation created (email not sent - configure RESEND_API_KEY)",
@@ -120,6 +154,158 @@ async def invite_tenant(
     }
 
 
+def _parse_optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def _bulk_invite(rows: List[dict], current_user: Profile, db: AsyncSession) -> BulkInvitationResponse:
+    """Validate and create many invitations with set-based queries and one batched INSERT"""
+    if current_user.role != "landlord":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only landlords can invite tenants"
+        )
+    if len(rows) > BULK_INVITE_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_INVITE_MAX_ROWS} invitations per request"
+        )
+
+    results = [BulkInvitationRowResult(row=i + 1, status="error") for i in range(len(rows))]
+    candidates = []  # (index, InvitationCreate, property UUID, start, end)
+    seen = set()
+
+    # Per-row validation, no database access
+    for i, raw in enumerate(rows):
+        results[i].email = raw.get("email")
+        results[i].property_id = raw.get("property_id")
+        try:
+            data = InvitationCreate(**{k: (None if v == "" else v) for k, v in raw.items()})
+            property_uuid = UUID(data.property_id)
+            start_date = _parse_optional_datetime(data.start_date)
+            end_date = _parse_optional_datetime(data.end_date)
+        except ValidationError as e:
+            results[i].error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            continue
+        except ValueError as e:
+            results[i].error = str(e)
+            continue
+
+        key = (data.email, property_uuid)
+        if key in seen:
+            results[i].error = "Duplicate of an earlier row in this request"
+            continue
+        seen.add(key)
+        candidates.append((i, data, property_uuid, start_date, end_date))
+
+    # Ownership of every referenced property in one query
+    property_ids = {c[2] for c in candidates}
+    properties = {}
+    if property_ids:
+        result = await db.execute(
+            select(Property.id, Property.address, Property.city, Property.state).where(
+                Property.id.in_(property_ids),
+                Property.landlord_id == current_user.id
+            )
+        )
+        properties = {row.id: row for row in result.all()}
+
+    # Existing pending invitations for any (email, property) pair in one query
+    pending = set()
+    pairs = [(c[1].email, c[2]) for c in candidates if c[2] in properties]
+    if pairs:
+        result = await db.execute(
+            select(Invitation.email, Invitation.property_id).where(
+                tuple_(Invitation.email, Invitation.property_id).in_(pairs),
+                Invitation.status == "pending"
+            )
+        )
+        pending = {(row.email, row.property_id) for row in result.all()}
+
+    new_rows, messages = [], []
+    landlord_name = current_user.full_name or current_user.email
+    for i, data, property_uuid, start_date, end_date in candidates:
+        property = properties.get(property_uuid)
+        if property is None:
+            results[i].error = "Property not found or you don't have access"
+            continue
+        if (data.email, property_uuid) in pending:
+            results[i].error = "An invitation for this email and property is already pending"
+            continue
+
+        invitation_id = uuid.uuid4()
+        token = secrets.token_urlsafe(32)
+        new_rows.append({
+            "id": invitation_id,
+            "email": data.email,
+            "property_id": property_uuid,
+            "landlord_id": current_user.id,
+            "token": token,
+            "status": "pending",
+            "monthly_rent": data.monthly_rent,
+            "start_date": start_date,
+            "end_date": end_date,
+            "created_at": datetime.utcnow(),
+            "expires_at": datetime.utcnow() + timedelta(days=7),
+        })
+        subject, html = render_tenant_invitation_email(
+            landlord_name=landlord_name,
+            property_address=f"{property.address}, {property.city}, {property.state}",
+            invitation_token=token
+        )
+        messages.append(EmailMessage(to_email=data.email, subject=subject, html=html))
+        results[i].status = "created"
+        results[i].invitation_id = str(invitation_id)
+
+    emails_queued = 0
+    if new_rows:
+        await db.execute(insert(Invitation), new_rows)
+        if email_configured():
+            emails_queued = await queue_emails(db, messages, category="tenant_invitation")
+        await db.commit()
+
+    return BulkInvitationResponse(
+        created=len(new_rows),
+        failed=len(rows) - len(new_rows),
+        emails_queued=emails_queued,
+        results=results
+    )
+
+
+@router.post("/invite/bulk", response_model=BulkInvitationResponse)
+async def bulk_invite_tenants(
+    request_data: BulkInvitationRequest,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Invite many tenants at once (landlords only); reports a result per row"""
+    return await _bulk_invite(request_data.invitations, current_user, db)
+
+
+@router.post("/invite/bulk/csv", response_model=BulkInvitationResponse)
+async def bulk_invite_tenants_csv(
+    file: UploadFile = File(...),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Invite many tenants from a CSV upload (landlords only)
+    Columns: email, property_id, monthly_rent, start_date, end_date
+    """
+    content = await file.read(BULK_INVITE_MAX_CSV_BYTES + 1)
+    if len(content) > BULK_INVITE_MAX_CSV_BYTES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV file is too large")
+    try:
+        reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+        rows = [
+            {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            for row in reader
+        ]
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV: {e}")
+    return await _bulk_invite(rows, current_user, db)
+
+
 @router.get("/invitations", response_model=List[InvitationResponse])
 async def list_invitations(
     current_user: Profile = Depends(get_current_active_user),
@@ -178,27 +364,42 @@ async def cancel_invitation(
 
     invitation.status = "cancelled"
     await db.commit()
+    await delete_cache(invitation_cache_key(invitation.token))
 
     return {"message": "Invitation cancelled"}
 
 
-@router.get("/invitation/{token}")
-async def get_invitation_details(
-    token: str,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get invitation details by token (for accept page)"""
-    result = await db.execute(
-        select(Invitation).where(Invitation.token == token)
+def invitation_cache_key(token: str) -> str:
+    """Cache key for an invitation's public details; the raw token never reaches Redis"""
+    return f"invitation:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+async def _load_invitation(token: str, db: AsyncSession, for_update: bool = False):
+    """
+    Fetch a usable invitation with its property and landlord name in one query
+    Returns (invitation, details) or raises if it is missing, used or expired
+    """
+    query = (
+        select(
+            Invitation,
+            Property.address, Property.city, Property.state, Property.zip_code,
+            Profile.full_name.label("landlord_name")
+        )
+        .outerjoin(Property, Property.id == Invitation.property_id)
+        .outerjoin(Profile, Profile.id == Invitation.landlord_id)
+        .where(Invitation.token == token)
     )
-    invitation = result.scalar_one_or_none()
+    if for_update:
+        query = query.with_for_update(of=Invitation)
+    row = (await db.execute(query)).first()
 
-    if not invitation:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invitation not found"
         )
 
+    invitation = row.Invitation
     if invitation.status != "pending":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -213,26 +414,42 @@ async def get_invitation_details(
             detail="Invitation has expired"
         )
 
-    # Get property and landlord details
-    result = await db.execute(select(Property).where(Property.id == invitation.property_id))
-    property = result.scalar_one_or_none()
-
-    result = await db.execute(select(Profile).where(Profile.id == invitation.landlord_id))
-    landlord = result.scalar_one_or_none()
-
-    return {
+    details = {
         "email": invitation.email,
         "property": {
-            "address": property.address,
-            "city": property.city,
-            "state": property.state,
-            "zip_code": property.zip_code
-        } if property else None,
-        "landlord_name": landlord.full_name if landlord else None,
+            "address": row.address,
+            "city": row.city,
+            "state": row.state,
+            "zip_code": row.zip_code
+        } if row.address is not None else None,
+        "landlord_name": row.landlord_name,
         "monthly_rent": invitation.monthly_rent,
         "start_date": invitation.start_date.isoformat() if invitation.start_date else None,
         "end_date": invitation.end_date.isoformat() if invitation.end_date else None
     }
+    return invitation, details
+
+
+@router.get("/invitation/{token}")
+async def get_invitation_details(
+    token: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get invitation details by token (for accept page)"""
+    cache_key = invitation_cache_key(token)
+    cached = await get_cache(cache_key)
+    if cached:
+        return cached
+
+    invitation, details = await _load_invitation(token, db)
+
+    # Never cache past the expiry, so a stale hit cannot outlive the invitation
+    remaining = int((invitation.expires_at - datetime.utcnow()).total_seconds())
+    ttl = min(settings.REDIS_TTL, remaining)
+    if ttl > 0:
+        await set_cache(cache_key, details, ttl=ttl)
+
+    return details
 
 
 @router.post("/accept-invitation")
@@ -241,31 +458,8 @@ async def accept_invitation(
     db: AsyncSession = Depends(get_db)
 ):
     """Accept an invitation and create tenant account"""
-    # Get invitation
-    result = await db.execute(
-        select(Invitation).where(Invitation.token == data.token)
-    )
-    invitation = result.scalar_one_or_none()
-
-    if not invitation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Invitation not found"
-        )
-
-    if invitation.status != "pending":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invitation is {invitation.status}"
-        )
-
-    if invitation.expires_at < datetime.utcnow():
-        invitation.status = "expired"
-        await db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invitation has expired"
-        )
+    # Lock the invitation so two concurrent accepts cannot both succeed
+    invitation, _ = await _load_invitation(data.token, db, for_update=True)
 
     # Check if user already exists
     result = await db.execute(select(User).where(User.email == invitation.email))
@@ -314,6 +508,7 @@ async def accept_invitation(
     invitation.accepted_at = datetime.utcnow()
 
     await db.commit()
+    await delete_cache(invitation_cache_key(invitation.token))
 
     # Create access token
     access_token = create_access_token(data={"sub": str(new_user.id)})
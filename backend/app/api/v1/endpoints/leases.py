@@ -8,7 +8,8 @@ from typing import List
 from uuid import UUID
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
-from app.core.redis_client import delete_cache_pattern
+from app.core.redis_client import delete_cache_pattern, delete_report_caches
+from app.core.idempotency import IdempotentRequest, idempotency
 from app.models.user import Profile
 from app.models.lease import Lease
 from app.schemas.lease import Lease as LeaseSchema, LeaseCreate, LeaseUpdate
@@ -37,9 +38,13 @@ async def get_leases(
 async def create_lease(
     lease_data: LeaseCreate,
     current_user: Profile = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idem: IdempotentRequest = Depends(idempotency)
 ):
-    """Create a new lease"""
+    """Create a new lease (retries with the same Idempotency-Key get the original response)"""
+    if idem.replay:
+        return idem.replay
+    
     if current_user.role != "landlord":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -63,13 +68,17 @@ async def create_lease(
         landlord_id=current_user.id
     )
     db.add(new_lease)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_lease)
+    response = LeaseSchema.model_validate(new_lease)
+    await idem.save(response)
+    await db.commit()
     
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_report_caches([current_user.id])
     
-    return LeaseSchema.model_validate(new_lease)
+    return response
 
 
 @router.put("/{lease_id}", response_model=LeaseSchema)
@@ -102,6 +111,7 @@ async def update_lease(
     # Clear cache for both landlord and tenant
     await delete_cache_pattern(f"dashboard:{lease.landlord_id}*")
     await delete_cache_pattern(f"dashboard:{lease.tenant_id}*")
+    await delete_report_caches([lease.landlord_id])
     
     return LeaseSchema.model_validate(lease)
 
@@ -128,4 +138,5 @@ async def delete_lease(
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
     await delete_cache_pattern(f"dashboard:{lease.tenant_id}*")
+    await delete_report_caches([current_user.id])
 
@@ -9,12 +9,15 @@ from uuid import UUID
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
 from app.core.redis_client import delete_cache_pattern
+from app.core.quote_sources import quote_source_configured
 from app.models.user import Profile
 from app.models.maintenance import MaintenanceRequest
+from app.models.contractor_quote import ContractorQuote
 from app.schemas.maintenance import (
     MaintenanceRequest as MaintenanceRequestSchema,
     MaintenanceRequestCreate,
-    MaintenanceRequestUpdate
+    MaintenanceRequestUpdate,
+    ContractorQuote as ContractorQuoteSchema
 )
 
 router = APIRouter()
@@ -125,3 +128,61 @@ async def update_maintenance_request(
     
     return MaintenanceRequestSchema.model_validate(request)
 
+
+
+@router.post("/{request_id}/agent", response_model=MaintenanceRequestSchema, status_code=status.HTTP_202_ACCEPTED)
+async def start_contractor_agent(
+    request_id: UUID,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a maintenance request for the contractor agent to collect quotes"""
+    result = await db.execute(
+        select(MaintenanceRequest).where(MaintenanceRequest.id == request_id).with_for_update()
+    )
+    request = result.scalar_one_or_none()
+    
+    if not request:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+    if current_user.role != "landlord" or request.landlord_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    if request.status in ("completed", "cancelled"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Request is {request.status}")
+    if not quote_source_configured():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Contractor agent not configured")
+    
+    # Already queued or in progress: nothing to do
+    if request.agent_status not in ("pending", "shopping"):
+        request.agent_status = "pending"
+        request.agent_attempts = 0
+        request.agent_next_attempt_at = None
+        request.agent_error = None
+        await db.commit()
+        await db.refresh(request)
+    
+    return MaintenanceRequestSchema.model_validate(request)
+
+
+@router.get("/{request_id}/quotes", response_model=List[ContractorQuoteSchema])
+async def get_contractor_quotes(
+    request_id: UUID,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Contractor quotes collected for a maintenance request, cheapest first"""
+    result = await db.execute(
+        select(MaintenanceRequest).where(MaintenanceRequest.id == request_id)
+    )
+    request = result.scalar_one_or_none()
+    
+    if not request:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+    if current_user.id not in (request.landlord_id, request.tenant_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    quotes = await db.execute(
+        select(ContractorQuote)
+        .where(ContractorQuote.maintenance_request_id == request_id)
+        .order_by(ContractorQuote.quote_amount, ContractorQuote.created_at)
+    )
+    return [ContractorQuoteSchema.model_validate(q) for q in quotes.scalars().all()]
@@ -1,24 +1,39 @@
 """
 Notifications endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import List
+from sqlalchemy import select, update, delete, func
+from typing import List, Optional
 from uuid import UUID
-from app.core.database import get_db
-from app.core.auth import get_current_active_user
-from app.core.redis_client import delete_cache_pattern
+import asyncio
+import json
+from app.core.config import settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.auth import get_current_active_user, get_current_user_id, authenticate_token
+from app.core import redis_client as cache
+from app.core.redis_client import delete_cache_keys
+from app.core.realtime import hub, replay_events, parse_event_id, issue_stream_ticket, redeem_stream_ticket
+from app.core.unread_counts import get_unread_count, adjust_unread, decrement_unread, reset_unread
+from app.core import metrics
 from app.models.user import Profile
-from app.models.notification import Notification
-from app.schemas.notification import Notification as NotificationSchema
+from app.models.notification import Notification, NotificationArchive
+from app.models.property import Property
+from app.schemas.notification import (
+    Notification as NotificationSchema, AnnouncementCreate, NotificationBatch, NotificationBatchResult
+)
+from app.services.notification_fanout import notify_property_tenants
 
 router = APIRouter()
 
+BATCH_MAX_IDS = 1000
+
 
 @router.get("", response_model=List[NotificationSchema])
 async def get_notifications(
     unread_only: bool = False,
+    include_archived: bool = False,
     limit: int = 50,
     current_user: Profile = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
@@ -32,7 +47,119 @@ async def get_notifications(
     query = query.order_by(Notification.created_at.desc()).limit(limit)
     
     result = await db.execute(query)
-    return [NotificationSchema.model_validate(n) for n in result.scalars().all()]
+    notifications = result.scalars().all()
+
+    # Archived rows are all read, so unread_only never needs the archive.
+    # Old unread rows stay hot, so the two lists are merged by date
+    if include_archived and not unread_only:
+        archived = await db.execute(
+            select(NotificationArchive)
+            .where(NotificationArchive.user_id == current_user.id)
+            .order_by(NotificationArchive.created_at.desc())
+            .limit(limit)
+        )
+        notifications = sorted(
+            [*notifications, *archived.scalars().all()],
+            key=lambda n: n.created_at,
+            reverse=True
+        )[:limit]
+
+    return [NotificationSchema.model_validate(n) for n in notifications]
+
+
+@router.get("/unread-count")
+async def get_unread_notification_count(
+    user_id: UUID = Depends(get_current_user_id)
+):
+    """Unread notification count for the badge, served from Redis"""
+    count = await get_unread_count(user_id)
+    if count is None:
+        # Cold or evicted counter: count once and seed it
+        async with AsyncSessionLocal() as db:
+            count = await get_unread_count(user_id, db)
+    return {"unread": count}
+
+
+def _sse_event(event_id: str, data: dict) -> str:
+    return f"id: {event_id}\nevent: notification\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(user_id, last_event_id: Optional[str]):
+    # Subscribe before replaying so nothing published in between is lost
+    subscriber = await hub.subscribe(user_id)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+
+        last_seen = None
+        if last_event_id:
+            for event_id, data in await replay_events(user_id, last_event_id):
+                yield _sse_event(event_id, data)
+                last_seen = parse_event_id(event_id)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is None:
+                break
+            if last_seen and parse_event_id(event["id"]) <= last_seen:
+                continue  # already sent during replay
+            yield _sse_event(event["id"], event["data"])
+            metrics.increment("sse_events_sent_total")
+    finally:
+        await hub.unsubscribe(subscriber)
+
+
+@router.post("/stream-ticket")
+async def create_stream_ticket(user_id: UUID = Depends(get_current_user_id)):
+    """Short-lived, single-use ticket for opening /notifications/stream with EventSource"""
+    if not cache.redis_client:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Real-time updates unavailable")
+    return {"ticket": await issue_stream_ticket(user_id), "expires_in": settings.SSE_TICKET_TTL}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="From POST /notifications/stream-ticket, for clients that cannot set headers"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Server-Sent Events feed of new notifications for the current user"""
+    if not cache.redis_client:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Real-time updates unavailable")
+
+    user_id = None
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        # Authenticate with a short-lived session; an open stream must not hold a pooled connection
+        async with AsyncSessionLocal() as db:
+            current_user = await authenticate_token(authorization[7:], db)
+        user_id = current_user.id if current_user else None
+    elif ticket:
+        user_id = await redeem_stream_ticket(ticket)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if last_event_id:
+        try:
+            parse_event_id(last_event_id)
+        except ValueError:
+            last_event_id = None
+
+    return StreamingResponse(
+        _event_stream(user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.put("/{notification_id}/read", response_model=NotificationSchema)
@@ -42,27 +169,99 @@ async def mark_notification_read(
     db: AsyncSession = Depends(get_db)
 ):
     """Mark a notification as read"""
+    # Row lock so concurrent requests decrement the unread counter only once
     result = await db.execute(
         select(Notification).where(
             Notification.id == notification_id,
             Notification.user_id == current_user.id
-        )
+        ).with_for_update()
     )
     notification = result.scalar_one_or_none()
     
     if not notification:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
     
+    was_unread = not notification.read
     notification.read = True
     await db.commit()
     await db.refresh(notification)
+
+    if was_unread:
+        await decrement_unread(current_user.id)
     
     # Clear cache
-    await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_cache_keys([f"dashboard:{current_user.id}"])
     
     return NotificationSchema.model_validate(notification)
 
 
+@router.post("/batch", response_model=NotificationBatchResult)
+async def batch_update_notifications(
+    batch: NotificationBatch,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Mark many notifications read or unread, or delete them, in one request
+    Ids the user does not own are ignored; counts report what changed
+    """
+    read_ids, unread_ids, delete_ids = set(batch.read), set(batch.unread), set(batch.delete)
+    if len(read_ids) + len(unread_ids) + len(delete_ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_MAX_IDS} ids per batch"
+        )
+    if (read_ids & unread_ids) or (delete_ids & (read_ids | unread_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="An id can appear in only one operation"
+        )
+
+    owned = Notification.user_id == current_user.id
+    result = NotificationBatchResult()
+    unread_delta = 0
+
+    # Filtering on the current value makes RETURNING count only real changes
+    if read_ids:
+        changed = await db.execute(
+            update(Notification)
+            .where(owned, Notification.id.in_(read_ids), Notification.read == False)
+            .values(read=True)
+            .returning(Notification.id)
+        )
+        result.marked_read = len(changed.all())
+        unread_delta -= result.marked_read
+
+    if unread_ids:
+        changed = await db.execute(
+            update(Notification)
+            .where(owned, Notification.id.in_(unread_ids), Notification.read == True)
+            .values(read=False)
+            .returning(Notification.id)
+        )
+        result.marked_unread = len(changed.all())
+        unread_delta += result.marked_unread
+
+    if delete_ids:
+        deleted = await db.execute(
+            delete(Notification)
+            .where(owned, Notification.id.in_(delete_ids))
+            .returning(Notification.read)
+        )
+        was_read = deleted.scalars().all()
+        result.deleted = len(was_read)
+        unread_delta -= sum(1 for read in was_read if not read)
+
+    await db.commit()
+
+    if unread_delta:
+        await adjust_unread({str(current_user.id): unread_delta})
+    if result.marked_read or result.marked_unread or result.deleted:
+        await delete_cache_keys([f"dashboard:{current_user.id}"])
+
+    return result
+
+
 @router.post("/mark-all-read", status_code=status.HTTP_200_OK)
 async def mark_all_read(
     current_user: Profile = Depends(get_current_active_user),
@@ -78,9 +277,41 @@ async def mark_all_read(
         .values(read=True)
     )
     await db.commit()
+    await reset_unread(current_user.id)
     
     # Clear cache
-    await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_cache_keys([f"dashboard:{current_user.id}"])
     
     return {"message": "All notifications marked as read"}
 
+
+
+@router.post("/announcements", status_code=status.HTTP_201_CREATED)
+async def create_announcement(
+    announcement: AnnouncementCreate,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Notify every active tenant of the given properties (landlord only)"""
+    if current_user.role != "landlord":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only landlords can send announcements")
+
+    property_ids = set(announcement.property_ids)
+    owned = await db.scalar(
+        select(func.count()).select_from(Property).where(
+            Property.id.in_(property_ids),
+            Property.landlord_id == current_user.id
+        )
+    )
+    if not property_ids or owned != len(property_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
+
+    recipients = await notify_property_tenants(
+        db,
+        property_ids,
+        title=announcement.title,
+        message=announcement.message,
+        action_url=announcement.action_url,
+        data={"announcement_by": str(current_user.id)},
+    )
+    return {"recipients": recipients}
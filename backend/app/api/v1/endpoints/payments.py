@@ -1,17 +1,26 @@
 """
 Payments endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, UploadFile, File, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from datetime import date
+import csv
+from typing import List, Optional
 from uuid import UUID
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
-from app.core.redis_client import delete_cache_pattern
+from app.core.redis_client import delete_cache_pattern, delete_report_caches
+from app.core.storage import content_disposition
+from app.core.idempotency import IdempotentRequest, idempotency
 from app.models.user import Profile
 from app.models.payment import Payment
-from app.schemas.payment import Payment as PaymentSchema, PaymentCreate, PaymentUpdate
+from app.schemas.payment import Payment as PaymentSchema, PaymentCreate, PaymentUpdate, PaymentImportReport
+from app.services.stripe_events import verify_event, record_event
+from app.services.ledger_export import stream_payments_csv, export_filename
+from app.services.payment_import import import_payments, iter_records, detect_format
 
 router = APIRouter()
 
@@ -33,13 +42,41 @@ async def get_payments(
     return [PaymentSchema.model_validate(p) for p in result.scalars().all()]
 
 
+@router.get("/export.csv")
+async def export_payments_csv(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream the current user's payments as CSV, ordered by payment date (start/end inclusive)"""
+    if start and end and start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    user_id, role = current_user.id, current_user.role
+    # The export reads on its own connection; don't hold this one for the whole download
+    await db.close()
+    
+    return StreamingResponse(
+        stream_payments_csv(user_id, role, start, end),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": content_disposition(export_filename("payments", start, end), inline=False),
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.post("", response_model=PaymentSchema, status_code=status.HTTP_201_CREATED)
 async def create_payment(
     payment_data: PaymentCreate,
     current_user: Profile = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idem: IdempotentRequest = Depends(idempotency)
 ):
-    """Create a new payment"""
+    """Create a new payment (retries with the same Idempotency-Key get the original response)"""
+    if idem.replay:
+        return idem.replay
+    
     # Verify lease access
     from app.models.lease import Lease
     result = await db.execute(
@@ -62,14 +99,39 @@ async def create_payment(
         landlord_id=lease.landlord_id
     )
     db.add(new_payment)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_payment)
+    response = PaymentSchema.model_validate(new_payment)
+    await idem.save(response)
+    await db.commit()
     
     # Clear cache
     await delete_cache_pattern(f"dashboard:{lease.landlord_id}*")
     await delete_cache_pattern(f"dashboard:{lease.tenant_id}*")
+    await delete_report_caches([lease.landlord_id])
+    
+    return response
+
+
+@router.post("/import", response_model=PaymentImportReport)
+async def import_payment_history(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import historical payments from CSV (with header), JSON Lines or a JSON array
+    Valid rows are inserted in one transaction; invalid rows are listed in the report
+    """
+    if current_user.role != "landlord":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only landlords can import payments")
     
-    return PaymentSchema.model_validate(new_payment)
+    records = iter_records(file.file, detect_format(file.filename, file.content_type))
+    try:
+        return await import_payments(db, current_user.id, records, dry_run=dry_run)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not read file: {e}")
 
 
 @router.put("/{payment_id}", response_model=PaymentSchema)
@@ -102,6 +164,30 @@ async def update_payment(
     # Clear cache
     await delete_cache_pattern(f"dashboard:{payment.landlord_id}*")
     await delete_cache_pattern(f"dashboard:{payment.tenant_id}*")
+    await delete_report_caches([payment.landlord_id])
     
     return PaymentSchema.model_validate(payment)
 
+
+@router.post("/webhooks/stripe")
+async def stripe_webhook(
+    request: Request,
+    stripe_signature: Optional[str] = Header(None, alias="Stripe-Signature"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Receive a Stripe webhook
+    The event is verified and stored only; the stripe_events worker applies it
+    """
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Webhooks not configured")
+    
+    try:
+        event = verify_event(await request.body(), stripe_signature)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature")
+    
+    recorded = await record_event(db, event)
+    await db.commit()
+    
+    return {"received": True, "duplicate": not recorded}
@@ -8,7 +8,7 @@ from typing import List
 from uuid import UUID
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
-from app.core.redis_client import delete_cache_pattern
+from app.core.redis_client import delete_cache_pattern, delete_report_caches
 from app.models.user import Profile
 from app.models.property import Property
 from app.schemas.property import Property as PropertySchema, PropertyCreate, PropertyUpdate
@@ -61,6 +61,7 @@ async def create_property(
     
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_report_caches([current_user.id])
     
     return PropertySchema.model_validate(new_property)
 
@@ -121,6 +122,7 @@ async def update_property(
     
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_report_caches([current_user.id])
     
     return PropertySchema.model_validate(property)
 
@@ -146,4 +148,5 @@ async def delete_property(
     
     # Clear cache
     await delete_cache_pattern(f"dashboard:{current_user.id}*")
+    await delete_report_caches([current_user.id])
 
@@ -0,0 +1,104 @@
+"""
+Financial report endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, timedelta
+from typing import Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.models.user import Profile
+from app.schemas.report import IncomeReport, CashFlowForecast, OccupancyReport
+from app.services.payment_rollups import income_by_month, sum_totals
+from app.services.cash_flow_forecast import get_forecast
+from app.services.occupancy import get_occupancy
+
+router = APIRouter()
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+def _require_landlord(current_user: Profile):
+    if current_user.role != "landlord":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only landlords can view financial reports"
+        )
+
+
+def _month(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+def _months_back(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@router.get("/income", response_model=IncomeReport)
+async def get_income_report(
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN, description="YYYY-MM (default: 11 months before end)"),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN, description="YYYY-MM (default: this month)"),
+    property_id: Optional[UUID] = None,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Income by property and due month from the payment rollups
+    Cost depends on the number of months and properties, not on payment history
+    """
+    _require_landlord(current_user)
+    end_month = _month(end) if end else date.today().replace(day=1)
+    start_month = _month(start) if start else _months_back(end_month, 11)
+    if start_month > end_month:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+
+    months = await income_by_month(db, current_user.id, start_month, end_month, property_id)
+    return IncomeReport(start=start_month, end=end_month, months=months, totals=sum_totals(months))
+
+
+@router.get("/forecast", response_model=CashFlowForecast)
+async def get_cash_flow_forecast(
+    months: int = Query(12, ge=1, le=settings.FORECAST_MAX_MONTHS),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Projected rent per month from this month on: contracted, expected and at-risk
+    rent, and rent lost to leases ending without a follow-up (cached per landlord)
+    """
+    _require_landlord(current_user)
+    return await get_forecast(db, current_user.id, months)
+
+
+@router.get("/occupancy", response_model=OccupancyReport)
+async def get_occupancy_report(
+    start: Optional[date] = Query(None, description="Default: 364 days before end"),
+    end: Optional[date] = Query(None, description="Default: today"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Occupied and vacant days, vacancy spells and turnover per property over a date
+    range (inclusive), from merged lease intervals; properties lowest occupancy first
+    """
+    _require_landlord(current_user)
+    end = end or date.today()
+    start = start or end - timedelta(days=364)
+    days = (end - start).days + 1
+    if days < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    if days > settings.OCCUPANCY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.OCCUPANCY_MAX_DAYS} days"
+        )
+
+    totals, properties = await get_occupancy(db, current_user.id, start, end, limit, offset)
+    return OccupancyReport(
+        start=start, end=end, days=days, totals=totals, properties=properties, limit=limit, offset=offset
+    )
@@ -0,0 +1,121 @@
+"""
+Full-text search endpoint
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, union_all, or_, case
+from typing import List
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.models.user import Profile
+from app.models.property import Property
+from app.models.lease import Lease
+from app.models.document import Document
+from app.models.maintenance import MaintenanceRequest
+from app.schemas.search import SearchResult, SearchResults
+
+router = APIRouter()
+
+SEARCH_CONFIG = "english"
+SEARCH_KINDS = ("documents", "maintenance")
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=18, MinWords=6, StartSel=<mark>, StopSel=</mark>"
+HEADLINE_TEXT_CHARS = 20_000  # extracted document text considered for snippets
+
+
+@router.get("", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    types: List[str] = Query(list(SEARCH_KINDS)),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ranked search over documents (name, description, PDF text) and maintenance requests
+    Only rows the current user can access are matched
+    """
+    unknown = set(types) - set(SEARCH_KINDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search types: {', '.join(sorted(unknown))}"
+        )
+    
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    is_landlord = current_user.role == "landlord"
+    branches = []
+    
+    if "documents" in types:
+        if is_landlord:
+            scope = Document.property_id.in_(
+                select(Property.id).where(Property.landlord_id == current_user.id)
+            )
+        else:
+            scope = Document.lease_id.in_(
+                select(Lease.id).where(Lease.tenant_id == current_user.id)
+            )
+        branches.append(
+            select(
+                literal("document").label("kind"),
+                Document.id.label("id"),
+                Document.file_name.label("title"),
+                func.coalesce(Document.description, "").label("body"),
+                func.ts_rank_cd(Document.search_vector, ts_query).label("rank"),
+                Document.created_at.label("created_at"),
+            ).where(
+                Document.search_vector.op("@@")(ts_query),
+                or_(scope, Document.uploaded_by == current_user.id)
+            )
+        )
+    
+    if "maintenance" in types:
+        owner = MaintenanceRequest.landlord_id if is_landlord else MaintenanceRequest.tenant_id
+        branches.append(
+            select(
+                literal("maintenance").label("kind"),
+                MaintenanceRequest.id.label("id"),
+                MaintenanceRequest.title.label("title"),
+                MaintenanceRequest.description.label("body"),
+                func.ts_rank_cd(MaintenanceRequest.search_vector, ts_query).label("rank"),
+                MaintenanceRequest.created_at.label("created_at"),
+            ).where(
+                MaintenanceRequest.search_vector.op("@@")(ts_query),
+                owner == current_user.id
+            )
+        )
+    
+    # Rank and paginate first, then build snippets for the page only
+    matches = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery()
+    page = (
+        select(matches)
+        .order_by(matches.c.rank.desc(), matches.c.created_at.desc())
+        .limit(limit + 1)
+        .offset(offset)
+        .subquery()
+    )
+    # Documents also match on their extracted text, so snippets come from it too; it is
+    # only read for the page, not carried through the ranking of every match
+    document_body = (
+        select(func.concat_ws(" ", Document.description, func.left(Document.extracted_text, HEADLINE_TEXT_CHARS)))
+        .where(Document.id == page.c.id)
+        .scalar_subquery()
+    )
+    body = case((page.c.kind == "document", document_body), else_=page.c.body)
+    page_query = select(
+        page.c.kind,
+        page.c.id,
+        page.c.title,
+        page.c.rank,
+        page.c.created_at,
+        func.ts_headline(SEARCH_CONFIG, body, ts_query, HEADLINE_OPTIONS).label("snippet"),
+    ).order_by(page.c.rank.desc(), page.c.created_at.desc())
+    
+    rows = (await db.execute(page_query)).all()
+    return SearchResults(
+        query=q,
+        results=[SearchResult(**row._mapping) for row in rows[:limit]],
+        limit=limit,
+        offset=offset,
+        has_more=len(rows) > limit
+    )
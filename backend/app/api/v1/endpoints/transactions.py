@@ -0,0 +1,44 @@
+"""
+Accounting transactions endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.core.storage import content_disposition
+from app.models.user import Profile
+from app.services.ledger_export import stream_transactions_csv, export_filename
+
+router = APIRouter()
+
+
+@router.get("/export.csv")
+async def export_transactions_csv(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream the landlord's income and expense transactions as CSV, ordered by date (start/end inclusive)"""
+    if current_user.role != "landlord":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only landlords can export transactions"
+        )
+    if start and end and start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    landlord_id = current_user.id
+    # The export reads on its own connection; don't hold this one for the whole download
+    await db.close()
+    
+    return StreamingResponse(
+        stream_transactions_csv(landlord_id, start, end),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": content_disposition(export_filename("transactions", start, end), inline=False),
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -2,7 +2,7 @@
 API v1 Router
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, dashboard, properties, leases, maintenance, payments, documents, notifications, invitations
+from app.api.v1.endpoints import auth, dashboard, properties, leases, maintenance, payments, documents, notifications, invitations, search, reports, transactions
 
 api_router = APIRouter()
 
@@ -15,4 +15,7 @@ api_router.include_router(payments.router, prefix="/payments", tags=["payments"]
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(invitations.router, prefix="/tenants", tags=["invitations"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
 
@@ -0,0 +1,106 @@
+"""
+Streaming ZIP archives
+Entries are read from storage in chunks and emitted as they are written,
+so memory stays bounded and no temp file is needed
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional
+import logging
+import zipfile
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Already-compressed content is stored as-is; deflating it only burns CPU
+COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/xml", "application/rtf")
+
+ZIP64_THRESHOLD = 0x7FFFFFFF
+
+
+@dataclass
+class ArchiveEntry:
+    """One file to place in an archive"""
+    name: str
+    storage: StorageBackend
+    key: str
+    size: Optional[int] = None
+    mime_type: Optional[str] = None
+    modified: Optional[datetime] = None
+
+
+class _DrainableBuffer:
+    """Write-only sink that hands its contents to the response on demand"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def unique_name(name: str, seen: set) -> str:
+    """Make an archive path unique by suffixing duplicates with (2), (3), ..."""
+    if name not in seen:
+        seen.add(name)
+        return name
+    stem, dot, ext = name.rpartition(".")
+    if not dot or "/" in ext:
+        stem, ext = name, ""
+    counter = 2
+    while True:
+        candidate = f"{stem} ({counter}).{ext}" if ext else f"{stem} ({counter})"
+        if candidate not in seen:
+            seen.add(candidate)
+            return candidate
+        counter += 1
+
+
+async def stream_zip(entries: Iterable[ArchiveEntry]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of the entries, one storage chunk at a time"""
+    sink = _DrainableBuffer()
+    # The sink cannot seek, so zipfile writes sizes in data descriptors
+    archive = zipfile.ZipFile(sink, mode="w", allowZip64=True)
+
+    for entry in entries:
+        compressible = (entry.mime_type or "").startswith(COMPRESSIBLE_PREFIXES)
+        info = zipfile.ZipInfo(
+            entry.name,
+            date_time=(entry.modified or datetime.now()).timetuple()[:6]
+        )
+        info.compress_type = zipfile.ZIP_DEFLATED if compressible else zipfile.ZIP_STORED
+        if entry.size is not None:
+            info.file_size = entry.size
+        force_zip64 = entry.size is None or entry.size > ZIP64_THRESHOLD
+
+        try:
+            with archive.open(info, mode="w", force_zip64=force_zip64) as member:
+                async for chunk in entry.storage.iter_chunks(entry.key):
+                    if compressible:
+                        await run_in_threadpool(member.write, chunk)
+                    else:
+                        member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+        except FileNotFoundError:
+            # The local file header may already be out; the entry is left empty
+            logger.warning(f"Skipping missing archive entry {entry.key}")
+        data = sink.drain()
+        if data:
+            yield data
+
+    archive.close()
+    yield sink.drain()
@@ -3,6 +3,7 @@ Authentication and authorization utilities
 """
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
@@ -44,33 +45,49 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> Profile:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def authenticate_token(token: str, db: AsyncSession) -> Optional[Profile]:
+    """Profile for a bearer token, or None if the token is invalid"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
 
     # Get user profile from database
     result = await db.execute(select(Profile).where(Profile.id == user_id))
-    profile = result.scalar_one_or_none()
-    if profile is None:
-        raise credentials_exception
+    return result.scalar_one_or_none()
 
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Profile:
+    """Get current authenticated user"""
+    profile = await authenticate_token(token, db)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return profile
 
 
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> UUID:
+    """User id from a valid bearer token, without loading the profile"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return UUID(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 async def get_current_active_user(
     current_user: Profile = Depends(get_current_user)
 ) -> Profile:
@@ -0,0 +1,196 @@
+"""
+Content-addressed blob store for uploaded documents
+Files are stored once per SHA-256 and reference counted by documents;
+the bytes live in the configured storage backend (see app.core.storage)
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+import hashlib
+import logging
+import os
+import tempfile
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, delete, func, exists, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.storage import get_storage
+from app.models.blob import DocumentBlob
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Uploads are always spooled locally before they reach the backend
+TMP_DIR = Path(settings.UPLOAD_DIR) / "tmp"
+TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+
+@dataclass
+class ReleasedBlob:
+    """A blob whose last reference was dropped; its bytes go after commit"""
+    sha256: str
+    file_path: str
+    size: int
+
+
+@dataclass
+class SpooledBlob:
+    """An upload copied to a temp file and hashed, not yet referenced"""
+    sha256: str
+    size: int
+    temp_path: Path
+
+
+def blob_key(sha256: str) -> str:
+    """Storage key of a blob, fanned out by hash prefix"""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def _spool(source: BinaryIO) -> SpooledBlob:
+    """Copy a file object to a temp file in chunks while hashing it"""
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_name = tempfile.mkstemp(dir=TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.unlink(temp_name)
+        raise
+    return SpooledBlob(sha256=digest.hexdigest(), size=size, temp_path=Path(temp_name))
+
+
+async def _lock_blob(db: AsyncSession, sha256: str):
+    """Serialize writers and deleters of one hash until the transaction ends"""
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:sha256))"), {"sha256": sha256})
+
+
+async def spool_upload(source: BinaryIO) -> SpooledBlob:
+    """Hash and spool an upload without blocking the event loop"""
+    return await run_in_threadpool(_spool, source)
+
+
+async def add_reference(
+    db: AsyncSession,
+    spooled: SpooledBlob,
+    mime_type: Optional[str] = None
+) -> str:
+    """
+    Reference a spooled upload, storing its bytes only if they are new
+    Returns the blob storage key for Document.file_path
+    """
+    key = blob_key(spooled.sha256)
+    # Held until commit, so a released blob's bytes cannot be deleted
+    # after we reference the hash again (see delete_released_blob)
+    await _lock_blob(db, spooled.sha256)
+    stmt = (
+        insert(DocumentBlob)
+        .values(
+            sha256=spooled.sha256,
+            file_path=key,
+            size=spooled.size,
+            mime_type=mime_type,
+            ref_count=1,
+        )
+        .on_conflict_do_update(
+            index_elements=[DocumentBlob.sha256],
+            set_={"ref_count": DocumentBlob.ref_count + 1},
+        )
+        .returning(DocumentBlob.ref_count)
+    )
+    ref_count = (await db.execute(stmt)).scalar_one()
+
+    # Rows are deleted at zero references, so a count of one means new bytes
+    if ref_count == 1:
+        await get_storage().put_file(key, spooled.temp_path, mime_type)
+    else:
+        discard_spooled(spooled)
+        logger.info(f"Deduplicated upload {spooled.sha256[:12]} ({spooled.size} bytes, refs={ref_count})")
+    return key
+
+
+def discard_spooled(spooled: SpooledBlob):
+    """Remove a spooled upload that will not be referenced"""
+    spooled.temp_path.unlink(missing_ok=True)
+
+
+async def release_reference(db: AsyncSession, sha256: str) -> Optional[ReleasedBlob]:
+    """
+    Drop one reference to a blob, deleting its row when the last one goes
+    Returns the released blob, whose bytes the caller removes with
+    delete_released_blob() once the transaction has committed
+    """
+    result = await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.sha256 == sha256)
+        .values(ref_count=DocumentBlob.ref_count - 1)
+        .returning(DocumentBlob.ref_count, DocumentBlob.file_path, DocumentBlob.size)
+    )
+    row = result.one_or_none()
+    if row is None:
+        logger.warning(f"Released unknown blob {sha256}")
+        return None
+
+    ref_count, file_path, size = row
+    if ref_count > 0:
+        return None
+
+    await db.execute(delete(DocumentBlob).where(DocumentBlob.sha256 == sha256))
+    return ReleasedBlob(sha256=sha256, file_path=file_path, size=size)
+
+
+async def delete_released_blob(released: ReleasedBlob) -> bool:
+    """
+    Delete the bytes of a released blob unless the hash was uploaded again
+    Call after the release has committed; a rollback keeps row and bytes together
+    """
+    async with AsyncSessionLocal() as db:
+        await _lock_blob(db, released.sha256)
+        if await db.scalar(select(exists().where(DocumentBlob.sha256 == released.sha256))):
+            return False
+        await get_storage().delete(released.file_path)
+        await db.commit()
+    logger.info(f"Reclaimed blob {released.sha256[:12]} ({released.size} bytes)")
+    return True
+
+
+async def get_storage_stats(db: AsyncSession, user_id=None) -> dict:
+    """Logical vs stored bytes, optionally scoped to one uploader"""
+    docs_query = select(
+        func.count(Document.id),
+        func.coalesce(func.sum(Document.file_size), 0),
+    ).where(Document.content_hash.isnot(None))
+
+    hashes = select(Document.content_hash).where(Document.content_hash.isnot(None))
+    if user_id is not None:
+        docs_query = docs_query.where(Document.uploaded_by == user_id)
+        hashes = hashes.where(Document.uploaded_by == user_id)
+
+    blobs_query = select(
+        func.count(DocumentBlob.sha256),
+        func.coalesce(func.sum(DocumentBlob.size), 0),
+    ).where(DocumentBlob.sha256.in_(hashes.distinct()))
+
+    document_count, logical_bytes = (await db.execute(docs_query)).one()
+    blob_count, stored_bytes = (await db.execute(blobs_query)).one()
+
+    return {
+        "documents": document_count,
+        "blobs": blob_count,
+        "logical_bytes": int(logical_bytes),
+        "stored_bytes": int(stored_bytes),
+        "reclaimed_bytes": int(logical_bytes) - int(stored_bytes),
+        "dedup_ratio": round(int(logical_bytes) / int(stored_bytes), 3) if stored_bytes else 1.0,
+    }
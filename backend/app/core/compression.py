@@ -0,0 +1,25 @@
+"""
+Response compression
+GZip for API responses, except on routes whose bodies must reach the client
+as sent: byte ranges, already-compressed archives and long-lived streams
+"""
+from typing import Iterable
+import re
+
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware:
+    """GZipMiddleware that passes requests for the excluded paths straight through"""
+
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = (), **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+        self.exclude_paths = [re.compile(pattern) for pattern in exclude_paths]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and any(p.fullmatch(scope["path"]) for p in self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
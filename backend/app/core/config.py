@@ -43,10 +43,98 @@ class Settings(BaseSettings):
 
     # Storage (S3 or local)
     STORAGE_TYPE: str = "local"  # local or s3
+    UPLOAD_DIR: str = "uploads"
     S3_BUCKET: str = ""
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "us-east-1"
+    S3_ENDPOINT_URL: str = ""  # Set for S3-compatible stores (MinIO, LocalStack)
+    S3_MULTIPART_THRESHOLD_MB: int = 16
+    S3_MULTIPART_CHUNK_MB: int = 16
+    S3_MULTIPART_CONCURRENCY: int = 8
+    S3_MAX_POOL_CONNECTIONS: int = 32
+    S3_PRESIGNED_REDIRECT: bool = True  # Redirect downloads to S3 instead of proxying bytes
+    S3_PRESIGNED_URL_TTL: int = 300  # seconds
+    LOCAL_ACCEL_REDIRECT_PREFIX: str = ""  # e.g. /protected/ to let nginx sendfile local files
+    PROCESS_POOL_WORKERS: int = 2  # Processes for thumbnails and text extraction (0 = one per CPU)
+
+    # Background jobs
+    BACKGROUND_JOBS_ENABLED: bool = True
+    TEXT_EXTRACTION_INTERVAL: int = 30  # seconds between queue polls
+    TEXT_EXTRACTION_BATCH: int = 20
+    TEXT_EXTRACTION_MAX_CHARS: int = 200_000
+    TEXT_EXTRACTION_TIMEOUT: int = 60  # seconds per file; the extracting process is killed after this
+    TEXT_EXTRACTION_STALE_SECONDS: int = 1800  # claims older than this are taken over by another worker
+    SWEEPER_INTERVAL: int = 300  # seconds between expiry sweeps
+    SWEEPER_BATCH_SIZE: int = 500
+
+    # Real-time notifications (SSE)
+    SSE_HEARTBEAT_SECONDS: int = 15
+    SSE_RETRY_MS: int = 3000  # client reconnect delay
+    SSE_REPLAY_LENGTH: int = 100  # events kept per user for Last-Event-ID replay
+    SSE_REPLAY_TTL: int = 86400  # seconds
+    SSE_CLIENT_QUEUE_SIZE: int = 100
+    SSE_TICKET_TTL: int = 60  # seconds a stream ticket stays valid (single use)
+    UNREAD_COUNTER_TTL: int = 7 * 86400  # seconds
+    UNREAD_RECONCILE_INTERVAL: int = 600  # seconds between drift checks
+    FANOUT_BATCH_SIZE: int = 1000  # rows per insert / counter / publish batch
+    NOTIFICATION_RETENTION_DAYS: int = 90  # read notifications older than this are archived
+    NOTIFICATION_ARCHIVE_PURGE_DAYS: int = 0  # delete archived rows older than this; 0 keeps them
+    NOTIFICATION_RETENTION_BATCH: int = 1000
+    NOTIFICATION_RETENTION_MAX_BATCHES: int = 100  # per run, so one sweep stays bounded
+    NOTIFICATION_RETENTION_INTERVAL: int = 3600  # seconds between sweeps
+    RENT_ROLL_INTERVAL: int = 3600  # seconds between runs (idempotent)
+    RENT_ROLL_LEAD_DAYS: int = 0  # bill the month this many days ahead
+    RENT_DEFAULT_DUE_DAY: int = 1  # when lease terms have no rent_due_day
+
+    # Late fees (defaults; leases override them in terms["late_fee"])
+    LATE_FEE_GRACE_DAYS: int = 5
+    LATE_FEE_FLAT: float = 50.0
+    LATE_FEE_PERCENT: float = 0.0  # of the payment amount
+    LATE_FEE_DAILY: float = 0.0  # per day past the grace period
+    LATE_FEE_MAX: float = 0.0  # cap; 0 means no cap
+    LATE_FEE_BATCH_SIZE: int = 10_000
+    LATE_FEE_INTERVAL: int = 3600  # seconds between runs (idempotent)
+
+    # Stripe webhook processing
+    STRIPE_WEBHOOK_TOLERANCE: int = 300  # max signature age in seconds
+    STRIPE_EVENT_INTERVAL: int = 2  # seconds between worker polls
+    STRIPE_EVENT_BATCH_SIZE: int = 500
+    STRIPE_EVENT_MAX_ATTEMPTS: int = 8  # then the event is marked failed
+    STRIPE_EVENT_RETRY_BASE_SECONDS: int = 30  # doubled per failed attempt
+    STRIPE_EVENT_RETRY_MAX_SECONDS: int = 3600
+
+    # Idempotency-Key handling for create endpoints
+    IDEMPOTENCY_KEY_TTL: int = 86400  # seconds a key is remembered
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0  # seconds a duplicate waits on the in-flight request
+
+    # CSV ledger exports
+    EXPORT_CHUNK_ROWS: int = 5000  # rows fetched from the cursor and written per chunk
+
+    # Bulk payment import
+    IMPORT_CHUNK_ROWS: int = 5000  # validated rows per COPY into the staging table
+    IMPORT_MAX_ERRORS: int = 1000  # row errors returned in the API report
+
+    # Cash-flow forecast
+    FORECAST_MAX_MONTHS: int = 24  # horizon computed and cached per landlord
+    FORECAST_HISTORY_MONTHS: int = 24  # payment history used for late rates
+    FORECAST_DEFAULT_LATE_RATE: float = 0.05  # when the landlord has no history yet
+    FORECAST_PRIOR_WEIGHT: float = 6.0  # pseudo-payments pulling tenant rates toward the portfolio rate
+    FORECAST_CACHE_TTL: int = 3600  # seconds; also dropped on lease or payment changes
+    OCCUPANCY_CACHE_TTL: int = 3600  # seconds; also dropped on lease changes
+    OCCUPANCY_MAX_DAYS: int = 3660  # longest date range per request
+
+    # Contractor quote agent
+    CONTRACTOR_QUOTE_BACKEND: str = ""  # package.module:ClassName of a quote source, or fake; empty disables the agent
+    CONTRACTOR_FAKE_LATENCY: float = 0.0  # seconds the fake source waits per request
+    CONTRACTOR_QUOTES_PER_REQUEST: int = 3
+    CONTRACTOR_AGENT_INTERVAL: int = 10  # seconds between worker polls
+    CONTRACTOR_AGENT_CONCURRENCY: int = 8  # requests shopped at once per worker
+    CONTRACTOR_AGENT_LANDLORD_CONCURRENCY: int = 2  # requests in flight per landlord, across workers
+    CONTRACTOR_QUOTE_TIMEOUT: int = 120  # seconds per request
+    CONTRACTOR_AGENT_STALE_SECONDS: int = 900  # in-flight claims older than this are retried
+    CONTRACTOR_AGENT_MAX_ATTEMPTS: int = 3  # then the request is marked failed
+    CONTRACTOR_AGENT_RETRY_SECONDS: int = 300  # doubled per failed attempt
 
     # Email (Resend)
     RESEND_API_KEY: str = ""
@@ -54,6 +142,14 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = "http://localhost:3000"
     VERCEL_URL: str = ""  # Auto-set by Vercel
     RAILWAY_PUBLIC_DOMAIN: str = ""  # Auto-set by Railway
+    EMAIL_BACKEND: str = "resend"  # resend or stub
+    EMAIL_OUTBOX_INTERVAL: int = 2  # seconds between outbox polls
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_SEND_CONCURRENCY: int = 4
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_CLAIM_STALE_SECONDS: int = 600  # sending claims older than this are taken over by another worker
 
     @property
     def frontend_base_url(self) -> str:
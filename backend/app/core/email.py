@@ -1,22 +1,127 @@
 """
-Email service using Resend
+Email service
+Messages are queued in the email_outbox table inside the caller's
+transaction and delivered by the outbox worker through a pluggable sender
+(Resend in production, an in-memory stub for tests and local runs)
 """
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import logging
+
 import resend
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.config import settings
+from app.models.email_outbox import EmailOutbox
 
+logger = logging.getLogger(__name__)
 
-def init_email():
-    """Initialize Resend with API key"""
-    if settings.RESEND_API_KEY:
-        resend.api_key = settings.RESEND_API_KEY
 
+@dataclass
+class EmailMessage:
+    """One email ready to hand to a sender"""
+    to_email: str
+    subject: str
+    html: str
+
+
+@dataclass
+class SendResult:
+    """Outcome of delivering one message"""
+    ok: bool
+    provider_message_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ResendSender:
+    """Delivers through the Resend batch API (blocking SDK, run in the thread pool)"""
+
+    name = "resend"
+    max_batch_size = 100  # Resend batch API limit
+
+    def __init__(self, api_key: str):
+        resend.api_key = api_key
+
+    def _send_batch(self, messages: List[EmailMessage]) -> List[SendResult]:
+        params = [
+            {"from": settings.EMAIL_FROM, "to": [m.to_email], "subject": m.subject, "html": m.html}
+            for m in messages
+        ]
+        if len(params) == 1:
+            response = resend.Emails.send(params[0])
+            return [SendResult(ok=True, provider_message_id=response.get("id"))]
+        response = resend.Batch.send(params)
+        data = response.get("data", []) if isinstance(response, dict) else response
+        return [SendResult(ok=True, provider_message_id=item.get("id")) for item in data]
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[SendResult]:
+        try:
+            return await run_in_threadpool(self._send_batch, messages)
+        except Exception as e:
+            # The batch endpoint is all-or-nothing
+            return [SendResult(ok=False, error=str(e)) for _ in messages]
+
+
+class StubSender:
+    """Keeps messages in memory instead of sending them"""
+
+    name = "stub"
+    max_batch_size = 100
+
+    def __init__(self):
+        self.sent: List[EmailMessage] = []
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[SendResult]:
+        self.sent.extend(messages)
+        for m in messages:
+            logger.info(f"[Email stub] To {m.to_email}: {m.subject}")
+        return [SendResult(ok=True, provider_message_id=f"stub-{len(self.sent)}") for _ in messages]
+
+
+_sender = None
+
+
+def get_email_sender():
+    """Configured sender (created once per process)"""
+    global _sender
+    if _sender is None:
+        _sender = StubSender() if settings.EMAIL_BACKEND == "stub" else ResendSender(settings.RESEND_API_KEY)
+    return _sender
+
+
+def set_email_sender(sender):
+    """Swap the sender, e.g. for a StubSender in tests"""
+    global _sender
+    _sender = sender
 
-async def send_password_reset_email(to_email: str, reset_token: str, user_name: str = None) -> bool:
-    """Send password reset email"""
-    if not settings.RESEND_API_KEY:
-        print(f"[Email] RESEND_API_KEY not configured. Would send reset email to {to_email}")
-        return False
 
+def email_configured() -> bool:
+    """Whether queued mail can actually be delivered"""
+    return settings.EMAIL_BACKEND == "stub" or bool(settings.RESEND_API_KEY)
+
+
+def queue_email(db: AsyncSession, to_email: str, subject: str, html: str, category: str = None) -> EmailOutbox:
+    """Add an email to the outbox; it is sent only if the caller's transaction commits"""
+    message = EmailOutbox(to_email=to_email, subject=subject, html=html, category=category)
+    db.add(message)
+    return message
+
+
+async def queue_emails(db: AsyncSession, messages: List[EmailMessage], category: str = None) -> int:
+    """Add many emails to the outbox with one batched INSERT"""
+    if not messages:
+        return 0
+    await db.execute(insert(EmailOutbox), [
+        {"to_email": m.to_email, "subject": m.subject, "html": m.html, "category": category}
+        for m in messages
+    ])
+    return len(messages)
+
+
+def render_password_reset_email(reset_token: str, user_name: str = None) -> Tuple[str, str]:
+    """Subject and HTML for a password reset email"""
     reset_url = f"{settings.frontend_base_url}/reset-password?token={reset_token}"
 
     html_content = f"""
@@ -48,32 +153,15 @@ async def send_password_reset_email(to_email: str, reset_token: str, user_name:
     </html>
     """
 
-    try:
-        init_email()
-        params = {
-            "from": settings.EMAIL_FROM,
-            "to": [to_email],
-            "subject": "Reset Your LeaseWell Password",
-            "html": html_content
-        }
-        resend.Emails.send(params)
-        return True
-    except Exception as e:
-        print(f"[Email] Failed to send reset email: {e}")
-        return False
+    return "Reset Your LeaseWell Password", html_content
 
 
-async def send_tenant_invitation_email(
-    to_email: str,
+def render_tenant_invitation_email(
     landlord_name: str,
     property_address: str,
     invitation_token: str
-) -> bool:
-    """Send tenant invitation email"""
-    if not settings.RESEND_API_KEY:
-        print(f"[Email] RESEND_API_KEY not configured. Would send invitation to {to_email}")
-        return False
-
+) -> Tuple[str, str]:
+    """Subject and HTML for a tenant invitation email"""
     invite_url = f"{settings.frontend_base_url}/accept-invitation?token={invitation_token}"
 
     html_content = f"""
@@ -111,16 +199,30 @@ async def send_tenant_invitation_email(
     </html>
     """
 
-    try:
-        init_email()
-        params = {
-            "from": settings.EMAIL_FROM,
-            "to": [to_email],
-            "subject": f"You're Invited to Join LeaseWell - {property_address}",
-            "html": html_content
-        }
-        resend.Emails.send(params)
-        return True
-    except Exception as e:
-        print(f"[Email] Failed to send invitation email: {e}")
+    return f"You're Invited to Join LeaseWell - {property_address}", html_content
+
+
+def queue_password_reset_email(db: AsyncSession, to_email: str, reset_token: str, user_name: str = None) -> bool:
+    """Queue a password reset email; returns False if email is not configured"""
+    if not email_configured():
+        logger.info(f"[Email] Not configured. Would send reset email to {to_email}")
+        return False
+    subject, html = render_password_reset_email(reset_token, user_name)
+    queue_email(db, to_email, subject, html, category="password_reset")
+    return True
+
+
+def queue_tenant_invitation_email(
+    db: AsyncSession,
+    to_email: str,
+    landlord_name: str,
+    property_address: str,
+    invitation_token: str
+) -> bool:
+    """Queue a tenant invitation email; returns False if email is not configured"""
+    if not email_configured():
+        logger.info(f"[Email] Not configured. Would send invitation to {to_email}")
         return False
+    subject, html = render_tenant_invitation_email(landlord_name, property_address, invitation_token)
+    queue_email(db, to_email, subject, html, category="tenant_invitation")
+    return True
@@ -0,0 +1,122 @@
+"""
+Idempotency-Key support for create endpoints
+The key row is inserted in the request's own transaction and the response
+is saved before that transaction commits, so the key and the rows it
+created become visible together. A concurrent duplicate blocks on the
+uncommitted key row (Postgres waits on the primary key) and then replays
+the stored response instead of running the handler again
+"""
+from datetime import timedelta
+from typing import Any, Optional
+from uuid import UUID
+import hashlib
+import logging
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.auth import get_current_user_id
+from app.core import metrics
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("idempotent_replays_total", "Requests answered from a stored Idempotency-Key response")
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class IdempotentRequest:
+    """Handle passed to endpoints; `replay` is set when the request was already served"""
+
+    def __init__(self, db: AsyncSession, user_id: UUID, key: Optional[str] = None):
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.replay: Optional[JSONResponse] = None
+
+    async def save(self, body: Any, status_code: int = status.HTTP_201_CREATED):
+        """Store the response; call before the endpoint commits"""
+        if self.key is None:
+            return
+        await self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == self.user_id, IdempotencyKey.key == self.key)
+            .values(status_code=status_code, response=jsonable_encoder(body))
+        )
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def idempotency(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> IdempotentRequest:
+    """Claim the request's Idempotency-Key (if any) or load its stored response"""
+    if not idempotency_key:
+        return IdempotentRequest(db, user_id)
+    if len(idempotency_key) > 255:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key is too long")
+
+    fingerprint = request_fingerprint(request.method, request.url.path, await request.body())
+    claim = pg_insert(IdempotencyKey).values(user_id=user_id, key=idempotency_key, fingerprint=fingerprint)
+    claim = claim.on_conflict_do_update(
+        index_elements=["user_id", "key"],
+        set_={"fingerprint": claim.excluded.fingerprint, "status_code": None, "response": None, "created_at": func.now()},
+        where=IdempotencyKey.created_at < func.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    ).returning(IdempotencyKey.key)
+
+    try:
+        await db.execute(
+            text("SELECT set_config('lock_timeout', :timeout, true)"),
+            {"timeout": f"{settings.IDEMPOTENCY_WAIT_TIMEOUT * 1000:.0f}ms"},
+        )
+        claimed = (await db.execute(claim)).scalar_one_or_none() is not None
+        await db.execute(text("RESET lock_timeout"))
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+            raise
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+
+    handle = IdempotentRequest(db, user_id, idempotency_key)
+    if claimed:
+        return handle
+
+    stored = (await db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == idempotency_key)
+    )).scalar_one_or_none()
+    if stored is None or stored.response is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+    metrics.increment("idempotent_replays_total", path=request.url.path)
+    handle.replay = JSONResponse(
+        content=stored.response,
+        status_code=stored.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
+    return handle
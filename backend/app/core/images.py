@@ -0,0 +1,128 @@
+"""
+Image derivatives (thumbnails and previews) for photo uploads
+Rendering runs in a process pool; derivatives are cached by content hash
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import tempfile
+
+from app.core.storage import get_storage, fetch_local_copy
+from app.core.blob_store import TMP_DIR
+from app.core.process_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+# name -> (max edge in px, format, mime type)
+DERIVATIVE_SIZES: Dict[str, Tuple[int, str, str]] = {
+    "thumb": (256, "WEBP", "image/webp"),
+    "preview": (1280, "JPEG", "image/jpeg"),
+}
+
+IMAGE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/heic", "image/bmp", "image/tiff"}
+
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+def derivative_key(sha256: str, size: str) -> str:
+    """Storage key of a derivative; shared by every document with that content"""
+    ext = DERIVATIVE_SIZES[size][1].lower()
+    return f"derivatives/{sha256[:2]}/{sha256}/{size}.{ext}"
+
+
+def failure_key(sha256: str) -> str:
+    """Marker stored when a blob cannot be rendered, so it is not retried on every request"""
+    return f"derivatives/{sha256[:2]}/{sha256}/failed"
+
+
+def is_image(mime_type: Optional[str], document_type: Optional[str] = None) -> bool:
+    """Whether an upload should get derivatives"""
+    return document_type == "photo" or (mime_type or "") in IMAGE_MIME_TYPES
+
+
+def is_decode_error(exc: BaseException) -> bool:
+    """Whether a render failed because of the image content, not the worker or the host"""
+    from PIL import Image, UnidentifiedImageError
+
+    if isinstance(exc, (UnidentifiedImageError, Image.DecompressionBombError)):
+        return True
+    # Pillow reports corrupt or truncated data as a plain OSError (or SyntaxError for broken
+    # chunks); system errors carry an errno or are subclasses such as TimeoutError
+    return type(exc) in (OSError, SyntaxError) and getattr(exc, "errno", None) is None
+
+
+def render_derivatives(source_path: str, out_dir: str) -> List[Tuple[str, str]]:
+    """
+    Render every derivative size for one image (runs in a worker process)
+    Output is re-encoded from pixels only, so EXIF/GPS metadata is dropped
+    Returns (size name, output path) pairs
+    """
+    from PIL import Image, ImageOps
+
+    largest = max(edge for edge, _, _ in DERIVATIVE_SIZES.values())
+    outputs = []
+    with Image.open(source_path) as img:
+        # Let the JPEG decoder downscale by a power of two before we touch pixels
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        # Largest first, so each smaller size resamples an already-reduced image
+        for name, (edge, fmt, _) in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1][0]):
+            img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            frame = img.convert("RGB") if fmt == "JPEG" else img
+            out_path = os.path.join(out_dir, f"{name}.{fmt.lower()}")
+            options = {"quality": 82, "optimize": True} if fmt == "JPEG" else {"quality": 80, "method": 4}
+            frame.save(out_path, fmt, **options)
+            outputs.append((name, out_path))
+    return outputs
+
+
+async def _generate(sha256: str, source_key: str):
+    storage = get_storage()
+    if await storage.exists(derivative_key(sha256, "thumb")) or await storage.exists(failure_key(sha256)):
+        return
+
+    with tempfile.TemporaryDirectory(dir=TMP_DIR) as tmp_dir:
+        source_path = await fetch_local_copy(storage, source_key, tmp_dir)
+        try:
+            outputs = await run_in_process(render_derivatives, source_path, tmp_dir)
+        except Exception as e:
+            # Content never changes for a hash, so a decode failure is permanent; a broken
+            # pool, a killed worker or a timeout is not, and the next request tries again
+            if is_decode_error(e):
+                marker = Path(tmp_dir) / "failed"
+                marker.touch()
+                await storage.put_file(failure_key(sha256), marker, "text/plain")
+            raise
+        # The thumbnail is the existence marker, so store it last
+        for name, out_path in sorted(outputs, key=lambda item: item[0] == "thumb"):
+            await storage.put_file(derivative_key(sha256, name), Path(out_path), DERIVATIVE_SIZES[name][2])
+    logger.info(f"Generated image derivatives for {sha256[:12]}")
+
+
+async def delete_derivatives(sha256: str):
+    """Remove all derivatives of a blob (called when the blob itself is reclaimed)"""
+    storage = get_storage()
+    for name in DERIVATIVE_SIZES:
+        await storage.delete(derivative_key(sha256, name))
+    await storage.delete(failure_key(sha256))
+
+
+async def generate_derivatives(sha256: str, source_key: str):
+    """
+    Create all derivatives for a blob unless they already exist
+    Concurrent requests for the same hash share one render
+    """
+    task = _in_flight.get(sha256)
+    if task is None:
+        task = asyncio.ensure_future(_generate(sha256, source_key))
+        _in_flight[sha256] = task
+        task.add_done_callback(lambda _: _in_flight.pop(sha256, None))
+    try:
+        await asyncio.shield(task)
+    except Exception as e:
+        logger.warning(f"Image derivative generation failed for {sha256[:12]}: {e}")
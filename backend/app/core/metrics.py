@@ -0,0 +1,77 @@
+"""
+Lightweight in-process metrics
+Counters and gauges are kept per worker process and exposed in the
+Prometheus text format at /metrics
+"""
+from typing import Dict, Tuple
+import threading
+import time
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[str, Dict[LabelKey, float]] = {}
+_gauges: Dict[str, Dict[LabelKey, float]] = {}
+_help: Dict[str, str] = {}
+
+
+def _key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, help_text: str):
+    """Attach a HELP line to a metric"""
+    _help[name] = help_text
+
+
+def increment(name: str, value: float = 1, **labels):
+    """Add to a counter"""
+    with _lock:
+        series = _counters.setdefault(name, {})
+        key = _key(labels)
+        series[key] = series.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    """Set a gauge to a value"""
+    with _lock:
+        _gauges.setdefault(name, {})[_key(labels)] = value
+
+
+def mark_time(name: str, **labels):
+    """Set a gauge to the current Unix time"""
+    set_gauge(name, time.time(), **labels)
+
+
+def get_value(name: str, **labels) -> float:
+    """Current value of a counter or gauge (0 if unset)"""
+    key = _key(labels)
+    with _lock:
+        for store in (_counters, _gauges):
+            if name in store and key in store[name]:
+                return store[name][key]
+    return 0
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (
+        f'{k}="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in key
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for kind, store in (("counter", _counters), ("gauge", _gauges)):
+            for name in sorted(store):
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in store[name].items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,84 @@
+"""
+Shared process pool for CPU-bound work (image rendering, text extraction)
+Work on untrusted files that may hang runs in its own process instead, so
+it can be killed on timeout without losing a pool worker
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import asyncio
+import multiprocessing
+import os
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Process pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS or None)
+    return _pool
+
+
+async def run_in_process(func, *args):
+    """Run a picklable function in the process pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def _call_and_send(conn, func, args):
+    try:
+        result = (True, func(*args))
+    except Exception as e:
+        result = (False, f"{type(e).__name__}: {e}")
+    conn.send(result)
+    conn.close()
+
+
+def _receive(conn):
+    try:
+        return conn.recv()
+    except EOFError:
+        return False, "Worker process exited without a result"
+
+
+async def run_in_killable_process(func, *args, timeout: float):
+    """
+    Run a picklable function in a fresh process, killed after `timeout` seconds
+    Raises TimeoutError on timeout and RuntimeError if the function raised
+    """
+    # spawn, not fork: the server process has threads and open connections
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_call_and_send, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+    loop = asyncio.get_running_loop()
+    try:
+        ok, value = await asyncio.wait_for(loop.run_in_executor(None, _receive, receiver), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{func.__name__} did not finish in {timeout}s")
+    finally:
+        if process.is_alive():
+            process.kill()
+        # Unblocks the receiving thread if the process was killed
+        receiver.close()
+        await loop.run_in_executor(None, process.join)
+    if not ok:
+        raise RuntimeError(value)
+    return value
+
+
+def killable_process_limit() -> int:
+    """How many killable processes to run at once"""
+    return settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+
+
+def close_process_pool():
+    """Shut down the process pool"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,135 @@
+"""
+Contractor quote sources
+The contractor agent asks a pluggable source for quotes on a maintenance
+request. A real integration is any class with the same `get_quotes`
+coroutine, configured as CONTRACTOR_QUOTE_BACKEND=package.module:ClassName.
+A deterministic fake is built in for tests and local runs, but only when
+asked for with CONTRACTOR_QUOTE_BACKEND=fake; with no backend the agent
+is off.
+"""
+from dataclasses import dataclass, field
+from decimal import Decimal
+from importlib import import_module
+from typing import Collection, List, Optional
+from uuid import UUID
+import asyncio
+import logging
+import random
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuoteRequest:
+    """What a source needs to know about the job"""
+    maintenance_request_id: UUID
+    landlord_id: UUID
+    title: str
+    description: str
+    category: Optional[str]
+    priority: Optional[str]
+    address: str
+    city: str
+    state: str
+    zip_code: str
+    unit_number: Optional[str] = None
+
+
+@dataclass
+class Quote:
+    """One contractor's offer, in contractor_quotes column names"""
+    contractor_name: str
+    quote_amount: Decimal
+    contractor_phone: Optional[str] = None
+    contractor_email: Optional[str] = None
+    contractor_address: Optional[str] = None
+    contractor_rating: Optional[Decimal] = None
+    contractor_review_count: Optional[int] = None
+    quote_notes: Optional[str] = None
+    availability: Optional[str] = None
+    negotiation_messages: List[dict] = field(default_factory=list)
+
+
+class QuoteSourceError(Exception):
+    """The source could not produce quotes; the attempt is retried"""
+
+
+# Typical call-out prices by category for the fake source
+FAKE_BASE_PRICES = {
+    "plumbing": 250, "electrical": 300, "hvac": 450, "appliance": 200,
+    "roofing": 900, "pest": 150, "locksmith": 120, "painting": 400,
+}
+FAKE_PRIORITY_FACTORS = {"low": 0.9, "medium": 1.0, "high": 1.25, "emergency": 1.75}
+FAKE_CONTRACTORS = (
+    "Acme Repair Co", "Reliable Home Services", "Handy Pros", "Summit Maintenance",
+    "Bluewater Plumbing & Heating", "Brightline Electric", "Keystone Contractors",
+)
+
+
+class FakeQuoteSource:
+    """Deterministic quotes seeded by request id, with optional latency and failures"""
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, fail_ids: Collection[UUID] = ()):
+        self.latency = latency
+        self.fail_ids = set(fail_ids)
+        self.calls = 0
+
+    async def get_quotes(self, request: QuoteRequest, count: int) -> List[Quote]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.maintenance_request_id in self.fail_ids:
+            raise QuoteSourceError(f"Fake failure for {request.maintenance_request_id}")
+
+        rng = random.Random(str(request.maintenance_request_id))
+        base = FAKE_BASE_PRICES.get((request.category or "").lower(), 275)
+        factor = FAKE_PRIORITY_FACTORS.get(request.priority or "medium", 1.0)
+        quotes = []
+        for name in rng.sample(FAKE_CONTRACTORS, min(count, len(FAKE_CONTRACTORS))):
+            slug = name.lower().replace(" & ", "-").replace(" ", "-")
+            quotes.append(Quote(
+                contractor_name=name,
+                quote_amount=Decimal(str(round(base * factor * rng.uniform(0.7, 1.5), 2))),
+                contractor_phone=f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                contractor_email=f"quotes@{slug}.example",
+                contractor_address=f"{request.city}, {request.state}",
+                contractor_rating=Decimal(str(round(rng.uniform(3.5, 5.0), 2))),
+                contractor_review_count=rng.randint(5, 400),
+                quote_notes=f"Estimate for: {request.title}",
+                availability=rng.choice(("Today", "Tomorrow", "Within 3 days", "Next week")),
+            ))
+        return quotes
+
+
+_source = None
+
+
+def quote_source_configured() -> bool:
+    """Whether the contractor agent has a source to ask"""
+    return _source is not None or bool(settings.CONTRACTOR_QUOTE_BACKEND)
+
+
+def get_quote_source():
+    """Configured source (created once per process)"""
+    global _source
+    if _source is None:
+        backend = settings.CONTRACTOR_QUOTE_BACKEND
+        if not backend:
+            raise RuntimeError("CONTRACTOR_QUOTE_BACKEND is not set")
+        if backend == "fake":
+            _source = FakeQuoteSource(latency=settings.CONTRACTOR_FAKE_LATENCY)
+        else:
+            module, _, name = backend.partition(":")
+            _source = getattr(import_module(module), name)()
+        logger.info(f"Contractor quote source: {backend}")
+    return _source
+
+
+def set_quote_source(source):
+    """Swap the source, e.g. for a FakeQuoteSource in tests"""
+    global _source
+    _source = source
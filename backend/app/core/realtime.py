@@ -0,0 +1,222 @@
+"""
+Real-time notification delivery
+Each new notification is appended to a short per-user Redis stream (for
+Last-Event-ID replay) and published on a per-user pub/sub channel. Every
+worker keeps one pub/sub connection and fans messages out to its local
+SSE clients, subscribing to a user's channel only while that user has a
+connection open on the worker
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+
+from app.core.config import settings
+from app.core import redis_client as cache
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("sse_connections", "Open SSE connections on this worker")
+metrics.describe("sse_events_sent_total", "Notification events written to SSE clients")
+metrics.describe("sse_slow_clients_total", "SSE clients disconnected because their queue overflowed")
+
+
+def channel_name(user_id) -> str:
+    return f"notifications:{user_id}"
+
+
+def stream_key(user_id) -> str:
+    return f"notifications:events:{user_id}"
+
+
+def _ticket_key(ticket: str) -> str:
+    return f"notifications:ticket:{hashlib.sha256(ticket.encode()).hexdigest()}"
+
+
+async def issue_stream_ticket(user_id) -> str:
+    """
+    Single-use ticket that opens one SSE stream; EventSource cannot send an
+    Authorization header, and a ticket in the URL is harmless once used or expired
+    """
+    ticket = secrets.token_urlsafe(32)
+    await cache.redis_client.set(_ticket_key(ticket), str(user_id), ex=settings.SSE_TICKET_TTL)
+    return ticket
+
+
+async def redeem_stream_ticket(ticket: str) -> Optional[UUID]:
+    """User id of a valid ticket, consuming it; None if unknown, used or expired"""
+    user_id = await cache.redis_client.getdel(_ticket_key(ticket))
+    return UUID(user_id) if user_id else None
+
+
+def parse_event_id(event_id: str) -> Tuple[int, int]:
+    """Order-comparable form of a Redis stream id ("ms-seq")"""
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def notification_payload(row) -> dict:
+    """JSON-safe event body for a notification row, ORM object or mapping"""
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name, None)
+    created_at = get("created_at")
+    return {
+        "id": str(get("id")),
+        "user_id": str(get("user_id")),
+        "title": get("title"),
+        "message": get("message"),
+        "type": get("type"),
+        "action_url": get("action_url"),
+        "read": bool(get("read")),
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+async def publish_notifications(rows: Iterable) -> int:
+    """
+    Record and publish notification events for connected clients
+    Two pipelined round trips per call regardless of the number of rows
+    Returns how many events were published
+    """
+    client = cache.redis_client
+    payloads = [notification_payload(row) for row in rows]
+    if not client or not payloads:
+        return 0
+
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                key = stream_key(payload["user_id"])
+                pipe.xadd(key, {"data": json.dumps(payload)}, maxlen=settings.SSE_REPLAY_LENGTH, approximate=True)
+                pipe.expire(key, settings.SSE_REPLAY_TTL)
+            results = await pipe.execute()
+
+        async with client.pipeline(transaction=False) as pipe:
+            for payload, event_id in zip(payloads, results[::2]):
+                pipe.publish(channel_name(payload["user_id"]), json.dumps({"id": event_id, "data": payload}))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Notification publish error: {e}")
+        return 0
+    return len(payloads)
+
+
+async def replay_events(user_id, last_event_id: str) -> List[Tuple[str, dict]]:
+    """Events recorded after last_event_id, oldest first"""
+    client = cache.redis_client
+    if not client:
+        return []
+    try:
+        entries = await client.xrange(
+            stream_key(user_id), min=f"({last_event_id}", max="+", count=settings.SSE_REPLAY_LENGTH
+        )
+    except Exception as e:
+        logger.warning(f"Notification replay error: {e}")
+        return []
+    return [(event_id, json.loads(fields["data"])) for event_id, fields in entries]
+
+
+class Subscriber:
+    """One SSE connection; None on the queue means the stream must end"""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_CLIENT_QUEUE_SIZE)
+
+    def end(self):
+        """Discard anything queued and tell the stream to finish"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class NotificationHub:
+    """Per-worker fan-out from Redis pub/sub to local SSE connections"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    async def subscribe(self, user_id) -> Subscriber:
+        user_id = str(user_id)
+        subscriber = Subscriber(user_id)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = cache.redis_client.pubsub()
+                self._reader = asyncio.create_task(self._read(), name="notification-hub")
+            if user_id not in self._subscribers:
+                await self._pubsub.subscribe(channel_name(user_id))
+                self._subscribers[user_id] = set()
+            self._subscribers[user_id].add(subscriber)
+        metrics.set_gauge("sse_connections", self.connection_count)
+        return subscriber
+
+    async def unsubscribe(self, subscriber: Subscriber):
+        async with self._lock:
+            subs = self._subscribers.get(subscriber.user_id)
+            if subs is not None:
+                subs.discard(subscriber)
+                if not subs:
+                    del self._subscribers[subscriber.user_id]
+                    try:
+                        await self._pubsub.unsubscribe(channel_name(subscriber.user_id))
+                    except Exception as e:
+                        logger.warning(f"Notification unsubscribe error: {e}")
+        metrics.set_gauge("sse_connections", self.connection_count)
+
+    def _dispatch(self, channel: str, data: str):
+        user_id = channel.rpartition(":")[2]
+        subs = self._subscribers.get(user_id)
+        if not subs:
+            return
+        event = json.loads(data)
+        for subscriber in list(subs):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # End the stream; the client reconnects with Last-Event-ID
+                # and catches up from the replay stream
+                subscriber.end()
+                subs.discard(subscriber)
+                metrics.increment("sse_slow_clients_total")
+
+    async def _read(self):
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message["type"] == "message":
+                    self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification hub read error: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        """Stop the reader and end every open stream"""
+        if self._reader:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        for subs in self._subscribers.values():
+            for subscriber in subs:
+                subscriber.end()
+        self._subscribers.clear()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+hub = NotificationHub()
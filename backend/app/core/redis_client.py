@@ -78,6 +78,35 @@ async def set_cache(key: str, value: any, ttl: int = None):
         return False
 
 
+async def get_cache_field(key: str, field: str):
+    """Get one field of a cached hash (several variants cached under one key)"""
+    if not redis_client:
+        return None
+    try:
+        value = await redis_client.hget(key, field)
+        if value:
+            return json.loads(value)
+        return None
+    except Exception as e:
+        logger.warning(f"Cache get error: {e}")
+        return None
+
+
+async def set_cache_field(key: str, field: str, value: any, ttl: int = None):
+    """Set one field of a cached hash; the whole hash expires after ttl"""
+    if not redis_client:
+        return False
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, field, json.dumps(value, default=str))
+            pipe.expire(key, ttl or settings.REDIS_TTL)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Cache set error: {e}")
+        return False
+
+
 async def delete_cache(key: str):
     """Delete value from cache"""
     if not redis_client:
@@ -90,6 +119,18 @@ async def delete_cache(key: str):
         return False
 
 
+async def delete_cache_keys(keys):
+    """Delete many exact keys in one round trip"""
+    if not redis_client or not keys:
+        return False
+    try:
+        await redis_client.delete(*keys)
+        return True
+    except Exception as e:
+        logger.warning(f"Cache delete error: {e}")
+        return False
+
+
 async def delete_cache_pattern(pattern: str):
     """Delete all keys matching pattern"""
     if not redis_client:
@@ -103,3 +144,18 @@ async def delete_cache_pattern(pattern: str):
         logger.warning(f"Cache pattern delete error: {e}")
         return False
 
+
+
+# Per-landlord portfolio reports cached whole; dropped on lease or payment changes
+REPORT_CACHES = ("forecast", "occupancy")
+
+
+def report_cache_key(kind: str, user_id) -> str:
+    return f"reports:{user_id}:{kind}"
+
+
+async def delete_report_caches(user_ids):
+    """Drop every cached report of these users (ids that have none are harmless)"""
+    return await delete_cache_keys([
+        report_cache_key(kind, user_id) for user_id in set(user_ids) for kind in REPORT_CACHES
+    ])
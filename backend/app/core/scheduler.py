@@ -0,0 +1,95 @@
+"""
+In-process scheduler for background jobs
+Every uvicorn worker runs the loops; jobs marked singleton take a
+Postgres advisory lock so only one worker executes them at a time
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+import logging
+import time
+import zlib
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """A coroutine function run every `interval` seconds"""
+    name: str
+    func: Callable[[], Awaitable]
+    interval: float
+    singleton: bool = False
+
+
+_jobs: Dict[str, Job] = {}
+_tasks: List[asyncio.Task] = []
+
+
+def register_job(name: str, func: Callable[[], Awaitable], interval: float, singleton: bool = False):
+    """Register a periodic job; call before start_scheduler()"""
+    _jobs[name] = Job(name=name, func=func, interval=interval, singleton=singleton)
+
+
+def _lock_key(name: str) -> int:
+    """Stable advisory lock key for a job name"""
+    return zlib.crc32(f"leasewell:job:{name}".encode())
+
+
+async def run_job_once(job: Job) -> bool:
+    """Run a job now; returns False if a singleton job is held by another worker"""
+    if not job.singleton:
+        await job.func()
+        return True
+
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": _lock_key(job.name)})
+        await conn.commit()
+        if not acquired:
+            return False
+        try:
+            await job.func()
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _lock_key(job.name)})
+            await conn.commit()
+    return True
+
+
+async def _loop(job: Job):
+    while True:
+        started = time.perf_counter()
+        try:
+            ran = await run_job_once(job)
+            if ran:
+                elapsed = time.perf_counter() - started
+                metrics.increment("job_runs_total", job=job.name)
+                metrics.set_gauge("job_last_duration_seconds", elapsed, job=job.name)
+                metrics.mark_time("job_last_success_timestamp", job=job.name)
+                logger.debug(f"Job {job.name} finished in {elapsed:.2f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.increment("job_failures_total", job=job.name)
+            logger.error(f"Job {job.name} failed: {e}", exc_info=True)
+        await asyncio.sleep(job.interval)
+
+
+def start_scheduler():
+    """Start a loop task for every registered job"""
+    for job in _jobs.values():
+        _tasks.append(asyncio.create_task(_loop(job), name=f"job:{job.name}"))
+    if _jobs:
+        logger.info(f"Scheduler started: {', '.join(_jobs)}")
+
+
+async def stop_scheduler():
+    """Cancel all job loops and wait for them to exit"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
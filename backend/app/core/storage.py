@@ -0,0 +1,253 @@
+"""
+Pluggable file storage (local filesystem or S3)
+Selected by settings.STORAGE_TYPE; blocking I/O runs in the thread pool
+"""
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+import logging
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def content_disposition(file_name: str, inline: bool = True) -> str:
+    """Content-Disposition header value that survives non-ASCII names"""
+    disposition = "inline" if inline else "attachment"
+    fallback = file_name.encode("ascii", "ignore").decode().replace('"', "") or "download"
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name)}"
+
+
+class StorageBackend:
+    """Interface shared by all storage backends; keys are relative paths"""
+
+    name = "base"
+
+    async def put_file(self, key: str, local_path: Path, content_type: Optional[str] = None):
+        """Store a local file under key (the local file is consumed)"""
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    def iter_chunks(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Yield the bytes of [start, end] (inclusive) in chunks"""
+        raise NotImplementedError
+
+    async def presigned_url(
+        self,
+        key: str,
+        file_name: Optional[str] = None,
+        content_type: Optional[str] = None,
+        expires_in: int = 300
+    ) -> Optional[str]:
+        """Short-lived direct download URL, if the backend supports one"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Files under a root directory on the local filesystem"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def _put(self, key: str, local_path: Path):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(local_path, target)
+
+    async def put_file(self, key: str, local_path: Path, content_type: Optional[str] = None):
+        await run_in_threadpool(self._put, key, local_path)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self.path(key).exists)
+
+    async def size(self, key: str) -> int:
+        return (await run_in_threadpool(self.path(key).stat)).st_size
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self.path(key).unlink, missing_ok=True)
+
+    async def iter_chunks(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        f = await run_in_threadpool(open, self.path(key), "rb")
+        try:
+            await run_in_threadpool(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                to_read = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await run_in_threadpool(f.read, to_read)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(f.close)
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3 bucket (or an S3-compatible endpoint such as MinIO)
+    Large files use parallel multipart upload; one client is shared so
+    HTTP connections are pooled and reused across requests
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        region: str,
+        endpoint_url: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None
+    ):
+        import boto3
+        from botocore.config import Config
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            region_name=region,
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            config=Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            ),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+            use_threads=True,
+        )
+
+    def _put(self, key: str, local_path: Path, content_type: Optional[str]):
+        extra_args = {"ContentType": content_type} if content_type else None
+        try:
+            self.client.upload_file(
+                str(local_path),
+                self.bucket,
+                key,
+                ExtraArgs=extra_args,
+                Config=self.transfer_config,
+            )
+        finally:
+            Path(local_path).unlink(missing_ok=True)
+
+    async def put_file(self, key: str, local_path: Path, content_type: Optional[str] = None):
+        await run_in_threadpool(self._put, key, local_path, content_type)
+
+    def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self._head, key) is not None
+
+    async def size(self, key: str) -> int:
+        head = await run_in_threadpool(self._head, key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head["ContentLength"]
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def presigned_url(self, key, file_name=None, content_type=None, expires_in=300):
+        params = {"Bucket": self.bucket, "Key": key}
+        if file_name:
+            params["ResponseContentDisposition"] = content_disposition(file_name)
+        if content_type:
+            params["ResponseContentType"] = content_type
+        # Signing is local (no network call), so it is safe on the event loop
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in
+        )
+
+    def _get(self, key: str, byte_range: str) -> dict:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)
+        except ClientError as e:
+            # Same contract as LocalStorage, so callers handle one exception
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(key) from e
+            raise
+
+    async def iter_chunks(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await run_in_threadpool(self._get, key, byte_range)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await run_in_threadpool(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+
+async def fetch_local_copy(storage: StorageBackend, key: str, tmp_dir: str) -> str:
+    """Local path for a stored object, downloading it if the backend is remote"""
+    if isinstance(storage, LocalStorage):
+        return str(storage.path(key))
+    local_path = os.path.join(tmp_dir, os.path.basename(key))
+    with open(local_path, "wb") as f:
+        async for chunk in storage.iter_chunks(key):
+            await run_in_threadpool(f.write, chunk)
+    return local_path
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Get the configured storage backend (created once per process)"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_TYPE == "s3":
+            _storage = S3Storage(
+                bucket=settings.S3_BUCKET,
+                region=settings.AWS_REGION,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                access_key=settings.AWS_ACCESS_KEY_ID,
+                secret_key=settings.AWS_SECRET_ACCESS_KEY,
+            )
+        else:
+            _storage = LocalStorage(settings.UPLOAD_DIR)
+        logger.info(f"Using {_storage.name} storage backend")
+    return _storage
@@ -0,0 +1,165 @@
+"""
+Per-user unread notification counters kept in Redis
+A missing key means "unknown": writers only adjust counters that exist,
+and the next read seeds the key from Postgres. Adjustments run as Lua
+scripts so concurrent increments and decrements never race
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core import redis_client as cache
+from app.core import metrics
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "notifications:unread:"
+
+metrics.describe("unread_counters_checked_total", "Unread counters compared against Postgres")
+metrics.describe("unread_counters_repaired_total", "Unread counters dropped because they drifted")
+
+# Add a delta to an existing counter, never going below zero
+_ADJUST = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return nil
+end
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if value < 0 then
+  redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+  value = 0
+end
+return value
+"""
+
+# Delete a counter only if nobody changed it since it was read
+_DELETE_IF_UNCHANGED = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def counter_key(user_id) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+async def _count_from_db(db: AsyncSession, user_ids: List) -> Dict[str, int]:
+    result = await db.execute(
+        select(Notification.user_id, func.count())
+        .where(Notification.user_id.in_(user_ids), Notification.read == False)
+        .group_by(Notification.user_id)
+    )
+    return {str(user_id): count for user_id, count in result.all()}
+
+
+async def get_unread_count(user_id, db: Optional[AsyncSession] = None) -> Optional[int]:
+    """
+    Unread count from Redis; on a cold key, counts in Postgres and seeds it
+    if a session is given. Returns None when the count is unknown
+    """
+    client = cache.redis_client
+    if client:
+        try:
+            value = await client.get(counter_key(user_id))
+            if value is not None:
+                return int(value)
+        except Exception as e:
+            logger.warning(f"Unread counter read error: {e}")
+            client = None
+
+    if db is None:
+        return None
+
+    count = (await _count_from_db(db, [user_id])).get(str(user_id), 0)
+    if client:
+        try:
+            # NX: a counter seeded concurrently is at least as fresh as ours
+            await client.set(counter_key(user_id), count, ex=settings.UNREAD_COUNTER_TTL, nx=True)
+        except Exception as e:
+            logger.warning(f"Unread counter seed error: {e}")
+    return count
+
+
+async def adjust_unread(deltas: Dict) -> None:
+    """Apply {user_id: delta} to existing counters in one pipelined round trip"""
+    client = cache.redis_client
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not client or not deltas:
+        return
+    try:
+        script = client.register_script(_ADJUST)
+        async with client.pipeline(transaction=False) as pipe:
+            for user_id, delta in deltas.items():
+                await script(keys=[counter_key(user_id)], args=[delta], client=pipe)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Unread counter update error: {e}")
+
+
+async def increment_unread(user_ids: Iterable) -> None:
+    """One increment per id, e.g. the user_id of every inserted notification"""
+    await adjust_unread(Counter(str(user_id) for user_id in user_ids))
+
+
+async def decrement_unread(user_id, amount: int = 1) -> None:
+    await adjust_unread({str(user_id): -amount})
+
+
+async def reset_unread(user_id) -> None:
+    """Set a counter to zero after everything was marked read"""
+    client = cache.redis_client
+    if not client:
+        return
+    try:
+        await client.set(counter_key(user_id), 0, ex=settings.UNREAD_COUNTER_TTL)
+    except Exception as e:
+        logger.warning(f"Unread counter reset error: {e}")
+
+
+async def reconcile_unread_counters(db: AsyncSession, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Compare every live counter with Postgres and drop the ones that drifted,
+    so their next read reseeds them. A counter that changed while it was
+    being checked is left alone; the next run will look at it again
+    """
+    client = cache.redis_client
+    checked = repaired = 0
+    if not client:
+        return {"checked": 0, "repaired": 0}
+
+    script = client.register_script(_DELETE_IF_UNCHANGED)
+    keys = []
+
+    async def check(keys):
+        nonlocal checked, repaired
+        values = await client.mget(keys)
+        user_ids = [key[len(KEY_PREFIX):] for key in keys]
+        actual = await _count_from_db(db, user_ids)
+        await db.rollback()  # don't hold a snapshot between batches
+        async with client.pipeline(transaction=False) as pipe:
+            drifted = 0
+            for key, user_id, value in zip(keys, user_ids, values):
+                if value is not None and int(value) != actual.get(user_id, 0):
+                    await script(keys=[key], args=[value], client=pipe)
+                    drifted += 1
+            results = await pipe.execute() if drifted else []
+        checked += len(keys)
+        repaired += sum(1 for deleted in results if deleted)
+
+    async for key in client.scan_iter(match=f"{KEY_PREFIX}*", count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            await check(keys)
+            keys = []
+    if keys:
+        await check(keys)
+
+    metrics.increment("unread_counters_checked_total", checked)
+    metrics.increment("unread_counters_repaired_total", repaired)
+    return {"checked": checked, "repaired": repaired}
@@ -4,14 +4,28 @@ Optimized for performance and scalability
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
+from app.core.compression import SelectiveGZipMiddleware
 from app.core.database import init_db, close_db
 from app.core.redis_client import init_redis, close_redis
+from app.core.process_pool import close_process_pool
+from app.core.scheduler import register_job, start_scheduler, stop_scheduler
+from app.core.metrics import render_prometheus
+from app.core.realtime import hub
+from app.core.quote_sources import quote_source_configured
+from app.services.text_extraction import extract_pending_documents
+from app.services.email_outbox import deliver_pending_emails
+from app.services.expiry_sweeper import sweep_expired
+from app.services.unread_counters import repair_unread_counters
+from app.services.notification_retention import apply_notification_retention
+from app.services.rent_roll import run_rent_roll
+from app.services.late_fees import run_late_fees
+from app.services.stripe_events import process_stripe_events
+from app.services.contractor_agent import run_contractor_agent
 from app.api.v1.router import api_router
 
 # Configure logging
@@ -29,12 +43,27 @@ async def lifespan(app: FastAPI):
     logger.info("Starting LeaseWell API...")
     await init_db()
     await init_redis()
+    if settings.BACKGROUND_JOBS_ENABLED:
+        register_job("extract_document_text", extract_pending_documents, settings.TEXT_EXTRACTION_INTERVAL)
+        register_job("deliver_emails", deliver_pending_emails, settings.EMAIL_OUTBOX_INTERVAL)
+        register_job("expiry_sweeper", sweep_expired, settings.SWEEPER_INTERVAL, singleton=True)
+        register_job("repair_unread_counters", repair_unread_counters, settings.UNREAD_RECONCILE_INTERVAL, singleton=True)
+        register_job("notification_retention", apply_notification_retention, settings.NOTIFICATION_RETENTION_INTERVAL, singleton=True)
+        register_job("rent_roll", run_rent_roll, settings.RENT_ROLL_INTERVAL, singleton=True)
+        register_job("late_fees", run_late_fees, settings.LATE_FEE_INTERVAL, singleton=True)
+        register_job("stripe_events", process_stripe_events, settings.STRIPE_EVENT_INTERVAL)
+        if quote_source_configured():
+            register_job("contractor_agent", run_contractor_agent, settings.CONTRACTOR_AGENT_INTERVAL)
+        start_scheduler()
     logger.info("LeaseWell API started successfully")
     yield
     # Shutdown
     logger.info("Shutting down LeaseWell API...")
+    await stop_scheduler()
+    await hub.close()
     await close_db()
     await close_redis()
+    close_process_pool()
     logger.info("LeaseWell API shut down")
 
 
@@ -56,7 +85,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=1000,
+    exclude_paths=(
+        r"/api/v1/documents/[^/]+/content",  # byte ranges of already-compressed media
+        r"/api/v1/documents/export",  # ZIP members are already compressed where useful
+        r"/api/v1/notifications/stream",  # SSE events must not wait in a compression buffer
+    ),
+)
 
 # Include routers
 app.include_router(api_router, prefix="/api/v1")
@@ -88,6 +125,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
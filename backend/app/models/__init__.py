@@ -2,10 +2,17 @@ from app.models.user import User, Profile
 from app.models.property import Property
 from app.models.lease import Lease
 from app.models.maintenance import MaintenanceRequest
+from app.models.contractor_quote import ContractorQuote
 from app.models.payment import Payment
+from app.models.payment_rollup import PaymentMonthlyRollup
+from app.models.transaction import Transaction
 from app.models.document import Document
-from app.models.notification import Notification
+from app.models.blob import DocumentBlob
+from app.models.notification import Notification, NotificationArchive
 from app.models.invitation import Invitation, InvitationStatus
+from app.models.email_outbox import EmailOutbox
+from app.models.stripe_event import StripeEvent
+from app.models.idempotency_key import IdempotencyKey
 
 __all__ = [
     "User",
@@ -13,10 +20,18 @@ __all__ = [
     "Property",
     "Lease",
     "MaintenanceRequest",
+    "ContractorQuote",
     "Payment",
+    "PaymentMonthlyRollup",
+    "Transaction",
     "Document",
+    "DocumentBlob",
     "Notification",
+    "NotificationArchive",
     "Invitation",
     "InvitationStatus",
+    "EmailOutbox",
+    "StripeEvent",
+    "IdempotencyKey",
 ]
 
@@ -0,0 +1,22 @@
+"""
+Document blob model (content-addressed storage)
+"""
+from sqlalchemy import Column, String, BigInteger, Integer, DateTime, Text, CheckConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class DocumentBlob(Base):
+    """Deduplicated file content, keyed by SHA-256 and reference counted"""
+    __tablename__ = "document_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    file_path = Column(Text, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mime_type = Column(String(100))
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        CheckConstraint("ref_count >= 0", name="check_blob_ref_count"),
+    )
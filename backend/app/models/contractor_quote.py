@@ -0,0 +1,38 @@
+"""
+Contractor quote model
+"""
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Text, JSON, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+
+
+class ContractorQuote(Base):
+    """Quote collected by the contractor agent for a maintenance request"""
+    __tablename__ = "contractor_quotes"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    maintenance_request_id = Column(
+        UUID(as_uuid=True), ForeignKey("maintenance_requests.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    contractor_name = Column(Text, nullable=False)
+    contractor_phone = Column(Text)
+    contractor_email = Column(Text)
+    contractor_address = Column(Text)
+    contractor_rating = Column(Numeric(3, 2))
+    contractor_review_count = Column(Integer)
+    quote_amount = Column(Numeric(10, 2), nullable=False)
+    quote_notes = Column(Text)
+    availability = Column(Text)
+    status = Column(String(20), default="received", index=True)  # pending, received, accepted, rejected
+    negotiation_messages = Column(JSON, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'received', 'accepted', 'rejected')",
+            name="check_contractor_quote_status"
+        ),
+    )
@@ -1,9 +1,9 @@
 """
 Document model
 """
-from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Text, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Text, CheckConstraint, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
@@ -19,10 +19,20 @@ class Document(Base):
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True)
     file_name = Column(String(255), nullable=False)
     file_path = Column(Text, nullable=False)
+    content_hash = Column(String(64), index=True)  # SHA-256, references document_blobs
     file_size = Column(BigInteger)
     mime_type = Column(String(100))
     document_type = Column(String(50))  # lease, inspection, insurance, receipt, photo, other
     description = Column(Text)
+    extracted_text = deferred(Column(Text))  # Filled in by the text extraction worker
+    text_extracted_at = Column(DateTime(timezone=True))
+    text_claimed_at = Column(DateTime(timezone=True))  # Set while a worker extracts the text
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(file_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(extracted_text, '')), 'C')",
+        persisted=True
+    )))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     __table_args__ = (
@@ -30,6 +40,7 @@ class Document(Base):
             "document_type IN ('lease', 'inspection', 'insurance', 'receipt', 'photo', 'other')",
             name="check_document_type"
         ),
+        Index("idx_documents_search", "search_vector", postgresql_using="gin"),
     )
     
     # Relationships
@@ -0,0 +1,41 @@
+"""
+Email outbox model
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+
+
+class EmailOutbox(Base):
+    """Transactional email waiting for (or past) delivery by the outbox worker"""
+    __tablename__ = "email_outbox"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html = Column(Text, nullable=False)
+    category = Column(String(50))  # password_reset, tenant_invitation
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    claimed_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    provider_message_id = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'sending', 'sent', 'failed')", name="check_email_outbox_status"),
+        Index(
+            "idx_email_outbox_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index(
+            "idx_email_outbox_sending",
+            "claimed_at",
+            postgresql_where=text("status = 'sending'")
+        ),
+    )
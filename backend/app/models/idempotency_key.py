@@ -0,0 +1,23 @@
+"""
+Idempotency key model
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a request sent with an Idempotency-Key header"""
+    __tablename__ = "idempotency_keys"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer)
+    response = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "key"),
+    )
@@ -1,9 +1,9 @@
 """
 Maintenance Request model
 """
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, Text, JSON, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Text, JSON, CheckConstraint, Computed, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
@@ -28,12 +28,35 @@ class MaintenanceRequest(Base):
     actual_cost = Column(Numeric(10, 2))
     scheduled_date = Column(DateTime(timezone=True))
     completed_date = Column(DateTime(timezone=True))
+    agent_status = Column(String(20), index=True)  # pending, shopping, completed, failed (contractor agent)
+    agent_started_at = Column(DateTime(timezone=True))
+    agent_completed_at = Column(DateTime(timezone=True))
+    agent_attempts = Column(Integer, nullable=False, default=0)
+    agent_next_attempt_at = Column(DateTime(timezone=True))
+    agent_duration_ms = Column(Integer)
+    agent_error = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+        persisted=True
+    )))
     
     __table_args__ = (
         CheckConstraint("priority IN ('low', 'medium', 'high', 'emergency')", name="check_priority"),
         CheckConstraint("status IN ('pending', 'in_progress', 'completed', 'cancelled')", name="check_status"),
+        CheckConstraint(
+            "agent_status IN ('pending', 'shopping', 'completed', 'failed')",
+            name="check_agent_status"
+        ),
+        Index("idx_maintenance_search", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_maintenance_agent_queue",
+            "landlord_id", "created_at",
+            postgresql_where=text("agent_status IN ('pending', 'shopping')")
+        ),
     )
     
     # Relationships
@@ -1,7 +1,7 @@
 """
 Notification model
 """
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON, CheckConstraint
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,7 +19,7 @@ class Notification(Base):
     type = Column(String(50))  # payment, maintenance, lease, message, system
     read = Column(Boolean, default=False, index=True)
     action_url = Column(String(500))
-    notification_data = Column(JSON, default=dict)
+    notification_data = Column("metadata", JSON, default=dict)  # "metadata" is reserved on declarative models
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     __table_args__ = (
@@ -29,3 +29,25 @@ class Notification(Base):
         ),
     )
 
+
+
+class NotificationArchive(Base):
+    """Read notifications moved out of the hot table by the retention job"""
+    __tablename__ = "notifications_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    type = Column(String(50))
+    read = Column(Boolean, default=True)
+    action_url = Column(String(500))
+    notification_data = Column("metadata", JSON, default=dict)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    archived = True
+
+    __table_args__ = (
+        Index("idx_notifications_archive_user_created", "user_id", created_at.desc()),
+    )
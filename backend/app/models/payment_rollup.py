@@ -0,0 +1,30 @@
+"""
+Payment rollup model
+"""
+from sqlalchemy import Column, Integer, Date, Numeric, DateTime, ForeignKey, PrimaryKeyConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PaymentMonthlyRollup(Base):
+    """Payment totals per landlord, property and due month (maintained by a trigger on payments)"""
+    __tablename__ = "payment_monthly_rollups"
+    
+    landlord_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)  # first day of the due month
+    payment_count = Column(Integer, nullable=False, default=0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    billed = Column(Numeric(14, 2), nullable=False, default=0)
+    collected = Column(Numeric(14, 2), nullable=False, default=0)
+    refunded = Column(Numeric(14, 2), nullable=False, default=0)
+    outstanding = Column(Numeric(14, 2), nullable=False, default=0)  # pending/late/failed amount plus late fees
+    late_fees = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint("landlord_id", "property_id", "month"),
+        Index("idx_payment_rollups_landlord_month", "landlord_id", "month"),
+    )
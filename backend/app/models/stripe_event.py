@@ -0,0 +1,35 @@
+"""
+Stripe webhook event model
+"""
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, JSON, CheckConstraint, Index, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class StripeEvent(Base):
+    """Raw Stripe webhook event, stored on receipt and processed by a worker"""
+    __tablename__ = "stripe_events"
+    
+    id = Column(String(255), primary_key=True)  # Stripe event id (evt_...), the dedupe key
+    type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    livemode = Column(Boolean, default=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, processed, ignored, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    stripe_created_at = Column(DateTime(timezone=True))
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'processed', 'ignored', 'failed')",
+            name="check_stripe_event_status"
+        ),
+        Index(
+            "idx_stripe_events_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
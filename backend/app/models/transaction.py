@@ -0,0 +1,30 @@
+"""
+Transaction model
+"""
+from sqlalchemy import Column, String, Date, Numeric, DateTime, ForeignKey, Text, Boolean, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+
+
+class Transaction(Base):
+    """Accounting ledger entry (income or expense) of a landlord"""
+    __tablename__ = "transactions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    landlord_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id"))
+    transaction_type = Column(String(20))  # income, expense
+    category = Column(String(100), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    transaction_date = Column(Date, nullable=False)
+    description = Column(Text)
+    payment_id = Column(UUID(as_uuid=True), ForeignKey("payments.id"))
+    receipt_url = Column(Text)
+    tax_deductible = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        CheckConstraint("transaction_type IN ('income', 'expense')", name="check_transaction_type"),
+    )
@@ -1,20 +1,32 @@
 from app.schemas.user import User, UserCreate, UserLogin, Profile, ProfileUpdate
 from app.schemas.property import Property, PropertyCreate, PropertyUpdate
 from app.schemas.lease import Lease, LeaseCreate, LeaseUpdate
-from app.schemas.maintenance import MaintenanceRequest, MaintenanceRequestCreate, MaintenanceRequestUpdate
-from app.schemas.payment import Payment, PaymentCreate, PaymentUpdate
+from app.schemas.maintenance import (
+    MaintenanceRequest, MaintenanceRequestCreate, MaintenanceRequestUpdate, ContractorQuote
+)
+from app.schemas.payment import Payment, PaymentCreate, PaymentUpdate, PaymentImportError, PaymentImportReport
 from app.schemas.document import Document, DocumentCreate
-from app.schemas.notification import Notification, NotificationCreate
+from app.schemas.notification import (
+    Notification, NotificationCreate, AnnouncementCreate, NotificationBatch, NotificationBatchResult
+)
 from app.schemas.dashboard import DashboardData
+from app.schemas.search import SearchResult, SearchResults
+from app.schemas.report import (
+    IncomeReport, IncomeMonth, IncomeTotals, CashFlowForecast, ForecastMonth, ForecastTotals,
+    OccupancyReport, OccupancyTotals, PropertyOccupancy,
+)
 
 __all__ = [
     "User", "UserCreate", "UserLogin", "Profile", "ProfileUpdate",
     "Property", "PropertyCreate", "PropertyUpdate",
     "Lease", "LeaseCreate", "LeaseUpdate",
-    "MaintenanceRequest", "MaintenanceRequestCreate", "MaintenanceRequestUpdate",
-    "Payment", "PaymentCreate", "PaymentUpdate",
+    "MaintenanceRequest", "MaintenanceRequestCreate", "MaintenanceRequestUpdate", "ContractorQuote",
+    "Payment", "PaymentCreate", "PaymentUpdate", "PaymentImportError", "PaymentImportReport",
     "Document", "DocumentCreate",
-    "Notification", "NotificationCreate",
+    "Notification", "NotificationCreate", "AnnouncementCreate", "NotificationBatch", "NotificationBatchResult",
     "DashboardData",
+    "SearchResult", "SearchResults",
+    "IncomeReport", "IncomeMonth", "IncomeTotals", "CashFlowForecast", "ForecastMonth", "ForecastTotals",
+    "OccupancyReport", "OccupancyTotals", "PropertyOccupancy",
 ]
 
@@ -12,6 +12,7 @@ class DocumentBase(BaseModel):
     file_path: str
     file_size: Optional[int] = None
     mime_type: Optional[str] = None
+    content_hash: Optional[str] = None
     document_type: Optional[str] = None
     description: Optional[str] = None
 
@@ -45,8 +45,31 @@ class MaintenanceRequest(MaintenanceRequestBase):
     actual_cost: Optional[Decimal] = None
     scheduled_date: Optional[datetime] = None
     completed_date: Optional[datetime] = None
+    agent_status: Optional[str] = None
+    agent_started_at: Optional[datetime] = None
+    agent_completed_at: Optional[datetime] = None
+    agent_attempts: int = 0
+    agent_error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
     model_config = {"from_attributes": True}
 
+
+class ContractorQuote(BaseModel):
+    id: UUID
+    maintenance_request_id: UUID
+    contractor_name: str
+    contractor_phone: Optional[str] = None
+    contractor_email: Optional[str] = None
+    contractor_address: Optional[str] = None
+    contractor_rating: Optional[Decimal] = None
+    contractor_review_count: Optional[int] = None
+    quote_amount: Decimal
+    quote_notes: Optional[str] = None
+    availability: Optional[str] = None
+    status: Optional[str] = "received"
+    created_at: datetime
+    
+    model_config = {"from_attributes": True}
+
@@ -1,8 +1,8 @@
 """
 Notification schemas
 """
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, AliasChoices
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
 
@@ -12,7 +12,8 @@ class NotificationBase(BaseModel):
     message: str
     type: Optional[str] = None
     action_url: Optional[str] = None
-    metadata: Dict[str, Any] = {}
+    # The ORM attribute is notification_data ("metadata" is taken on models)
+    metadata: Optional[Dict[str, Any]] = Field(default={}, validation_alias=AliasChoices("notification_data", "metadata"))
 
 
 class NotificationCreate(NotificationBase):
@@ -23,7 +24,27 @@ class Notification(NotificationBase):
     id: UUID
     user_id: UUID
     read: bool = False
+    archived: bool = False
     created_at: datetime
     
     model_config = {"from_attributes": True}
 
+
+
+class AnnouncementCreate(BaseModel):
+    property_ids: List[UUID]
+    title: str
+    message: str
+    action_url: Optional[str] = None
+
+
+class NotificationBatch(BaseModel):
+    read: List[UUID] = []
+    unread: List[UUID] = []
+    delete: List[UUID] = []
+
+
+class NotificationBatchResult(BaseModel):
+    marked_read: int = 0
+    marked_unread: int = 0
+    deleted: int = 0
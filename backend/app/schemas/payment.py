@@ -2,7 +2,7 @@
 Payment schemas
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from uuid import UUID
 from decimal import Decimal
@@ -44,3 +44,20 @@ class Payment(PaymentBase):
     
     model_config = {"from_attributes": True}
 
+
+
+class PaymentImportError(BaseModel):
+    row: int  # 1-based data row (CSV header excluded)
+    errors: List[str]
+
+
+class PaymentImportReport(BaseModel):
+    total_rows: int = 0
+    valid_rows: int = 0
+    inserted: int = 0  # on a dry run, the rows that would be inserted
+    skipped_duplicates: int = 0
+    error_count: int = 0
+    errors: List[PaymentImportError] = []  # first IMPORT_MAX_ERRORS only
+    dry_run: bool = False
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
@@ -0,0 +1,86 @@
+"""
+Report schemas
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+from uuid import UUID
+from decimal import Decimal
+
+
+class IncomeTotals(BaseModel):
+    payment_count: int = 0
+    paid_count: int = 0
+    late_count: int = 0
+    billed: Decimal = Decimal("0.00")
+    collected: Decimal = Decimal("0.00")
+    refunded: Decimal = Decimal("0.00")
+    outstanding: Decimal = Decimal("0.00")  # arrears: unpaid amount plus late fees
+    late_fees: Decimal = Decimal("0.00")
+    collection_rate: Optional[float] = None  # collected / billed
+
+
+class IncomeMonth(IncomeTotals):
+    property_id: UUID
+    address: str
+    month: date
+
+
+class IncomeReport(BaseModel):
+    start: date
+    end: date
+    months: List[IncomeMonth] = []
+    totals: IncomeTotals
+
+
+class ForecastTotals(BaseModel):
+    contracted: float = 0.0  # rent due under current leases, prorated by days
+    expected: float = 0.0  # contracted minus at_risk
+    at_risk: float = 0.0  # contracted rent weighted by each tenant's late rate
+    vacancy_loss: float = 0.0  # rent of leases that end without a follow-up lease
+
+
+class ForecastMonth(ForecastTotals):
+    month: date
+    active_leases: int = 0
+    leases_ending: int = 0
+
+
+class CashFlowForecast(BaseModel):
+    start: date
+    generated_at: datetime
+    months: List[ForecastMonth] = []
+    totals: ForecastTotals
+
+
+class OccupancyTotals(BaseModel):
+    properties: int = 0
+    available_days: int = 0  # properties x days in range
+    occupied_days: int = 0
+    vacant_days: int = 0
+    occupancy_rate: Optional[float] = None
+    move_ins: int = 0  # leases starting in the range
+    move_outs: int = 0  # leases ending before the range end
+    turnover_rate: Optional[float] = None  # move_outs per property
+
+
+class PropertyOccupancy(BaseModel):
+    property_id: UUID
+    address: str
+    unit_number: Optional[str] = None
+    occupied_days: int
+    vacant_days: int
+    occupancy_rate: float
+    vacancy_spells: int  # separate vacant stretches in the range
+    move_ins: int
+    move_outs: int
+
+
+class OccupancyReport(BaseModel):
+    start: date
+    end: date
+    days: int
+    totals: OccupancyTotals
+    properties: List[PropertyOccupancy] = []  # lowest occupancy first
+    limit: int
+    offset: int
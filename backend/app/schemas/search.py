@@ -0,0 +1,24 @@
+"""
+Search schemas
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class SearchResult(BaseModel):
+    kind: str  # document or maintenance
+    id: UUID
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+    created_at: datetime
+
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchResult] = []
+    limit: int
+    offset: int
+    has_more: bool = False
@@ -0,0 +1,2 @@
+# Background services and batch jobs
+
@@ -0,0 +1,185 @@
+"""
+Portfolio cash-flow forecast
+Loads a landlord's leases and per-tenant payment history as columns and
+projects rent per month for the next FORECAST_MAX_MONTHS months with
+NumPy (leases x months arrays):
+  contracted   rent under current leases, prorated by days covered
+  at_risk      contracted rent weighted by the tenant's historical late rate
+  expected     contracted - at_risk
+  vacancy_loss rent lost after a lease ends with no follow-up lease
+Late rates are smoothed toward the portfolio rate, so tenants with little
+history are not scored 0% or 100%. Results are cached per landlord and
+dropped on lease or payment changes (see redis_client.delete_report_caches).
+"""
+from datetime import date, datetime, timezone
+from typing import Dict, Optional
+from uuid import UUID
+import logging
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis_client import get_cache, set_cache, report_cache_key
+from app.core import metrics
+from app.schemas.report import CashFlowForecast, ForecastMonth, ForecastTotals
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("forecast_computations_total", "Cash-flow forecasts computed (cache misses)")
+
+# Leases still producing rent in the horizon; `renewed` means the property has a later lease
+LEASES_SQL = """
+SELECT l.tenant_id, l.monthly_rent, l.start_date, l.end_date,
+       EXISTS (
+         SELECT 1 FROM leases n
+         WHERE n.property_id = l.property_id AND n.id <> l.id
+           AND n.status IN ('active', 'pending') AND n.start_date > l.end_date
+       ) AS renewed
+FROM leases l
+WHERE l.landlord_id = :landlord_id
+  AND l.status IN ('active', 'pending')
+  AND l.end_date >= :horizon_start
+"""
+
+# A payment counts as late if it was marked late/failed, is still unpaid
+# past due, or was paid after the grace period
+TENANT_HISTORY_SQL = """
+SELECT tenant_id,
+       count(*) AS due,
+       count(*) FILTER (
+         WHERE status IN ('late', 'failed')
+            OR (status = 'pending' AND due_date < :today)
+            OR (status = 'paid' AND payment_date > due_date + :grace_days)
+       ) AS late
+FROM payments
+WHERE landlord_id = :landlord_id
+  AND due_date < :today
+  AND due_date >= :history_start
+GROUP BY tenant_id
+"""
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def late_rates(due: np.ndarray, late: np.ndarray):
+    """Per-tenant late rates smoothed toward the portfolio rate, and that portfolio rate"""
+    total_due = due.sum()
+    prior = late.sum() / total_due if total_due else settings.FORECAST_DEFAULT_LATE_RATE
+    weight = settings.FORECAST_PRIOR_WEIGHT
+    return (late + prior * weight) / (due + weight), float(prior)
+
+
+def project(
+    start: date,
+    months: int,
+    rent: np.ndarray,
+    start_date: np.ndarray,
+    end_date: np.ndarray,
+    renewed: np.ndarray,
+    risk: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Per-month totals for one portfolio; every lease input is a 1-D column"""
+    month_index = np.arange(np.datetime64(start, "M"), np.datetime64(start, "M") + months)
+    month_start = month_index.astype("datetime64[D]")
+    month_end = (month_index + 1).astype("datetime64[D]") - 1
+    days = (month_end - month_start).astype(np.int64) + 1
+
+    lease_start = start_date.astype("datetime64[D]")[:, None]
+    lease_end = end_date.astype("datetime64[D]")[:, None]
+
+    covered = (np.minimum(lease_end, month_end) - np.maximum(lease_start, month_start)).astype(np.int64) + 1
+    coverage = np.clip(covered, 0, None) / days
+    vacant = (month_end - np.maximum(lease_end + 1, month_start)).astype(np.int64) + 1
+    vacancy = np.clip(vacant, 0, None) / days * ~renewed[:, None]
+
+    contracted = rent[:, None] * coverage
+    return {
+        "month": month_start.astype(date),
+        "contracted": contracted.sum(axis=0),
+        "at_risk": (contracted * risk[:, None]).sum(axis=0),
+        "vacancy_loss": (rent[:, None] * vacancy).sum(axis=0),
+        "active_leases": (coverage > 0).sum(axis=0),
+        "leases_ending": ((lease_end >= month_start) & (lease_end <= month_end)).sum(axis=0),
+    }
+
+
+async def compute_forecast(db: AsyncSession, landlord_id: UUID, start: date, months: int) -> CashFlowForecast:
+    today = date.today()
+    leases = (await db.execute(text(LEASES_SQL), {"landlord_id": landlord_id, "horizon_start": start})).all()
+    history = (await db.execute(text(TENANT_HISTORY_SQL), {
+        "landlord_id": landlord_id,
+        "today": today,
+        "grace_days": settings.LATE_FEE_GRACE_DAYS,
+        "history_start": _add_months(start, -settings.FORECAST_HISTORY_MONTHS),
+    })).all()
+
+    tenants = {row.tenant_id: i for i, row in enumerate(history)}
+    rates, prior = late_rates(
+        np.array([row.due for row in history], dtype=np.float64),
+        np.array([row.late for row in history], dtype=np.float64),
+    )
+    # Tenants without history get the portfolio rate
+    risk = np.array(
+        [rates[tenants[row.tenant_id]] if row.tenant_id in tenants else prior for row in leases],
+        dtype=np.float64,
+    )
+
+    result = project(
+        start,
+        months,
+        rent=np.array([float(row.monthly_rent) for row in leases], dtype=np.float64),
+        start_date=np.array([row.start_date for row in leases], dtype="datetime64[D]"),
+        end_date=np.array([row.end_date for row in leases], dtype="datetime64[D]"),
+        renewed=np.array([row.renewed for row in leases], dtype=bool),
+        risk=risk,
+    )
+    metrics.increment("forecast_computations_total")
+
+    rows = []
+    for i in range(months):
+        contracted = round(float(result["contracted"][i]), 2)
+        at_risk = round(float(result["at_risk"][i]), 2)
+        rows.append(ForecastMonth(
+            month=result["month"][i],
+            contracted=contracted,
+            at_risk=at_risk,
+            expected=round(contracted - at_risk, 2),
+            vacancy_loss=round(float(result["vacancy_loss"][i]), 2),
+            active_leases=int(result["active_leases"][i]),
+            leases_ending=int(result["leases_ending"][i]),
+        ))
+    return CashFlowForecast(
+        start=start,
+        generated_at=datetime.now(timezone.utc),
+        months=rows,
+        totals=sum_forecast(rows),
+    )
+
+
+def sum_forecast(rows) -> ForecastTotals:
+    return ForecastTotals(**{
+        field: round(sum(getattr(row, field) for row in rows), 2)
+        for field in ("contracted", "expected", "at_risk", "vacancy_loss")
+    })
+
+
+async def get_forecast(db: AsyncSession, landlord_id: UUID, months: Optional[int] = None) -> CashFlowForecast:
+    """Forecast starting this month; the full horizon is cached and sliced to `months`"""
+    start = date.today().replace(day=1)
+    cache_key = report_cache_key("forecast", landlord_id)
+
+    cached = await get_cache(cache_key)
+    forecast = CashFlowForecast(**cached) if cached else None
+    if forecast is None or forecast.start != start:
+        forecast = await compute_forecast(db, landlord_id, start, settings.FORECAST_MAX_MONTHS)
+        await set_cache(cache_key, forecast.model_dump(mode="json"), ttl=settings.FORECAST_CACHE_TTL)
+
+    if months and months < len(forecast.months):
+        forecast.months = forecast.months[:months]
+        forecast.totals = sum_forecast(forecast.months)
+    return forecast
@@ -0,0 +1,344 @@
+"""
+Contractor agent job runner
+Maintenance requests queued with agent_status = 'pending' are claimed with
+SKIP LOCKED, shopped for quotes through the configured quote source and
+written back with their quotes in batches:
+  - each worker keeps up to CONTRACTOR_AGENT_CONCURRENCY requests in flight
+    and claims more as slots free up, so one slow contractor does not stall
+    the rest of the batch
+  - a landlord never has more than CONTRACTOR_AGENT_LANDLORD_CONCURRENCY
+    requests in flight across all workers; claims take turns between
+    landlords, so one large portfolio cannot starve the others
+  - claims commit before any quote is requested, so no transaction is held
+    open on external calls; a claim whose worker died is retried after
+    CONTRACTOR_AGENT_STALE_SECONDS
+  - failed attempts go back to pending with exponential backoff until
+    CONTRACTOR_AGENT_MAX_ATTEMPTS, then the request is marked failed
+
+Drain the queue once, or preview what the configured source returns:
+    python -m app.services.contractor_agent run
+    CONTRACTOR_QUOTE_BACKEND=fake python -m app.services.contractor_agent preview --title "Leaking sink" --category plumbing
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
+from uuid import UUID, uuid4
+import argparse
+import asyncio
+import logging
+import time
+import zlib
+
+from sqlalchemy import delete, insert, text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.quote_sources import Quote, QuoteRequest, get_quote_source
+from app.core import metrics
+from app.models.contractor_quote import ContractorQuote
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("contractor_agent_requests_total", "Maintenance requests shopped by the contractor agent, by outcome")
+metrics.describe("contractor_agent_seconds_total", "Time spent collecting quotes")
+metrics.describe("contractor_quotes_saved_total", "Contractor quotes stored")
+
+# Serializes claims across workers so per-landlord in-flight counts are exact
+CLAIM_LOCK_KEY = zlib.crc32(b"leasewell:contractor_agent:claim")
+
+CLAIMABLE = """(
+      (agent_status = 'pending' AND (agent_next_attempt_at IS NULL OR agent_next_attempt_at <= now()))
+      OR (agent_status = 'shopping' AND agent_started_at <= :stale_before)
+    )
+    AND COALESCE(status, 'pending') NOT IN ('completed', 'cancelled')"""
+
+# Up to (cap - in flight) oldest requests per landlord, then round-robin between landlords
+CLAIM_SQL = f"""
+WITH landlords AS (
+  SELECT DISTINCT landlord_id
+  FROM maintenance_requests
+  WHERE {CLAIMABLE}
+),
+busy AS (
+  SELECT landlord_id, count(*) AS running
+  FROM maintenance_requests
+  WHERE agent_status = 'shopping' AND agent_started_at > :stale_before
+  GROUP BY landlord_id
+),
+candidates AS (
+  SELECT c.id, c.property_id, c.created_at,
+         row_number() OVER (PARTITION BY l.landlord_id ORDER BY c.created_at) AS turn
+  FROM landlords l
+  LEFT JOIN busy b ON b.landlord_id = l.landlord_id
+  CROSS JOIN LATERAL (
+    SELECT id, property_id, created_at
+    FROM maintenance_requests
+    WHERE landlord_id = l.landlord_id AND {CLAIMABLE}
+    ORDER BY created_at
+    LIMIT GREATEST(:per_landlord - COALESCE(b.running, 0), 0)
+    FOR UPDATE SKIP LOCKED
+  ) c
+),
+picked AS (
+  SELECT id, property_id
+  FROM candidates
+  ORDER BY turn, created_at
+  LIMIT :limit
+)
+UPDATE maintenance_requests m
+SET agent_status = 'shopping',
+    agent_started_at = now(),
+    agent_completed_at = NULL,
+    agent_attempts = m.agent_attempts + 1
+FROM picked
+JOIN properties p ON p.id = picked.property_id
+WHERE m.id = picked.id
+RETURNING m.id, m.landlord_id, m.title, m.description, m.category, m.priority, m.agent_attempts,
+          p.address, p.city, p.state, p.zip_code, p.unit_number
+"""
+
+# agent_attempts identifies the claim: a request re-claimed after going
+# stale is only finished by its newest claimant
+FINISH_SQL = """
+UPDATE maintenance_requests m
+SET agent_status = v.status,
+    agent_completed_at = CASE WHEN v.status = 'pending' THEN NULL ELSE now() END,
+    agent_next_attempt_at = v.next_attempt_at,
+    agent_duration_ms = v.duration_ms,
+    agent_error = v.error
+FROM unnest(
+  CAST(:ids AS uuid[]), CAST(:attempts AS integer[]), CAST(:statuses AS text[]),
+  CAST(:next_attempts AS timestamptz[]), CAST(:durations AS integer[]), CAST(:errors AS text[])
+) AS v(id, attempts, status, next_attempt_at, duration_ms, error)
+WHERE m.id = v.id
+  AND m.agent_status = 'shopping'
+  AND m.agent_attempts = v.attempts
+RETURNING m.id
+"""
+
+
+@dataclass
+class AgentJob:
+    request: QuoteRequest
+    attempts: int
+
+
+@dataclass
+class AgentOutcome:
+    job: AgentJob
+    quotes: List[Quote]
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class AgentRunResult:
+    completed: int = 0
+    retried: int = 0
+    failed: int = 0
+    quotes: int = 0
+    seconds: float = 0.0
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Delay before the attempt after `attempts` failed ones"""
+    return timedelta(seconds=settings.CONTRACTOR_AGENT_RETRY_SECONDS * (2 ** (attempts - 1)))
+
+
+async def claim_jobs(limit: int) -> List[AgentJob]:
+    """Mark up to `limit` requests as shopping and return them (commits)"""
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.CONTRACTOR_AGENT_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+        rows = (await db.execute(text(CLAIM_SQL), {
+            "stale_before": stale_before,
+            "per_landlord": settings.CONTRACTOR_AGENT_LANDLORD_CONCURRENCY,
+            "limit": limit,
+        })).all()
+        await db.commit()
+
+    return [
+        AgentJob(
+            request=QuoteRequest(
+                maintenance_request_id=row.id,
+                landlord_id=row.landlord_id,
+                title=row.title,
+                description=row.description,
+                category=row.category,
+                priority=row.priority,
+                address=row.address,
+                city=row.city,
+                state=row.state,
+                zip_code=row.zip_code,
+                unit_number=row.unit_number,
+            ),
+            attempts=row.agent_attempts,
+        )
+        for row in rows
+    ]
+
+
+async def shop(source, job: AgentJob) -> AgentOutcome:
+    """Collect quotes for one request; errors and timeouts become the outcome"""
+    started = time.perf_counter()
+    try:
+        quotes = await asyncio.wait_for(
+            source.get_quotes(job.request, settings.CONTRACTOR_QUOTES_PER_REQUEST),
+            timeout=settings.CONTRACTOR_QUOTE_TIMEOUT,
+        )
+        return AgentOutcome(job=job, quotes=quotes, seconds=time.perf_counter() - started)
+    except asyncio.TimeoutError:
+        error = f"Timed out after {settings.CONTRACTOR_QUOTE_TIMEOUT}s"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    return AgentOutcome(job=job, quotes=[], seconds=time.perf_counter() - started, error=error)
+
+
+async def save_outcomes(outcomes: List[AgentOutcome], result: AgentRunResult):
+    """Write statuses and quotes for finished requests in one transaction"""
+    now = datetime.now(timezone.utc)
+    statuses, next_attempts = [], []
+    for outcome in outcomes:
+        if outcome.error is None:
+            statuses.append("completed")
+            next_attempts.append(None)
+        elif outcome.job.attempts >= settings.CONTRACTOR_AGENT_MAX_ATTEMPTS:
+            statuses.append("failed")
+            next_attempts.append(None)
+        else:
+            statuses.append("pending")
+            next_attempts.append(now + retry_delay(outcome.job.attempts))
+
+    async with AsyncSessionLocal() as db:
+        saved = set((await db.execute(text(FINISH_SQL), {
+            "ids": [o.job.request.maintenance_request_id for o in outcomes],
+            "attempts": [o.job.attempts for o in outcomes],
+            "statuses": statuses,
+            "next_attempts": next_attempts,
+            "durations": [round(o.seconds * 1000) for o in outcomes],
+            "errors": [o.error for o in outcomes],
+        })).scalars().all())
+
+        completed = [
+            o.job.request.maintenance_request_id for o in outcomes
+            if o.error is None and o.job.request.maintenance_request_id in saved
+        ]
+        quotes = [
+            {"id": uuid4(), "maintenance_request_id": o.job.request.maintenance_request_id, "status": "received", **asdict(q)}
+            for o in outcomes
+            if o.error is None and o.job.request.maintenance_request_id in saved
+            for q in o.quotes
+        ]
+        if completed:
+            # A re-queued request gets a fresh set; quotes the landlord accepted or rejected are kept
+            await db.execute(
+                delete(ContractorQuote)
+                .where(ContractorQuote.maintenance_request_id.in_(completed))
+                .where(ContractorQuote.status == "received")
+            )
+        if quotes:
+            await db.execute(insert(ContractorQuote), quotes)
+        await db.commit()
+
+    for outcome, status in zip(outcomes, statuses):
+        request_id = outcome.job.request.maintenance_request_id
+        if request_id not in saved:
+            logger.warning(f"Contractor agent: request {request_id} was re-claimed, dropping this attempt")
+            continue
+        metrics.increment("contractor_agent_requests_total", outcome=status)
+        metrics.increment("contractor_agent_seconds_total", outcome.seconds)
+        if status == "completed":
+            result.completed += 1
+        elif status == "pending":
+            result.retried += 1
+            logger.warning(f"Contractor agent: request {request_id} attempt {outcome.job.attempts} failed: {outcome.error}")
+        else:
+            result.failed += 1
+            logger.error(f"Contractor agent: request {request_id} failed after {outcome.job.attempts} attempts: {outcome.error}")
+    result.quotes += len(quotes)
+    metrics.increment("contractor_quotes_saved_total", len(quotes))
+
+
+async def run_contractor_agent() -> AgentRunResult:
+    """Drain claimable requests; returns counts for this run"""
+    started = time.perf_counter()
+    source = get_quote_source()
+    capacity = settings.CONTRACTOR_AGENT_CONCURRENCY
+    result = AgentRunResult()
+    in_flight: Set[asyncio.Task] = set()
+    finished: List[AgentOutcome] = []
+    exhausted = False
+
+    try:
+        while True:
+            free = capacity - len(in_flight)
+            if free and not exhausted:
+                jobs = await claim_jobs(free)
+                exhausted = len(jobs) < free
+                in_flight |= {asyncio.create_task(shop(source, job)) for job in jobs}
+            if not in_flight:
+                break
+
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            finished.extend(task.result() for task in done)
+            # Save once a batch is full, or right away when the queue looked empty:
+            # saving frees landlord slots, so claim again afterwards
+            if len(finished) >= capacity or exhausted:
+                batch, finished = finished, []
+                await save_outcomes(batch, result)
+                exhausted = False
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if finished:
+            await save_outcomes(finished, result)
+
+    result.seconds = time.perf_counter() - started
+    if result.completed or result.retried or result.failed:
+        logger.info(
+            f"Contractor agent: {result.completed} completed, {result.retried} retrying, "
+            f"{result.failed} failed, {result.quotes} quotes in {result.seconds:.2f}s"
+        )
+    return result
+
+
+async def _run():
+    try:
+        result = await run_contractor_agent()
+        print(
+            f"Contractor agent: {result.completed} completed, {result.retried} retrying, "
+            f"{result.failed} failed, {result.quotes} quotes in {result.seconds:.2f}s"
+        )
+    finally:
+        await engine.dispose()
+
+
+async def _preview(args):
+    request = QuoteRequest(
+        maintenance_request_id=args.request_id or uuid4(),
+        landlord_id=uuid4(),
+        title=args.title,
+        description=args.title,
+        category=args.category,
+        priority=args.priority,
+        address="1 Example St",
+        city=args.city,
+        state=args.state,
+        zip_code="00000",
+    )
+    for quote in await get_quote_source().get_quotes(request, settings.CONTRACTOR_QUOTES_PER_REQUEST):
+        print(f"{quote.contractor_name}: {quote.quote_amount} ({quote.availability}, rating {quote.contractor_rating})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Contractor quote agent")
+    parser.add_argument("command", choices=["run", "preview"], help="preview: ask the quote source only (no database)")
+    parser.add_argument("--title", default="Leaking kitchen sink")
+    parser.add_argument("--category", default="plumbing")
+    parser.add_argument("--priority", default="medium", choices=["low", "medium", "high", "emergency"])
+    parser.add_argument("--city", default="Springfield")
+    parser.add_argument("--state", default="IL")
+    parser.add_argument("--request-id", type=UUID, help="Seed for the fake source")
+    args = parser.parse_args()
+
+    asyncio.run(_run() if args.command == "run" else _preview(args))
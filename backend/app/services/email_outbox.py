@@ -0,0 +1,138 @@
+"""
+Email outbox delivery worker
+Claims due messages with SKIP LOCKED and commits the claim (status
+'sending') before calling the provider, so no transaction or row lock is
+held across the HTTP requests. Messages are then sent in batches with
+bounded concurrency, and the outcomes are written back in a second
+transaction; failures are rescheduled with exponential backoff. A claim
+whose worker died is taken over after EMAIL_CLAIM_STALE_SECONDS
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List
+import asyncio
+import logging
+import random
+
+from sqlalchemy import and_, bindparam, or_, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.email import EmailMessage, SendResult, get_email_sender, email_configured
+from app.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+outbox = EmailOutbox.__table__
+
+# Each outcome only lands if the row is still held by this claim
+FINISH = (
+    update(outbox)
+    .where(
+        outbox.c.id == bindparam("b_id"),
+        outbox.c.status == "sending",
+        outbox.c.attempts == bindparam("b_attempts"),
+    )
+    .values(
+        status=bindparam("status"),
+        sent_at=bindparam("sent_at"),
+        provider_message_id=bindparam("provider_message_id"),
+        last_error=bindparam("last_error"),
+        next_attempt_at=bindparam("next_attempt_at"),
+        claimed_at=None,
+    )
+)
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Delay before retry number `attempts`, with jitter"""
+    base = settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    capped = min(base, settings.EMAIL_RETRY_MAX_SECONDS)
+    return timedelta(seconds=capped * random.uniform(0.8, 1.2))
+
+
+async def claim_messages(limit: int) -> List:
+    """Mark due messages as sending and commit; returns the claimed rows with their new attempt count"""
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.EMAIL_CLAIM_STALE_SECONDS)
+    due = (
+        select(EmailOutbox.id)
+        .where(or_(
+            and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == "sending", EmailOutbox.claimed_at < stale_before),
+        ))
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            update(outbox)
+            .where(outbox.c.id.in_(due.scalar_subquery()))
+            .values(status="sending", claimed_at=now, attempts=outbox.c.attempts + 1)
+            .returning(outbox.c.id, outbox.c.to_email, outbox.c.subject, outbox.c.html, outbox.c.attempts)
+        )).all()
+        await db.commit()
+    return rows
+
+
+async def _send_chunk(sender, rows: List, semaphore: asyncio.Semaphore) -> List[SendResult]:
+    messages = [EmailMessage(to_email=r.to_email, subject=r.subject, html=r.html) for r in rows]
+    async with semaphore:
+        results = await sender.send_batch(messages)
+    if len(results) != len(rows):
+        # The provider did not account for every message; count the rest as failed attempts
+        error = f"Provider returned {len(results)} results for {len(rows)} messages"
+        results = list(results[:len(rows)]) + [SendResult(ok=False, error=error)] * (len(rows) - len(results))
+    return results
+
+
+async def deliver_pending_emails() -> int:
+    """Drain due outbox messages; returns the number delivered"""
+    if not email_configured():
+        return 0
+
+    sender = get_email_sender()
+    batch_size = min(settings.EMAIL_BATCH_SIZE, sender.max_batch_size)
+    claim_size = batch_size * settings.EMAIL_SEND_CONCURRENCY
+    semaphore = asyncio.Semaphore(settings.EMAIL_SEND_CONCURRENCY)
+    delivered = 0
+
+    while True:
+        rows = await claim_messages(claim_size)
+        if not rows:
+            return delivered
+
+        chunks = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        outcomes = await asyncio.gather(*(_send_chunk(sender, chunk, semaphore) for chunk in chunks))
+
+        updates = []
+        sent = 0
+        now = datetime.now(timezone.utc)
+        for chunk, results in zip(chunks, outcomes):
+            for row, outcome in zip(chunk, results):
+                if outcome.ok:
+                    sent += 1
+                    updates.append({
+                        "b_id": row.id, "b_attempts": row.attempts, "status": "sent",
+                        "sent_at": now, "provider_message_id": outcome.provider_message_id,
+                        "last_error": None, "next_attempt_at": now,
+                    })
+                else:
+                    give_up = row.attempts >= settings.EMAIL_MAX_ATTEMPTS
+                    updates.append({
+                        "b_id": row.id, "b_attempts": row.attempts, "status": "failed" if give_up else "pending",
+                        "sent_at": None, "provider_message_id": None, "last_error": outcome.error,
+                        "next_attempt_at": now + backoff_delay(row.attempts),
+                    })
+                    log = logger.error if give_up else logger.warning
+                    log(f"Email {row.id} to {row.to_email} failed (attempt {row.attempts}): {outcome.error}")
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(FINISH, updates)
+            await db.commit()
+
+        delivered += sent
+        if sent:
+            logger.info(f"Delivered {sent} queued emails")
+        if len(rows) < claim_size:
+            return delivered
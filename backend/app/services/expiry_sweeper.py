@@ -0,0 +1,160 @@
+"""
+Expiry sweeper
+Moves pending invitations past expires_at to 'expired' and active leases
+past end_date to 'expired', in bounded batches, then notifies the people
+involved and invalidates their cached dashboards. Also purges
+Idempotency-Key records older than IDEMPOTENCY_KEY_TTL
+"""
+from datetime import timedelta
+import logging
+
+from sqlalchemy import select, update, delete, func, tuple_
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import delete_cache_keys, delete_report_caches
+from app.core import metrics
+from app.models.invitation import Invitation
+from app.models.lease import Lease
+from app.models.idempotency_key import IdempotencyKey
+from app.services.notification_fanout import insert_notifications, dispatch_created
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("sweeper_invitations_expired_total", "Invitations moved to expired by the sweeper")
+metrics.describe("sweeper_leases_expired_total", "Leases moved to expired by the sweeper")
+metrics.describe("sweeper_idempotency_keys_purged_total", "Expired Idempotency-Key records deleted by the sweeper")
+metrics.describe("sweeper_batches_total", "UPDATE batches executed by the sweeper")
+
+
+async def _invalidate_dashboards(user_ids):
+    await delete_cache_keys([f"dashboard:{user_id}" for user_id in set(user_ids)])
+
+
+async def expire_invitations(batch_size: int) -> int:
+    """Expire overdue pending invitations; returns how many were expired"""
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(Invitation.id)
+                .where(Invitation.status == "pending", Invitation.expires_at < func.now())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(Invitation)
+                .where(Invitation.id.in_(due.scalar_subquery()))
+                .values(status="expired")
+                .returning(Invitation.id, Invitation.email, Invitation.landlord_id)
+                .execution_options(synchronize_session=False)
+            )
+            expired = result.all()
+            if not expired:
+                return total
+
+            created = await insert_notifications(db, [
+                {
+                    "user_id": row.landlord_id,
+                    "title": "Invitation expired",
+                    "message": f"The invitation sent to {row.email} expired before it was accepted.",
+                    "type": "system",
+                    "action_url": "/tenants/invitations",
+                    "notification_data": {"invitation_id": str(row.id)},
+                }
+                for row in expired
+            ])
+            await db.commit()
+
+        await dispatch_created(created)
+        await _invalidate_dashboards(row.landlord_id for row in expired)
+        total += len(expired)
+        metrics.increment("sweeper_invitations_expired_total", len(expired))
+        metrics.increment("sweeper_batches_total", kind="invitations")
+        if len(expired) < batch_size:
+            return total
+
+
+async def expire_leases(batch_size: int) -> int:
+    """Expire active leases whose end_date has passed; returns how many were expired"""
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(Lease.id)
+                .where(Lease.status == "active", Lease.end_date < func.current_date())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(Lease)
+                .where(Lease.id.in_(due.scalar_subquery()))
+                .values(status="expired")
+                .returning(Lease.id, Lease.landlord_id, Lease.tenant_id, Lease.end_date)
+                .execution_options(synchronize_session=False)
+            )
+            expired = result.all()
+            if not expired:
+                return total
+
+            notifications = []
+            for row in expired:
+                for user_id in (row.landlord_id, row.tenant_id):
+                    notifications.append({
+                        "user_id": user_id,
+                        "title": "Lease expired",
+                        "message": f"A lease ended on {row.end_date.isoformat()} and is now marked expired.",
+                        "type": "lease",
+                        "action_url": "/leases",
+                        "notification_data": {"lease_id": str(row.id)},
+                    })
+            created = await insert_notifications(db, notifications)
+            await db.commit()
+
+        await dispatch_created(created)
+        await _invalidate_dashboards(
+            [row.landlord_id for row in expired] + [row.tenant_id for row in expired]
+        )
+        await delete_report_caches(row.landlord_id for row in expired)
+        total += len(expired)
+        metrics.increment("sweeper_leases_expired_total", len(expired))
+        metrics.increment("sweeper_batches_total", kind="leases")
+        if len(expired) < batch_size:
+            return total
+
+
+async def purge_idempotency_keys(batch_size: int) -> int:
+    """Delete Idempotency-Key records past their TTL; returns how many were deleted"""
+    total = 0
+    cutoff = func.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    while True:
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(IdempotencyKey.user_id, IdempotencyKey.key)
+                .where(IdempotencyKey.created_at < cutoff)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                delete(IdempotencyKey)
+                .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(due))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        total += result.rowcount
+        metrics.increment("sweeper_idempotency_keys_purged_total", result.rowcount)
+        metrics.increment("sweeper_batches_total", kind="idempotency_keys")
+        if result.rowcount < batch_size:
+            return total
+
+
+async def sweep_expired():
+    """Scheduled entry point"""
+    invitations = await expire_invitations(settings.SWEEPER_BATCH_SIZE)
+    leases = await expire_leases(settings.SWEEPER_BATCH_SIZE)
+    keys = await purge_idempotency_keys(settings.SWEEPER_BATCH_SIZE)
+    if invitations or leases:
+        logger.info(f"Expiry sweep: {invitations} invitations, {leases} leases expired")
+    if keys:
+        logger.info(f"Expiry sweep: {keys} idempotency keys purged")
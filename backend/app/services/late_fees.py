@@ -0,0 +1,227 @@
+"""
+Late-fee assessment
+Overdue pending/late payments are loaded in keyset batches as NumPy
+columns, fees and status transitions are computed for the whole batch at
+once, and changed rows are written back with one UPDATE ... FROM unnest().
+Fees are recomputed from scratch each run, so the job is idempotent:
+    python -m app.services.late_fees --dry-run
+    python -m app.services.late_fees --as-of 2026-11-20
+
+Per-lease rules live in Lease.terms["late_fee"], any key optional:
+    {"enabled": true, "grace_days": 5, "flat": 50, "percent": 5, "daily": 10, "max": 200}
+fee = flat + percent% of amount + daily * days past grace, capped at max (0 = no cap)
+"""
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis_client import init_redis, close_redis, delete_cache_keys, delete_report_caches
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("late_fees_assessed_total", "Payments whose late fee or status was updated")
+
+RULE_KEYS = ("grace_days", "flat", "percent", "daily", "max")
+
+# Rule fields are extracted in SQL so Python never parses JSON per row
+LOAD_SQL = """
+SELECT p.id, p.tenant_id, p.landlord_id, p.amount, p.due_date, p.late_fee, p.status = 'late' AS is_late,
+       COALESCE(l.terms->'late_fee'->'enabled', 'true'::jsonb) <> 'false'::jsonb AS enabled,
+       {rule_columns}
+FROM {payments} p
+JOIN {leases} l ON l.id = p.lease_id
+WHERE p.status IN ('pending', 'late')
+  AND p.due_date < :as_of
+  AND p.id > :after
+ORDER BY p.id
+LIMIT :limit
+"""
+
+RULE_COLUMN = (
+    "CASE WHEN jsonb_typeof(l.terms->'late_fee'->'{key}') = 'number' "
+    "THEN (l.terms->'late_fee'->>'{key}')::numeric ELSE :default_{key} END AS {key}"
+)
+
+# Only rows still open are touched, so a payment settled mid-run keeps its status
+UPDATE_SQL = """
+UPDATE {payments} p
+SET late_fee = v.late_fee, status = 'late', updated_at = now()
+FROM unnest(CAST(:ids AS uuid[]), CAST(:fees AS numeric[])) AS v(id, late_fee)
+WHERE p.id = v.id AND p.status IN ('pending', 'late')
+"""
+
+
+@dataclass
+class LateFeeResult:
+    as_of: date
+    scanned: int = 0
+    updated: int = 0
+    newly_late: int = 0
+    total_fees: float = 0.0
+    dry_run: bool = False
+    seconds: float = 0.0
+
+
+def default_rules() -> dict:
+    return {
+        "grace_days": settings.LATE_FEE_GRACE_DAYS,
+        "flat": settings.LATE_FEE_FLAT,
+        "percent": settings.LATE_FEE_PERCENT,
+        "daily": settings.LATE_FEE_DAILY,
+        "max": settings.LATE_FEE_MAX,
+    }
+
+
+def assess_fees(
+    as_of: date,
+    amount: np.ndarray,
+    due_date: np.ndarray,
+    current_fee: np.ndarray,
+    is_late: np.ndarray,
+    enabled: np.ndarray,
+    grace_days: np.ndarray,
+    flat: np.ndarray,
+    percent: np.ndarray,
+    daily: np.ndarray,
+    max_fee: np.ndarray,
+):
+    """
+    Vectorized fee rules for one batch
+    Returns (fee in cents, mask of rows that are past grace, mask of rows that change)
+    """
+    days_late = (np.datetime64(as_of, "D") - due_date.astype("datetime64[D]")).astype(np.int64)
+    overdue = enabled & (days_late > grace_days)
+
+    fee = flat + amount * (percent / 100.0) + daily * np.maximum(days_late - grace_days, 0)
+    fee = np.where(max_fee > 0, np.minimum(fee, max_fee), fee)
+    fee_cents = np.rint(fee * 100).astype(np.int64)
+    current_cents = np.rint(current_fee * 100).astype(np.int64)
+
+    changed = overdue & ((fee_cents != current_cents) | ~is_late)
+    return fee_cents, overdue, changed
+
+
+def _columns(rows):
+    """Turn a list of DB rows into NumPy columns"""
+    columns = list(zip(*rows))
+    return {
+        "id": columns[0],
+        "tenant_id": columns[1],
+        "landlord_id": columns[2],
+        "amount": np.array(columns[3], dtype=np.float64),
+        "due_date": np.array(columns[4], dtype="datetime64[D]"),
+        "current_fee": np.array([fee or 0 for fee in columns[5]], dtype=np.float64),
+        "is_late": np.array(columns[6], dtype=bool),
+        "enabled": np.array(columns[7], dtype=bool),
+        "grace_days": np.array(columns[8], dtype=np.int64),
+        "flat": np.array(columns[9], dtype=np.float64),
+        "percent": np.array(columns[10], dtype=np.float64),
+        "daily": np.array(columns[11], dtype=np.float64),
+        "max_fee": np.array(columns[12], dtype=np.float64),
+    }
+
+
+async def assess_late_fees(
+    db: AsyncSession,
+    as_of: date,
+    dry_run: bool = False,
+    batch_size: int = None,
+    payments_table: str = "payments",
+    leases_table: str = "leases",
+) -> LateFeeResult:
+    """Assess fees for every overdue open payment; commits per batch unless dry_run"""
+    started = time.perf_counter()
+    batch_size = batch_size or settings.LATE_FEE_BATCH_SIZE
+    result = LateFeeResult(as_of=as_of, dry_run=dry_run)
+
+    load_sql = text(LOAD_SQL.format(
+        payments=payments_table,
+        leases=leases_table,
+        rule_columns=",\n       ".join(RULE_COLUMN.format(key=key) for key in RULE_KEYS),
+    ))
+    update_sql = text(UPDATE_SQL.format(payments=payments_table))
+    params = {f"default_{key}": value for key, value in default_rules().items()}
+    after = uuid.UUID(int=0)
+
+    while True:
+        rows = (await db.execute(load_sql, {**params, "as_of": as_of, "after": after, "limit": batch_size})).all()
+        if not rows:
+            break
+        after = rows[-1][0]
+        cols = _columns(rows)
+
+        fee_cents, overdue, changed = assess_fees(
+            as_of, cols["amount"], cols["due_date"], cols["current_fee"], cols["is_late"], cols["enabled"],
+            cols["grace_days"], cols["flat"], cols["percent"], cols["daily"], cols["max_fee"],
+        )
+        idx = np.flatnonzero(changed)
+        result.scanned += len(rows)
+        result.updated += len(idx)
+        result.newly_late += int(np.count_nonzero(changed & ~cols["is_late"]))
+        result.total_fees += float(fee_cents[overdue].sum()) / 100
+
+        if len(idx) and not dry_run:
+            await db.execute(update_sql, {
+                "ids": [cols["id"][i] for i in idx],
+                "fees": [Decimal(cents).scaleb(-2) for cents in fee_cents[idx].tolist()],
+            })
+            await db.commit()
+            users = {cols["tenant_id"][i] for i in idx} | {cols["landlord_id"][i] for i in idx}
+            await delete_cache_keys([f"dashboard:{user_id}" for user_id in users])
+            await delete_report_caches({cols["landlord_id"][i] for i in idx})
+            metrics.increment("late_fees_assessed_total", len(idx))
+        else:
+            await db.rollback()  # release the snapshot between batches
+
+        if len(rows) < batch_size:
+            break
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+async def run_late_fees():
+    """Scheduled entry point"""
+    async with AsyncSessionLocal() as db:
+        result = await assess_late_fees(db, date.today())
+    if result.updated:
+        logger.info(
+            f"Late fees: {result.updated} of {result.scanned} overdue payments updated "
+            f"({result.newly_late} newly late) in {result.seconds:.2f}s"
+        )
+
+
+async def _main(as_of: date, dry_run: bool):
+    await init_redis()
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await assess_late_fees(db, as_of, dry_run=dry_run)
+        verb = "would update" if dry_run else "updated"
+        print(
+            f"Late fees as of {as_of}: scanned {result.scanned}, {verb} {result.updated} "
+            f"({result.newly_late} newly late), outstanding fees {result.total_fees:,.2f} "
+            f"in {result.seconds:.2f}s"
+        )
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assess late fees on overdue payments")
+    parser.add_argument("--as-of", default=date.today().isoformat(), help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and report without writing")
+    args = parser.parse_args()
+    asyncio.run(_main(date.fromisoformat(args.as_of), args.dry_run))
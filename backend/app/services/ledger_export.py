@@ -0,0 +1,132 @@
+"""
+Streaming CSV ledger exports
+Rows come from a server-side cursor on a dedicated connection and are
+written to the response in partitions of EXPORT_CHUNK_ROWS, so memory
+stays flat however long the history is. The header is sent before the
+query runs, and the ordered indexes from migration 017 let the first
+partition arrive without sorting the whole result.
+"""
+from datetime import date
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
+import csv
+import io
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core import metrics
+from app.models.payment import Payment
+from app.models.lease import Lease
+from app.models.property import Property
+from app.models.user import Profile
+from app.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("ledger_export_rows_total", "Rows written to CSV ledger exports")
+
+PAYMENT_HEADER = (
+    "payment_id", "payment_date", "due_date", "property", "unit", "tenant", "tenant_email",
+    "amount", "late_fee", "status", "payment_method", "stripe_payment_intent_id", "notes",
+)
+TRANSACTION_HEADER = (
+    "transaction_id", "transaction_date", "type", "category", "amount", "property", "unit",
+    "description", "tax_deductible", "payment_id", "receipt_url",
+)
+
+# Free-text columns (by position) that users control
+PAYMENT_TEXT_COLUMNS = (3, 4, 5, 12)
+TRANSACTION_TEXT_COLUMNS = (3, 5, 6, 7, 10)
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    if value and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def payment_export_query(user_id: UUID, role: str, start: Optional[date], end: Optional[date]) -> Select:
+    owner = Payment.landlord_id if role == "landlord" else Payment.tenant_id
+    query = (
+        select(
+            Payment.id, Payment.payment_date, Payment.due_date, Property.address, Property.unit_number,
+            Profile.full_name, Profile.email, Payment.amount, Payment.late_fee, Payment.status,
+            Payment.payment_method, Payment.stripe_payment_intent_id, Payment.notes,
+        )
+        .join(Lease, Lease.id == Payment.lease_id)
+        .join(Property, Property.id == Lease.property_id)
+        .join(Profile, Profile.id == Payment.tenant_id)
+        .where(owner == user_id)
+        .order_by(Payment.payment_date, Payment.id)
+    )
+    if start:
+        query = query.where(Payment.payment_date >= start)
+    if end:
+        query = query.where(Payment.payment_date <= end)
+    return query
+
+
+def transaction_export_query(landlord_id: UUID, start: Optional[date], end: Optional[date]) -> Select:
+    query = (
+        select(
+            Transaction.id, Transaction.transaction_date, Transaction.transaction_type, Transaction.category,
+            Transaction.amount, Property.address, Property.unit_number, Transaction.description,
+            Transaction.tax_deductible, Transaction.payment_id, Transaction.receipt_url,
+        )
+        .outerjoin(Property, Property.id == Transaction.property_id)
+        .where(Transaction.landlord_id == landlord_id)
+        .order_by(Transaction.transaction_date, Transaction.id)
+    )
+    if start:
+        query = query.where(Transaction.transaction_date >= start)
+    if end:
+        query = query.where(Transaction.transaction_date <= end)
+    return query
+
+
+async def stream_csv(query: Select, header: Sequence[str], text_columns: Sequence[int] = ()) -> AsyncIterator[str]:
+    """Yield CSV text for a query, one chunk per cursor partition"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+
+    chunk_rows = settings.EXPORT_CHUNK_ROWS
+    total = 0
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions(chunk_rows):
+            buffer.seek(0)
+            buffer.truncate(0)
+            if text_columns:
+                rows = [list(row) for row in rows]
+                for row in rows:
+                    for i in text_columns:
+                        row[i] = _text(row[i])
+            writer.writerows(rows)
+            total += len(rows)
+            yield buffer.getvalue()
+
+    metrics.increment("ledger_export_rows_total", total)
+    logger.info(f"CSV export finished: {total} rows")
+
+
+def stream_payments_csv(user_id: UUID, role: str, start: Optional[date], end: Optional[date]) -> AsyncIterator[str]:
+    return stream_csv(payment_export_query(user_id, role, start, end), PAYMENT_HEADER, PAYMENT_TEXT_COLUMNS)
+
+
+def stream_transactions_csv(landlord_id: UUID, start: Optional[date], end: Optional[date]) -> AsyncIterator[str]:
+    return stream_csv(transaction_export_query(landlord_id, start, end), TRANSACTION_HEADER, TRANSACTION_TEXT_COLUMNS)
+
+
+def export_filename(kind: str, start: Optional[date], end: Optional[date]) -> str:
+    if start or end:
+        return f"{kind}-{start or 'start'}-to-{end or 'today'}.csv"
+    return f"{kind}.csv"
@@ -0,0 +1,116 @@
+"""
+Bulk notification fan-out
+Creates the same notification for many recipients with set-based SQL,
+then bumps unread counters and publishes real-time events in batches
+"""
+from typing import Iterable, List, Optional, Sequence
+import logging
+import time
+
+from sqlalchemy import select, insert, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core import metrics
+from app.core.realtime import publish_notifications
+from app.core.unread_counts import increment_unread
+from app.models.lease import Lease
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("notifications_fanned_out_total", "Notifications created by bulk fan-out")
+
+# What real-time clients and counters need back from an insert
+EVENT_COLUMNS = (
+    Notification.id, Notification.user_id, Notification.title, Notification.message,
+    Notification.type, Notification.action_url, Notification.read, Notification.created_at,
+)
+
+
+def _chunks(items: Sequence, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def active_tenants(property_ids: Iterable):
+    """Recipients query: tenants with an active lease on any of the properties"""
+    return (
+        select(Lease.tenant_id.label("user_id"))
+        .where(Lease.property_id.in_(list(property_ids)), Lease.status == "active")
+        .distinct()
+    )
+
+
+async def insert_notifications(db: AsyncSession, rows: List[dict]) -> List:
+    """
+    Insert individually-worded notifications (executemany, batched into
+    multi-row VALUES by the driver) and return their event columns
+    """
+    created = []
+    for chunk in _chunks(rows, settings.FANOUT_BATCH_SIZE):
+        result = await db.execute(insert(Notification).returning(*EVENT_COLUMNS), chunk)
+        created.extend(result.all())
+    return created
+
+
+async def insert_for_recipients(
+    db: AsyncSession,
+    recipients,
+    title: str,
+    message: str,
+    type: str = "system",
+    action_url: Optional[str] = None,
+    data: Optional[dict] = None,
+) -> List:
+    """
+    Insert one notification per row of a recipients query (a select with a
+    user_id column) in a single INSERT ... SELECT; recipients never leave Postgres
+    """
+    recipients = recipients.subquery()
+    values = {
+        Notification.title: title,
+        Notification.message: message,
+        Notification.type: type,
+        Notification.action_url: action_url,
+        Notification.notification_data: data or {},
+        Notification.read: False,
+    }
+    source = select(
+        recipients.c.user_id,
+        *(literal(value, column.type) for column, value in values.items())
+    )
+    # include_defaults=False: the Python-side uuid4 default would give every
+    # row the same id, so ids come from the column's server default instead
+    result = await db.execute(
+        insert(Notification)
+        .from_select([Notification.user_id, *values], source, include_defaults=False)
+        .returning(*EVENT_COLUMNS)
+    )
+    return result.all()
+
+
+async def dispatch_created(created: Sequence):
+    """After commit: bump unread counters and push real-time events, batch by batch"""
+    for chunk in _chunks(created, settings.FANOUT_BATCH_SIZE):
+        await increment_unread(row.user_id for row in chunk)
+        await publish_notifications(chunk)
+    metrics.increment("notifications_fanned_out_total", len(created))
+
+
+async def notify_property_tenants(
+    db: AsyncSession,
+    property_ids: Iterable,
+    title: str,
+    message: str,
+    type: str = "system",
+    action_url: Optional[str] = None,
+    data: Optional[dict] = None,
+) -> int:
+    """Announce something to every active tenant of the properties; commits"""
+    started = time.perf_counter()
+    created = await insert_for_recipients(db, active_tenants(property_ids), title, message, type, action_url, data)
+    await db.commit()
+    await dispatch_created(created)
+    logger.info(f"Fanned out {len(created)} notifications in {time.perf_counter() - started:.2f}s")
+    return len(created)
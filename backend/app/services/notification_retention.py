@@ -0,0 +1,100 @@
+"""
+Notification retention
+Moves read notifications past the retention window into
+notifications_archive, and optionally purges very old archived rows.
+Each batch is one statement in its own short transaction, and rows
+locked by a concurrent request are skipped rather than waited on
+"""
+from datetime import datetime, timedelta, timezone
+import logging
+
+from sqlalchemy import select, insert, delete
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import delete_cache_keys
+from app.core import metrics
+from app.models.notification import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("notifications_archived_total", "Read notifications moved to the archive table")
+metrics.describe("notifications_purged_total", "Archived notifications deleted past the purge window")
+
+ARCHIVED_COLUMNS = ("id", "user_id", "title", "message", "type", "read", "action_url", "notification_data", "created_at")
+
+
+async def archive_batch(cutoff: datetime, batch_size: int) -> int:
+    """Move one batch of old read notifications; returns how many moved"""
+    due = (
+        select(Notification.id)
+        .where(Notification.read == True, Notification.created_at < cutoff)
+        .order_by(Notification.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(Notification)
+        .where(Notification.id.in_(due.scalar_subquery()))
+        .returning(*(getattr(Notification, name) for name in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    # DELETE ... RETURNING feeds the INSERT in the same statement
+    stmt = (
+        insert(NotificationArchive)
+        .from_select(
+            [getattr(NotificationArchive, name) for name in ARCHIVED_COLUMNS],
+            select(*(moved.c[getattr(Notification, name).key] for name in ARCHIVED_COLUMNS)),
+        )
+        .returning(NotificationArchive.user_id)
+    )
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(stmt)).scalars().all()
+        await db.commit()
+
+    if user_ids:
+        await delete_cache_keys([f"dashboard:{user_id}" for user_id in set(user_ids)])
+    return len(user_ids)
+
+
+async def purge_archive_batch(cutoff: datetime, batch_size: int) -> int:
+    """Delete one batch of archived rows older than the cutoff"""
+    due = (
+        select(NotificationArchive.id)
+        .where(NotificationArchive.created_at < cutoff)
+        .limit(batch_size)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(NotificationArchive).where(NotificationArchive.id.in_(due.scalar_subquery()))
+        )
+        await db.commit()
+    return result.rowcount
+
+
+async def apply_notification_retention():
+    """Scheduled entry point"""
+    now = datetime.now(timezone.utc)
+    batch_size = settings.NOTIFICATION_RETENTION_BATCH
+
+    archived = 0
+    cutoff = now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    for _ in range(settings.NOTIFICATION_RETENTION_MAX_BATCHES):
+        moved = await archive_batch(cutoff, batch_size)
+        archived += moved
+        metrics.increment("notifications_archived_total", moved)
+        if moved < batch_size:
+            break
+
+    purged = 0
+    if settings.NOTIFICATION_ARCHIVE_PURGE_DAYS:
+        cutoff = now - timedelta(days=settings.NOTIFICATION_ARCHIVE_PURGE_DAYS)
+        for _ in range(settings.NOTIFICATION_RETENTION_MAX_BATCHES):
+            deleted = await purge_archive_batch(cutoff, batch_size)
+            purged += deleted
+            metrics.increment("notifications_purged_total", deleted)
+            if deleted < batch_size:
+                break
+
+    if archived or purged:
+        logger.info(f"Notification retention: {archived} archived, {purged} purged")
@@ -0,0 +1,389 @@
+"""
+Bulk import of historical payments
+Records are read and parsed as a stream (JSON arrays included) in chunks
+of IMPORT_CHUNK_ROWS, validated against the landlord's leases (loaded
+once) in the thread pool so the event loop stays free, COPY'd into a
+temporary staging table and merged into payments with a single
+INSERT ... SELECT at the end. The whole import is one transaction, and
+rows already present (same lease, due date, payment date and amount) are
+skipped, so a file can be re-imported safely; a dry run reports how many
+rows would be inserted:
+    python -m app.services.payment_import --landlord <uuid> history.csv
+    python -m app.services.payment_import --landlord <uuid> history.jsonl --dry-run --errors errors.csv
+
+Each record identifies its lease by lease_id, or by tenant_email (the
+tenant's lease covering due_date). Other fields: amount, due_date,
+payment_date (default due_date), status (default paid), payment_method,
+late_fee, notes, stripe_payment_intent_id.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+from uuid import UUID
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis_client import init_redis, close_redis, delete_cache_keys, delete_report_caches
+from app.core import metrics
+from app.models.lease import Lease
+from app.models.user import Profile
+from app.schemas.payment import PaymentImportError, PaymentImportReport
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("payment_import_rows_total", "Rows read by payment imports, by outcome")
+
+STATUSES = ("pending", "paid", "late", "failed", "refunded")
+PAYMENT_METHODS = ("card", "bank_transfer", "check", "cash")
+
+STAGING_COLUMNS = (
+    "lease_id", "tenant_id", "amount", "payment_date", "due_date", "status",
+    "payment_method", "notes", "late_fee", "stripe_payment_intent_id",
+)
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE payment_import_staging (
+  lease_id UUID NOT NULL,
+  tenant_id UUID NOT NULL,
+  amount NUMERIC(10, 2) NOT NULL,
+  payment_date DATE NOT NULL,
+  due_date DATE NOT NULL,
+  status TEXT NOT NULL,
+  payment_method TEXT,
+  notes TEXT,
+  late_fee NUMERIC(10, 2) NOT NULL,
+  stripe_payment_intent_id TEXT
+) ON COMMIT DROP
+"""
+
+# Duplicates inside the file collapse via DISTINCT ON; rows already in payments are skipped
+NEW_ROWS_SQL = """
+  SELECT DISTINCT ON (s.lease_id, s.due_date, s.payment_date, s.amount)
+         s.lease_id, s.tenant_id, CAST(:landlord_id AS uuid), s.amount, s.payment_date, s.due_date, s.status,
+         s.payment_method, s.notes, s.late_fee, s.stripe_payment_intent_id
+  FROM payment_import_staging s
+  WHERE NOT EXISTS (
+    SELECT 1 FROM payments p
+    WHERE p.lease_id = s.lease_id AND p.due_date = s.due_date
+      AND p.payment_date = s.payment_date AND p.amount = s.amount
+  )
+  ORDER BY s.lease_id, s.due_date, s.payment_date, s.amount
+"""
+
+MERGE_SQL = f"""
+WITH inserted AS (
+  INSERT INTO payments (lease_id, tenant_id, landlord_id, amount, payment_date, due_date, status,
+                        payment_method, notes, late_fee, stripe_payment_intent_id)
+  {NEW_ROWS_SQL}
+  ON CONFLICT (stripe_payment_intent_id) DO NOTHING
+  RETURNING tenant_id
+)
+SELECT (SELECT count(*) FROM inserted) AS inserted,
+       ARRAY(SELECT DISTINCT tenant_id FROM inserted) AS tenant_ids
+"""
+
+# What a dry run would insert (Stripe intent id conflicts are only found by the real insert)
+COUNT_NEW_SQL = f"SELECT count(*) FROM ({NEW_ROWS_SQL}) AS new_rows"
+
+# Text read per step when streaming a JSON array
+JSON_READ_SIZE = 64 * 1024
+
+Record = Union[dict, str]  # a parsed record, or the reason it could not be parsed
+
+
+class LeaseInfo(NamedTuple):
+    id: UUID
+    tenant_id: UUID
+    start_date: date
+    end_date: date
+
+
+@dataclass
+class LeaseIndex:
+    """The landlord's leases, by id and by tenant email"""
+    by_id: Dict[UUID, LeaseInfo] = field(default_factory=dict)
+    by_email: Dict[str, List[LeaseInfo]] = field(default_factory=lambda: defaultdict(list))
+
+    def resolve(self, record: dict, due_date: Optional[date]) -> Tuple[Optional[LeaseInfo], Optional[str]]:
+        lease_id = _value(record, "lease_id")
+        if lease_id:
+            try:
+                lease = self.by_id.get(UUID(lease_id))
+            except ValueError:
+                return None, f"invalid lease_id {lease_id!r}"
+            return (lease, None) if lease else (None, f"lease {lease_id} not found")
+
+        email = _value(record, "tenant_email").lower()
+        if not email:
+            return None, "lease_id or tenant_email is required"
+        leases = self.by_email.get(email)
+        if not leases:
+            return None, f"no lease for tenant {email}"
+        if due_date:
+            for lease in leases:
+                if lease.start_date <= due_date <= lease.end_date:
+                    return lease, None
+        if len(leases) == 1:
+            return leases[0], None
+        return None, f"no lease for tenant {email} covering due_date"
+
+
+async def load_lease_index(db: AsyncSession, landlord_id: UUID) -> LeaseIndex:
+    index = LeaseIndex()
+    rows = await db.execute(
+        select(Lease.id, Lease.tenant_id, Lease.start_date, Lease.end_date, Profile.email)
+        .join(Profile, Profile.id == Lease.tenant_id)
+        .where(Lease.landlord_id == landlord_id)
+        .order_by(Lease.start_date)
+    )
+    for row in rows:
+        lease = LeaseInfo(row.id, row.tenant_id, row.start_date, row.end_date)
+        index.by_id[row.id] = lease
+        index.by_email[row.email.lower()].append(lease)
+    return index
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Record]:
+    """Records from a CSV file (with header), JSON Lines, or a JSON array"""
+    reader = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(reader)
+        return
+
+    for line in reader:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("["):
+            yield from _iter_json_array(line[1:], reader)
+            return
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield f"invalid JSON: {e}"
+            continue
+        yield record if isinstance(record, dict) else "record is not an object"
+
+
+def _iter_json_array(buffer: str, reader: TextIO) -> Iterator[Record]:
+    """Elements of a JSON array, decoded one at a time as the text is read"""
+    decoder = json.JSONDecoder()
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(","):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if eof:
+                    yield f"invalid JSON: {e}"
+                    return
+            else:
+                # A value running to the end of the buffer may be cut short (e.g. a number)
+                if end < len(buffer) or eof:
+                    yield record if isinstance(record, dict) else "record is not an object"
+                    buffer = buffer[end:]
+                    continue
+        elif eof:
+            yield "invalid JSON: unterminated array"
+            return
+        more = reader.read(JSON_READ_SIZE)
+        eof = not more
+        buffer += more
+
+
+def _validate_chunk(records: Iterator[Record], leases: "LeaseIndex", size: int) -> List[Tuple[Optional[tuple], List[str]]]:
+    """Read and validate up to `size` records (blocking; run in the thread pool)"""
+    return [validate_record(record, leases) for record in islice(records, size)]
+
+
+def _value(record: dict, key: str) -> str:
+    value = record.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _decimal(record: dict, key: str, errors: List[str], default: Optional[Decimal] = None) -> Optional[Decimal]:
+    value = _value(record, key)
+    if not value:
+        if default is None:
+            errors.append(f"{key} is required")
+        return default
+    try:
+        number = Decimal(value.replace(",", "").lstrip("$"))
+    except InvalidOperation:
+        errors.append(f"{key} is not a number")
+        return None
+    if not number.is_finite() or number < 0 or number >= Decimal("100000000"):
+        errors.append(f"{key} is out of range")
+        return None
+    return number.quantize(Decimal("0.01"))
+
+
+def _date(record: dict, key: str, errors: List[str], required: bool = True) -> Optional[date]:
+    value = _value(record, key)
+    if not value:
+        if required:
+            errors.append(f"{key} is required")
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        errors.append(f"{key} must be YYYY-MM-DD")
+        return None
+
+
+def validate_record(record: Record, leases: LeaseIndex) -> Tuple[Optional[tuple], List[str]]:
+    """A staging row for a record, or the list of problems with it"""
+    if isinstance(record, str):
+        return None, [record]
+
+    errors: List[str] = []
+    amount = _decimal(record, "amount", errors)
+    late_fee = _decimal(record, "late_fee", errors, default=Decimal("0.00"))
+    due_date = _date(record, "due_date", errors)
+    payment_date = _date(record, "payment_date", errors, required=False) or due_date
+
+    status = _value(record, "status").lower() or "paid"
+    if status not in STATUSES:
+        errors.append(f"status must be one of {', '.join(STATUSES)}")
+    method = _value(record, "payment_method").lower() or None
+    if method and method not in PAYMENT_METHODS:
+        errors.append(f"payment_method must be one of {', '.join(PAYMENT_METHODS)}")
+
+    lease, lease_error = leases.resolve(record, due_date)
+    if lease_error:
+        errors.append(lease_error)
+    if errors:
+        return None, errors
+
+    return (
+        lease.id, lease.tenant_id, amount, payment_date, due_date, status, method,
+        _value(record, "notes") or None, late_fee, _value(record, "stripe_payment_intent_id") or None,
+    ), []
+
+
+async def import_payments(
+    db: AsyncSession,
+    landlord_id: UUID,
+    records: Iterable[Record],
+    dry_run: bool = False,
+    max_errors: Optional[int] = None,
+) -> PaymentImportReport:
+    """
+    Validate, stage and merge records; commits unless dry_run (or nothing is valid)
+    The report keeps the first max_errors row errors (default IMPORT_MAX_ERRORS, 0 = all)
+    """
+    started = time.perf_counter()
+    chunk_rows = settings.IMPORT_CHUNK_ROWS
+    max_errors = settings.IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    report = PaymentImportReport(dry_run=dry_run)
+
+    leases = await load_lease_index(db, landlord_id)
+    conn = await db.connection()
+    copy_conn = (await conn.get_raw_connection()).driver_connection
+    await conn.execute(text(CREATE_STAGING_SQL))
+
+    records = iter(records)
+    while True:
+        results = await run_in_threadpool(_validate_chunk, records, leases, chunk_rows)
+        if not results:
+            break
+        chunk: List[tuple] = []
+        for row, errors in results:
+            report.total_rows += 1
+            if errors:
+                report.error_count += 1
+                if max_errors == 0 or len(report.errors) < max_errors:
+                    report.errors.append(PaymentImportError(row=report.total_rows, errors=errors))
+                continue
+            chunk.append(row)
+        if chunk:
+            await copy_conn.copy_records_to_table("payment_import_staging", records=chunk, columns=STAGING_COLUMNS)
+            report.valid_rows += len(chunk)
+
+    tenant_ids = []
+    if report.valid_rows and not dry_run:
+        merged = (await conn.execute(text(MERGE_SQL), {"landlord_id": landlord_id})).one()
+        report.inserted = merged.inserted
+        tenant_ids = merged.tenant_ids or []
+        await db.commit()
+    else:
+        if report.valid_rows:
+            report.inserted = (await conn.execute(text(COUNT_NEW_SQL), {"landlord_id": landlord_id})).scalar_one()
+        await db.rollback()
+    report.skipped_duplicates = report.valid_rows - report.inserted
+
+    if report.inserted and not dry_run:
+        await delete_cache_keys([f"dashboard:{user_id}" for user_id in [landlord_id, *tenant_ids]])
+        await delete_report_caches([landlord_id])
+
+    report.seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_second = round(report.total_rows / report.seconds, 1) if report.seconds else 0.0
+    if not dry_run:
+        metrics.increment("payment_import_rows_total", report.inserted, outcome="inserted")
+        metrics.increment("payment_import_rows_total", report.skipped_duplicates, outcome="duplicate")
+    metrics.increment("payment_import_rows_total", report.error_count, outcome="invalid")
+    logger.info(
+        f"Payment import for {landlord_id}: {report.total_rows} rows, {report.inserted} "
+        f"{'would be inserted' if dry_run else 'inserted'}, "
+        f"{report.error_count} invalid in {report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+    )
+    return report
+
+
+def detect_format(file_name: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (file_name or "").lower()
+    if name.endswith((".json", ".jsonl", ".ndjson")) or "json" in (content_type or ""):
+        return "json"
+    return "csv"
+
+
+async def _main(landlord_id: UUID, path: str, dry_run: bool, errors_path: Optional[str]):
+    await init_redis()
+    try:
+        with open(path, "rb") as f:
+            async with AsyncSessionLocal() as db:
+                report = await import_payments(db, landlord_id, iter_records(f, detect_format(path)), dry_run, max_errors=0)
+        verb = "would insert" if dry_run else "inserted"
+        print(
+            f"{report.total_rows} rows: {report.valid_rows} valid, {verb} {report.inserted}, "
+            f"{report.skipped_duplicates} duplicates, {report.error_count} invalid "
+            f"in {report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+        )
+        if errors_path and report.errors:
+            with open(errors_path, "w", newline="") as out:
+                writer = csv.writer(out)
+                writer.writerow(["row", "errors"])
+                writer.writerows((e.row, "; ".join(e.errors)) for e in report.errors)
+            print(f"Error report written to {errors_path}")
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import historical payments for a landlord")
+    parser.add_argument("file", help="CSV with a header row, JSON Lines, or a JSON array")
+    parser.add_argument("--landlord", type=UUID, required=True)
+    parser.add_argument("--dry-run", action="store_true", help="Validate and stage without writing")
+    parser.add_argument("--errors", help="Write the per-row error report to this CSV file")
+    args = parser.parse_args()
+    asyncio.run(_main(args.landlord, args.file, args.dry_run, args.errors))
@@ -0,0 +1,134 @@
+"""
+Monthly payment rollups
+payment_monthly_rollups is kept current by a statement-level trigger on
+payments (see migration 016), so every write path (endpoints, rent roll,
+late fees, Stripe events) updates it in the same transaction. This module
+reads it for reports and rebuilds it from payments when needed:
+    python -m app.services.payment_rollups --rebuild
+    python -m app.services.payment_rollups --rebuild --landlord <uuid>
+"""
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core import metrics
+from app.models.payment_rollup import PaymentMonthlyRollup
+from app.models.property import Property
+from app.schemas.report import IncomeMonth, IncomeTotals
+
+metrics.describe("payment_rollup_rebuilds_total", "Full or per-landlord rebuilds of the payment rollups")
+
+TOTAL_FIELDS = ("payment_count", "paid_count", "late_count", "billed", "collected", "refunded", "outstanding", "late_fees")
+
+# Same definitions as the trigger, computed over the whole history
+REBUILD_SQL = """
+INSERT INTO payment_monthly_rollups (
+  landlord_id, property_id, month, payment_count, paid_count, late_count,
+  billed, collected, refunded, outstanding, late_fees
+)
+SELECT p.landlord_id, l.property_id, date_trunc('month', p.due_date)::date,
+       count(*),
+       count(*) FILTER (WHERE p.status = 'paid'),
+       count(*) FILTER (WHERE p.status = 'late'),
+       SUM(p.amount),
+       COALESCE(SUM(p.amount) FILTER (WHERE p.status = 'paid'), 0),
+       COALESCE(SUM(p.amount) FILTER (WHERE p.status = 'refunded'), 0),
+       COALESCE(SUM(p.amount + COALESCE(p.late_fee, 0)) FILTER (WHERE p.status IN ('pending', 'late', 'failed')), 0),
+       SUM(COALESCE(p.late_fee, 0))
+FROM payments p
+JOIN leases l ON l.id = p.lease_id
+WHERE CAST(:landlord_id AS uuid) IS NULL OR p.landlord_id = :landlord_id
+GROUP BY 1, 2, 3
+"""
+
+
+@dataclass
+class RollupRebuildResult:
+    rows: int
+    seconds: float
+
+
+async def rebuild_payment_rollups(db: AsyncSession, landlord_id: Optional[UUID] = None) -> RollupRebuildResult:
+    """
+    Recompute rollups from payments (all landlords, or one); commits
+    Payment writes wait for the rebuild, so no trigger delta is lost or counted twice
+    """
+    started = time.perf_counter()
+    await db.execute(text("LOCK TABLE payment_monthly_rollups IN EXCLUSIVE MODE"))
+    await db.execute(
+        text("DELETE FROM payment_monthly_rollups WHERE CAST(:landlord_id AS uuid) IS NULL OR landlord_id = :landlord_id"),
+        {"landlord_id": landlord_id},
+    )
+    result = await db.execute(text(REBUILD_SQL), {"landlord_id": landlord_id})
+    await db.commit()
+    metrics.increment("payment_rollup_rebuilds_total", scope="landlord" if landlord_id else "all")
+    return RollupRebuildResult(rows=result.rowcount, seconds=time.perf_counter() - started)
+
+
+def collection_rate(collected: Decimal, billed: Decimal) -> Optional[float]:
+    return round(float(collected / billed), 4) if billed else None
+
+
+async def income_by_month(
+    db: AsyncSession,
+    landlord_id: UUID,
+    start: date,
+    end: date,
+    property_id: Optional[UUID] = None,
+) -> List[IncomeMonth]:
+    """Rollup rows for a landlord between two months (inclusive), by month then property"""
+    query = (
+        select(PaymentMonthlyRollup, Property.address)
+        .join(Property, Property.id == PaymentMonthlyRollup.property_id)
+        .where(
+            PaymentMonthlyRollup.landlord_id == landlord_id,
+            PaymentMonthlyRollup.month.between(start, end),
+            PaymentMonthlyRollup.payment_count > 0,
+        )
+        .order_by(PaymentMonthlyRollup.month, Property.address)
+    )
+    if property_id:
+        query = query.where(PaymentMonthlyRollup.property_id == property_id)
+
+    months = []
+    for rollup, address in (await db.execute(query)).all():
+        months.append(IncomeMonth(
+            property_id=rollup.property_id,
+            address=address,
+            month=rollup.month,
+            collection_rate=collection_rate(rollup.collected, rollup.billed),
+            **{field: getattr(rollup, field) for field in TOTAL_FIELDS},
+        ))
+    return months
+
+
+def sum_totals(months: List[IncomeMonth]) -> IncomeTotals:
+    totals = {field: sum(getattr(m, field) for m in months) for field in TOTAL_FIELDS}
+    return IncomeTotals(**totals, collection_rate=collection_rate(Decimal(totals["collected"]), Decimal(totals["billed"])))
+
+
+async def _main(landlord_id: Optional[UUID]):
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await rebuild_payment_rollups(db, landlord_id)
+        scope = f"landlord {landlord_id}" if landlord_id else "all landlords"
+        print(f"Rebuilt payment rollups for {scope}: {result.rows} rows in {result.seconds:.2f}s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild monthly payment rollups from payments")
+    parser.add_argument("--rebuild", action="store_true", required=True)
+    parser.add_argument("--landlord", type=UUID, help="Only rebuild this landlord's rollups")
+    args = parser.parse_args()
+    asyncio.run(_main(args.landlord))
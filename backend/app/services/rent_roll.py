@@ -0,0 +1,145 @@
+"""
+Monthly rent roll
+Creates the pending rent payment of every active lease for a month in a
+single INSERT ... SELECT. A lease never gets two payments with the same
+due date, so runs can be repeated safely (scheduled or from the CLI):
+    python -m app.services.rent_roll --month 2026-11
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+import argparse
+import asyncio
+import logging
+import time
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis_client import init_redis, close_redis, delete_cache_keys, delete_report_caches
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("rent_roll_payments_created_total", "Pending rent payments created by the rent roll")
+
+# Serializes concurrent runs (scheduler and CLI) for the NOT EXISTS guard
+LOCK_KEY = zlib.crc32(b"leasewell:rent_roll")
+
+# Due day comes from lease terms ("rent_due_day"), clamped to the month's length
+RENT_ROLL_SQL = """
+WITH due AS (
+  SELECT l.id AS lease_id, l.tenant_id, l.landlord_id, l.monthly_rent, l.start_date, l.end_date,
+         make_date(:year, :month, LEAST(
+           CASE WHEN l.terms->>'rent_due_day' ~ '^[0-9]{{1,2}}$'
+                THEN GREATEST((l.terms->>'rent_due_day')::int, 1)
+                ELSE :default_day END,
+           :days_in_month
+         )) AS due_date
+  FROM {leases} l
+  WHERE l.status = 'active'
+    AND l.start_date <= :month_end
+    AND l.end_date >= :month_start
+),
+created AS (
+  INSERT INTO {payments} (lease_id, tenant_id, landlord_id, amount, payment_date, due_date, status, notes, late_fee)
+  SELECT d.lease_id, d.tenant_id, d.landlord_id, d.monthly_rent, d.due_date, d.due_date, 'pending', :notes, 0
+  FROM due d
+  WHERE d.due_date BETWEEN d.start_date AND d.end_date
+    AND NOT EXISTS (
+      SELECT 1 FROM {payments} p WHERE p.lease_id = d.lease_id AND p.due_date = d.due_date
+    )
+  RETURNING landlord_id, tenant_id
+)
+SELECT (SELECT count(*) FROM created) AS created,
+       ARRAY(SELECT landlord_id FROM created UNION SELECT tenant_id FROM created) AS user_ids
+"""
+
+
+@dataclass
+class RentRollResult:
+    month: date
+    created: int
+    affected_users: int
+    seconds: float
+
+
+def month_bounds(month: date):
+    """First and last day of the month containing `month`"""
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+async def generate_rent_roll(
+    db: AsyncSession,
+    month: date,
+    leases_table: str = "leases",
+    payments_table: str = "payments",
+) -> RentRollResult:
+    """Create missing pending payments for `month`; commits and invalidates caches"""
+    started = time.perf_counter()
+    start, end = month_bounds(month)
+
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    row = (await db.execute(
+        text(RENT_ROLL_SQL.format(leases=leases_table, payments=payments_table)),
+        {
+            "year": start.year,
+            "month": start.month,
+            "days_in_month": end.day,
+            "default_day": settings.RENT_DEFAULT_DUE_DAY,
+            "month_start": start,
+            "month_end": end,
+            "notes": f"Rent for {start:%B %Y}",
+        }
+    )).one()
+    await db.commit()
+
+    user_ids = row.user_ids or []
+    for i in range(0, len(user_ids), 1000):
+        await delete_cache_keys([f"dashboard:{user_id}" for user_id in user_ids[i:i + 1000]])
+        await delete_report_caches(user_ids[i:i + 1000])
+
+    metrics.increment("rent_roll_payments_created_total", row.created)
+    return RentRollResult(
+        month=start,
+        created=row.created,
+        affected_users=len(user_ids),
+        seconds=time.perf_counter() - started,
+    )
+
+
+async def run_rent_roll():
+    """Scheduled entry point: bill the month that is RENT_ROLL_LEAD_DAYS away"""
+    month = date.today() + timedelta(days=settings.RENT_ROLL_LEAD_DAYS)
+    async with AsyncSessionLocal() as db:
+        result = await generate_rent_roll(db, month)
+    if result.created:
+        logger.info(
+            f"Rent roll {result.month:%Y-%m}: {result.created} payments for "
+            f"{result.affected_users} users in {result.seconds:.2f}s"
+        )
+
+
+async def _main(month: date):
+    await init_redis()
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await generate_rent_roll(db, month)
+        print(
+            f"Rent roll {result.month:%Y-%m}: {result.created} payments created, "
+            f"{result.affected_users} users affected in {result.seconds:.2f}s"
+        )
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate pending rent payments for a month")
+    parser.add_argument("--month", default=date.today().strftime("%Y-%m"), help="YYYY-MM (default: this month)")
+    args = parser.parse_args()
+    asyncio.run(_main(date.fromisoformat(f"{args.month}-01")))
@@ -0,0 +1,418 @@
+"""
+Stripe webhook ingestion and processing
+The webhook endpoint only verifies and stores each event (deduplicated by
+Stripe event id); this worker claims pending events with SKIP LOCKED and
+applies them to payments with one set-based UPDATE per batch. Each
+intent's events are walked in the order Stripe created them against the
+payment's current status, so a batch holding failed -> succeeded ->
+refunded lands on refunded. Events that would move a payment backwards
+are ignored; events that cannot apply yet (a refund before the payment is
+paid, or no payment with that intent) stay pending and are retried with
+exponential backoff until STRIPE_EVENT_MAX_ATTEMPTS. If a batch fails
+outright its events are retried one by one, so a single bad event is the
+only one charged an attempt.
+
+Recorded events can be replayed locally without Stripe:
+    python -m app.services.stripe_events plan fixtures/stripe/*.json
+    python -m app.services.stripe_events replay fixtures/stripe/*.json --process
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+
+import stripe
+from sqlalchemy import select, update, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis_client import init_redis, close_redis, delete_cache_keys, delete_report_caches
+from app.core import metrics
+from app.models.stripe_event import StripeEvent
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("stripe_events_received_total", "Verified Stripe webhook events stored")
+metrics.describe("stripe_events_processed_total", "Stripe events applied or ignored by the worker")
+
+# Later states win when two events for an intent share a timestamp
+STATUS_RANK = {"pending": 0, "late": 0, "failed": 1, "paid": 2, "refunded": 3}
+
+# Each target status lists the states it may move a payment from
+ALLOWED_FROM = {
+    "paid": {"pending", "late", "failed"},
+    "failed": {"pending", "late"},
+    "refunded": {"paid"},
+}
+
+# The expected status guards against a payment that changed after it was read
+APPLY_SQL = """
+UPDATE payments p
+SET status = v.status,
+    payment_date = COALESCE(v.paid_on, p.payment_date),
+    stripe_charge_id = COALESCE(v.charge_id, p.stripe_charge_id),
+    updated_at = now()
+FROM unnest(
+  CAST(:intents AS text[]), CAST(:expected AS text[]), CAST(:statuses AS text[]),
+  CAST(:paid_on AS date[]), CAST(:charge_ids AS text[])
+) AS v(intent, expected, status, paid_on, charge_id)
+WHERE p.stripe_payment_intent_id = v.intent
+  AND p.status = v.expected
+RETURNING p.stripe_payment_intent_id, p.landlord_id, p.tenant_id
+"""
+
+CURRENT_SQL = """
+SELECT stripe_payment_intent_id, status
+FROM payments
+WHERE stripe_payment_intent_id = ANY(CAST(:intents AS text[]))
+FOR UPDATE
+"""
+
+
+@dataclass
+class PaymentUpdate:
+    intent_id: str
+    status: str
+    paid_on: Optional[date]
+    charge_id: Optional[str]
+    created: int
+    event_id: Optional[str] = None
+
+
+@dataclass
+class PaymentOutcome:
+    """The net change for one payment and what happened to each of its events"""
+    intent_id: str
+    expected: str
+    status: str
+    paid_on: Optional[date]
+    charge_id: Optional[str]
+    applied: List[str]
+    superseded: List[str]
+    deferred: List[str]
+
+
+def verify_event(payload: bytes, signature: Optional[str], secret: Optional[str] = None) -> dict:
+    """Check the Stripe-Signature header and return the parsed event; raises ValueError"""
+    try:
+        stripe.WebhookSignature.verify_header(
+            payload.decode("utf-8"),
+            signature or "",
+            secret or settings.STRIPE_WEBHOOK_SECRET,
+            settings.STRIPE_WEBHOOK_TOLERANCE,
+        )
+        event = json.loads(payload)
+    except (stripe.SignatureVerificationError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(str(e))
+    if not isinstance(event, dict) or not event.get("id") or not event.get("type"):
+        raise ValueError("Not a Stripe event")
+    return event
+
+
+def sign_payload(payload: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """A valid Stripe-Signature header for a payload (used to replay fixtures)"""
+    timestamp = timestamp or int(time.time())
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+async def record_event(db: AsyncSession, event: dict) -> bool:
+    """Store a verified event; returns False if it was already recorded"""
+    created = event.get("created")
+    result = await db.execute(
+        pg_insert(StripeEvent)
+        .values(
+            id=event["id"],
+            type=event["type"],
+            payload=event,
+            livemode=bool(event.get("livemode")),
+            stripe_created_at=datetime.fromtimestamp(created, timezone.utc) if created else None,
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+        .returning(StripeEvent.id)
+    )
+    inserted = result.scalar_one_or_none() is not None
+    if inserted:
+        metrics.increment("stripe_events_received_total", type=event["type"])
+    return inserted
+
+
+def payment_update_for(event: dict) -> Optional[PaymentUpdate]:
+    """What an event means for its payment, or None if it does not affect one"""
+    obj = (event.get("data") or {}).get("object") or {}
+    created = int(event.get("created") or 0)
+    event_type = event.get("type")
+    event_id = event.get("id")
+
+    if event_type == "payment_intent.succeeded":
+        charge = obj.get("latest_charge")
+        return PaymentUpdate(
+            intent_id=obj.get("id"),
+            status="paid",
+            paid_on=datetime.fromtimestamp(created, timezone.utc).date() if created else None,
+            charge_id=charge.get("id") if isinstance(charge, dict) else charge,
+            created=created,
+            event_id=event_id,
+        )
+    if event_type == "payment_intent.payment_failed":
+        return PaymentUpdate(
+            intent_id=obj.get("id"), status="failed", paid_on=None, charge_id=None, created=created, event_id=event_id,
+        )
+    if event_type == "charge.refunded" and obj.get("refunded"):
+        intent = obj.get("payment_intent")
+        return PaymentUpdate(
+            intent_id=intent.get("id") if isinstance(intent, dict) else intent,
+            status="refunded",
+            paid_on=None,
+            charge_id=obj.get("id"),
+            created=created,
+            event_id=event_id,
+        )
+    return None
+
+
+def plan_payment_updates(events: Iterable[dict]) -> Dict[str, List[PaymentUpdate]]:
+    """Group a batch of events by payment intent, oldest first"""
+    plan: Dict[str, List[PaymentUpdate]] = {}
+    for event in events:
+        change = payment_update_for(event)
+        if change is None or not change.intent_id:
+            continue
+        plan.setdefault(change.intent_id, []).append(change)
+    for changes in plan.values():
+        changes.sort(key=lambda u: (u.created, STATUS_RANK[u.status]))
+    return plan
+
+
+def resolve_payment(intent_id: str, current: str, changes: List[PaymentUpdate]) -> PaymentOutcome:
+    """Walk an intent's changes in order from the payment's current status"""
+    outcome = PaymentOutcome(
+        intent_id=intent_id, expected=current, status=current, paid_on=None, charge_id=None,
+        applied=[], superseded=[], deferred=[],
+    )
+    for change in changes:
+        if outcome.status in ALLOWED_FROM[change.status]:
+            outcome.status = change.status
+            outcome.paid_on = change.paid_on or outcome.paid_on
+            outcome.charge_id = change.charge_id or outcome.charge_id
+            outcome.applied.append(change.event_id)
+        elif STATUS_RANK.get(outcome.status, 0) >= STATUS_RANK[change.status]:
+            # The payment is already at or past this state
+            outcome.superseded.append(change.event_id)
+        else:
+            # e.g. a refund before the payment is paid; the earlier event may still arrive
+            outcome.deferred.append(change.event_id)
+    return outcome
+
+
+async def _apply(db: AsyncSession, plan: Dict[str, List[PaymentUpdate]]) -> Tuple[List, Set[str], Set[str]]:
+    """Apply the plan; returns changed payment rows, applied event ids and ignored event ids"""
+    if not plan:
+        return [], set(), set()
+    current = dict((await db.execute(text(CURRENT_SQL), {"intents": list(plan)})).all())
+    outcomes = [
+        resolve_payment(intent_id, current[intent_id], changes)
+        for intent_id, changes in plan.items()
+        if intent_id in current
+    ]
+    ignored = {event_id for outcome in outcomes for event_id in outcome.superseded}
+    updates = [outcome for outcome in outcomes if outcome.applied]
+    if not updates:
+        return [], set(), ignored
+
+    rows = (await db.execute(text(APPLY_SQL), {
+        "intents": [u.intent_id for u in updates],
+        "expected": [u.expected for u in updates],
+        "statuses": [u.status for u in updates],
+        "paid_on": [u.paid_on for u in updates],
+        "charge_ids": [u.charge_id for u in updates],
+    })).all()
+    updated = {row.stripe_payment_intent_id for row in rows}
+    applied = {event_id for u in updates if u.intent_id in updated for event_id in u.applied}
+    return rows, applied, ignored
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Delay before retry number `attempts`, with jitter"""
+    base = settings.STRIPE_EVENT_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    capped = min(base, settings.STRIPE_EVENT_RETRY_MAX_SECONDS)
+    return timedelta(seconds=capped * random.uniform(0.8, 1.2))
+
+
+@dataclass
+class BatchOutcome:
+    """What one committed batch did"""
+    changed: List = field(default_factory=list)
+    applied: int = 0
+    handled: int = 0
+    retry: Dict[str, str] = field(default_factory=dict)
+
+    def merge(self, other: "BatchOutcome"):
+        self.changed.extend(other.changed)
+        self.applied += other.applied
+        self.handled += other.handled
+        self.retry.update(other.retry)
+
+
+async def _claim_events(db: AsyncSession, limit: int, ids: Optional[List[str]] = None) -> List[StripeEvent]:
+    query = (
+        select(StripeEvent)
+        .where(StripeEvent.status == "pending", StripeEvent.next_attempt_at <= datetime.now(timezone.utc))
+        .order_by(StripeEvent.next_attempt_at, StripeEvent.received_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if ids is not None:
+        query = query.where(StripeEvent.id.in_(ids))
+    return (await db.execute(query)).scalars().all()
+
+
+async def _handle_events(db: AsyncSession, events: List[StripeEvent]) -> BatchOutcome:
+    """Apply claimed events and mark the finished ones; commits"""
+    changed, applied, ignored = await _apply(db, plan_payment_updates(event.payload for event in events))
+    now = datetime.now(timezone.utc)
+    outcome = BatchOutcome(changed=list(changed), applied=len(applied))
+    done = []
+    for event in events:
+        if event.id in applied:
+            status = "processed"
+        elif event.id in ignored or payment_update_for(event.payload) is None:
+            status = "ignored"
+        else:
+            outcome.retry[event.id] = "Payment not found or not yet in a state this event applies to"
+            continue
+        done.append({
+            "id": event.id,
+            "status": status,
+            "attempts": event.attempts + 1,
+            "processed_at": now,
+            "last_error": None,
+        })
+    if done:
+        await db.execute(update(StripeEvent), done)
+    await db.commit()
+    outcome.handled = len(done)
+    return outcome
+
+
+async def _handle_one_by_one(event_ids: List[str]) -> BatchOutcome:
+    """After a batch fails, retry its events singly so only the bad ones are charged an attempt"""
+    outcome = BatchOutcome()
+    for event_id in event_ids:
+        async with AsyncSessionLocal() as db:
+            events = await _claim_events(db, 1, [event_id])
+            if not events:
+                continue
+            try:
+                outcome.merge(await _handle_events(db, events))
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Stripe event {event_id} failed: {e}", exc_info=True)
+                outcome.retry[event_id] = str(e)
+    return outcome
+
+
+async def _record_failure(errors: Dict[str, str]):
+    """Count a failed attempt per event and schedule its retry; events out of attempts are marked failed"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(StripeEvent.id, StripeEvent.attempts).where(StripeEvent.id.in_(list(errors)))
+        )).all()
+        await db.execute(update(StripeEvent), [
+            {
+                "id": row.id,
+                "attempts": row.attempts + 1,
+                "last_error": errors[row.id][:1000],
+                "status": "failed" if row.attempts + 1 >= settings.STRIPE_EVENT_MAX_ATTEMPTS else "pending",
+                "next_attempt_at": now + retry_delay(row.attempts + 1),
+            }
+            for row in rows
+        ])
+        await db.commit()
+    for row in rows:
+        if row.attempts + 1 >= settings.STRIPE_EVENT_MAX_ATTEMPTS:
+            logger.error(f"Stripe event {row.id} failed after {row.attempts + 1} attempts: {errors[row.id]}")
+
+
+async def process_stripe_events() -> int:
+    """Apply due pending events to payments; returns how many events were handled"""
+    handled = 0
+    batch_size = settings.STRIPE_EVENT_BATCH_SIZE
+    while True:
+        async with AsyncSessionLocal() as db:
+            events = await _claim_events(db, batch_size)
+            if not events:
+                return handled
+            event_ids = [event.id for event in events]
+            try:
+                outcome = await _handle_events(db, events)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Stripe event batch failed, retrying events one by one: {e}", exc_info=True)
+                outcome = None
+        if outcome is None:
+            outcome = await _handle_one_by_one(event_ids)
+
+        if outcome.retry:
+            await _record_failure(outcome.retry)
+        changed = outcome.changed
+        users = {row.landlord_id for row in changed} | {row.tenant_id for row in changed}
+        await delete_cache_keys([f"dashboard:{user_id}" for user_id in users])
+        await delete_report_caches({row.landlord_id for row in changed})
+        handled += outcome.handled
+        metrics.increment("stripe_events_processed_total", outcome.handled)
+        if changed:
+            logger.info(f"Applied {outcome.applied} Stripe events, {len(changed)} payments updated")
+        if len(events) < batch_size:
+            return handled
+
+
+def _load_fixtures(paths: List[str]) -> List[bytes]:
+    payloads = []
+    for path in paths:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+    return payloads
+
+
+async def _replay(paths: List[str], process: bool):
+    secret = settings.STRIPE_WEBHOOK_SECRET or "whsec_local_replay"
+    await init_redis()
+    try:
+        async with AsyncSessionLocal() as db:
+            for path, payload in zip(paths, _load_fixtures(paths)):
+                event = verify_event(payload, sign_payload(payload, secret), secret)
+                new = await record_event(db, event)
+                print(f"{path}: {event['type']} {event['id']} {'recorded' if new else 'duplicate'}")
+            await db.commit()
+        if process:
+            print(f"Processed {await process_stripe_events()} events")
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded Stripe webhook events")
+    parser.add_argument("command", choices=["plan", "replay"], help="plan: show payment updates only (no database)")
+    parser.add_argument("fixtures", nargs="+", help="Event JSON files")
+    parser.add_argument("--process", action="store_true", help="Run the worker after recording (replay only)")
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        events = [json.loads(payload) for payload in _load_fixtures(args.fixtures)]
+        for intent_id, changes in plan_payment_updates(events).items():
+            for update_ in changes:
+                print(f"{intent_id}: -> {update_.status} (event={update_.event_id}, paid_on={update_.paid_on}, charge={update_.charge_id})")
+    else:
+        asyncio.run(_replay(args.fixtures, args.process))
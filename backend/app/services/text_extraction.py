@@ -0,0 +1,149 @@
+"""
+PDF text extraction worker
+Fills Document.extracted_text so PDF contents are searchable. A batch is
+claimed (text_claimed_at) and committed before any file is parsed, so no
+row lock is held during extraction; each file is parsed in its own
+process, which is killed if it overruns TEXT_EXTRACTION_TIMEOUT
+"""
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import tempfile
+
+from sqlalchemy import select, update, or_, bindparam, null
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.blob_store import TMP_DIR
+from app.core.process_pool import run_in_killable_process, killable_process_limit
+from app.core.storage import get_storage, fetch_local_copy
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+
+
+def extract_pdf_text(path: str, max_chars: int) -> str:
+    """Extract plain text from a PDF (runs in a worker process)"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    parts = []
+    total = 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        total += len(text)
+        if total >= max_chars:
+            break
+    # Postgres text columns cannot hold NUL bytes
+    return "\n".join(parts)[:max_chars].replace("\x00", "")
+
+
+async def _copy_known_text(db) -> int:
+    """Reuse text already extracted for documents with the same content hash"""
+    source = aliased(Document)
+    result = await db.execute(
+        update(Document)
+        .where(
+            Document.text_extracted_at.is_(None),
+            Document.mime_type == PDF_MIME_TYPE,
+            Document.content_hash == source.content_hash,
+            source.text_extracted_at.isnot(None),
+        )
+        .values(extracted_text=source.extracted_text, text_extracted_at=source.text_extracted_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def _extract_one(storage, file_path: str, is_blob: bool, semaphore: asyncio.Semaphore) -> str:
+    async with semaphore:
+        with tempfile.TemporaryDirectory(dir=TMP_DIR) as tmp_dir:
+            if is_blob:
+                local_path = await fetch_local_copy(storage, file_path, tmp_dir)
+            else:
+                local_path = file_path  # Legacy upload, path relative to the working directory
+            return await run_in_killable_process(
+                extract_pdf_text, local_path, settings.TEXT_EXTRACTION_MAX_CHARS,
+                timeout=settings.TEXT_EXTRACTION_TIMEOUT
+            )
+
+
+async def _claim_batch():
+    """Mark a batch as claimed and commit; returns (claimed_at, rows, copied)"""
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.TEXT_EXTRACTION_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        copied = await _copy_known_text(db)
+        pending = (
+            select(Document.id)
+            .where(
+                Document.text_extracted_at.is_(None),
+                Document.mime_type == PDF_MIME_TYPE,
+                or_(Document.text_claimed_at.is_(None), Document.text_claimed_at < stale_before),
+            )
+            .order_by(Document.created_at)
+            .limit(settings.TEXT_EXTRACTION_BATCH)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(Document)
+            .where(Document.id.in_(pending))
+            .values(text_claimed_at=now)
+            .returning(Document.id, Document.file_path, Document.content_hash)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await db.commit()
+    return now, rows, copied
+
+
+# Only the worker holding the claim writes, so a batch taken over after
+# going stale is not written twice
+SAVE_TEXT = (
+    update(Document.__table__)
+    .where(
+        Document.__table__.c.id == bindparam("doc_id"),
+        Document.__table__.c.text_claimed_at == bindparam("claimed_at"),
+        Document.__table__.c.text_extracted_at.is_(None),
+    )
+    .values(extracted_text=bindparam("text"), text_extracted_at=bindparam("extracted_at"), text_claimed_at=null())
+)
+
+
+async def extract_pending_documents():
+    """Extract text for PDFs that have none yet, one claimed batch at a time"""
+    storage = get_storage()
+    semaphore = asyncio.Semaphore(killable_process_limit())
+    while True:
+        claimed_at, rows, copied = await _claim_batch()
+        if not rows:
+            return
+
+        # Identical content is extracted once per batch
+        by_hash = {}
+        for row in rows:
+            by_hash.setdefault(row.content_hash or row.file_path, row)
+        texts = await asyncio.gather(
+            *(_extract_one(storage, row.file_path, bool(row.content_hash), semaphore) for row in by_hash.values()),
+            return_exceptions=True
+        )
+        extracted = dict(zip(by_hash.keys(), texts))
+
+        now = datetime.now(timezone.utc)
+        params = []
+        for row in rows:
+            text = extracted[row.content_hash or row.file_path]
+            if isinstance(text, BaseException):
+                # Marked as done with no text so a broken file is not retried forever
+                logger.warning(f"Text extraction failed for document {row.id}: {text!r}")
+                text = ""
+            params.append({"doc_id": row.id, "claimed_at": claimed_at, "text": text, "extracted_at": now})
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(SAVE_TEXT, params)
+            await db.commit()
+        logger.info(f"Extracted text for {len(params)} documents ({copied} reused by hash)")
@@ -0,0 +1,18 @@
+"""
+Unread counter drift repair
+Periodically checks the Redis unread counters against Postgres
+"""
+import logging
+
+from app.core.database import AsyncSessionLocal
+from app.core.unread_counts import reconcile_unread_counters
+
+logger = logging.getLogger(__name__)
+
+
+async def repair_unread_counters():
+    """Scheduled entry point"""
+    async with AsyncSessionLocal() as db:
+        result = await reconcile_unread_counters(db)
+    if result["repaired"]:
+        logger.info(f"Unread counters: {result['repaired']} of {result['checked']} drifted and were reset")
@@ -0,0 +1,112 @@
+"""
+Notification fan-out throughput benchmark
+
+Inserts the same announcement for N synthetic recipients into a temp copy
+of the notifications table with each strategy and reports rows/sec:
+    python benchmark_fanout.py --recipients 100000
+    python benchmark_fanout.py --recipients 100000 --with-redis
+--with-redis also times the post-commit step (unread counters and
+real-time publish) and deletes the Redis keys it created afterwards.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from sqlalchemy import MetaData, insert, text
+
+from app.core import redis_client as cache
+from app.core.database import engine
+from app.core.realtime import stream_key
+from app.core.unread_counts import counter_key
+from app.models.notification import Notification
+from app.services.notification_fanout import dispatch_created
+
+TITLE = "Water shutoff"
+MESSAGE = "Water will be shut off on Tuesday from 9am to 1pm for pipe repairs."
+
+bench = Notification.__table__.to_metadata(MetaData(), name="bench_notifications")
+RETURNING = (bench.c.id, bench.c.user_id, bench.c.title, bench.c.message, bench.c.type,
+             bench.c.action_url, bench.c.read, bench.c.created_at)
+
+INSERT_SELECT_SQL = """
+INSERT INTO bench_notifications (user_id, title, message, type, metadata, read)
+SELECT user_id, :title, :message, 'system', CAST(:data AS jsonb), false
+FROM bench_recipients
+RETURNING id, user_id, title, message, type, action_url, read, created_at
+"""
+
+
+def report(label: str, rows: int, elapsed: float):
+    print(f"   {label:34} {rows:>9,} rows  {elapsed:7.2f}s  {rows / elapsed:>11,.0f} rows/s")
+
+
+async def run_benchmark(recipients: int, sample: int, batch: int, with_redis: bool):
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE TEMP TABLE bench_notifications (LIKE notifications INCLUDING DEFAULTS)"))
+        await conn.execute(text("CREATE TEMP TABLE bench_recipients (user_id uuid)"))
+        await conn.execute(text(
+            "INSERT INTO bench_recipients SELECT gen_random_uuid() FROM generate_series(1, :n)"
+        ), {"n": recipients})
+        user_ids = (await conn.execute(text("SELECT user_id FROM bench_recipients"))).scalars().all()
+        rows = [
+            {"user_id": user_id, "title": TITLE, "message": MESSAGE, "type": "system", "metadata": {}}
+            for user_id in user_ids
+        ]
+        print(f"📣 Fanning out to {recipients:,} recipients")
+
+        # Baseline: one INSERT round trip per row, timed on a sample
+        started = time.perf_counter()
+        for row in rows[:sample]:
+            await conn.execute(insert(bench).values(**row))
+        report(f"row-by-row (sample of {sample:,})", sample, time.perf_counter() - started)
+        await conn.execute(text("TRUNCATE bench_notifications"))
+
+        started = time.perf_counter()
+        for start in range(0, len(rows), batch):
+            (await conn.execute(insert(bench).returning(*RETURNING), rows[start:start + batch])).all()
+        report(f"executemany, {batch:,}/batch", recipients, time.perf_counter() - started)
+        await conn.execute(text("TRUNCATE bench_notifications"))
+
+        started = time.perf_counter()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "bench_notifications",
+            records=[(uuid.uuid4(), row["user_id"], TITLE, MESSAGE, "system", "{}") for row in rows],
+            columns=["id", "user_id", "title", "message", "type", "metadata"],
+        )
+        report("COPY", recipients, time.perf_counter() - started)
+        await conn.execute(text("TRUNCATE bench_notifications"))
+
+        started = time.perf_counter()
+        created = (await conn.execute(text(INSERT_SELECT_SQL), {
+            "title": TITLE, "message": MESSAGE, "data": json.dumps({}),
+        })).all()
+        report("INSERT ... SELECT (service path)", len(created), time.perf_counter() - started)
+
+        if with_redis:
+            await cache.init_redis()
+            if cache.redis_client:
+                started = time.perf_counter()
+                await dispatch_created(created)
+                report("counters + publish", len(created), time.perf_counter() - started)
+                keys = [key for row in created for key in (counter_key(row.user_id), stream_key(row.user_id))]
+                for start in range(0, len(keys), 10_000):
+                    await cache.redis_client.delete(*keys[start:start + 10_000])
+                await cache.close_redis()
+            else:
+                print("   Redis unavailable, skipping dispatch")
+
+        await conn.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=2_000, help="Rows for the row-by-row baseline")
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--with-redis", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.recipients, args.sample, args.batch, args.with_redis))
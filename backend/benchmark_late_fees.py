@@ -0,0 +1,132 @@
+"""
+Late-fee engine throughput benchmark
+
+Times the vectorized fee computation on N synthetic payments (no database
+needed), against a per-row Python loop over a sample, and optionally the
+full load/compute/UPDATE cycle on temp tables:
+    python benchmark_late_fees.py --payments 1000000
+    python benchmark_late_fees.py --payments 1000000 --database
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.services.late_fees import assess_fees, assess_late_fees
+
+AS_OF = date(2026, 11, 20)
+
+SEED_LEASES_SQL = """
+INSERT INTO bench_leases (id, property_id, tenant_id, landlord_id, start_date, end_date, monthly_rent, status, terms)
+SELECT gen_random_uuid(), gen_random_uuid(), gen_random_uuid(), gen_random_uuid(),
+       DATE '2025-01-01', DATE '2027-12-31', 900 + (g % 2000), 'active',
+       CASE WHEN g % 3 = 0 THEN '{"late_fee": {"grace_days": 3, "flat": 25, "daily": 5, "max": 150}}'::jsonb
+            WHEN g % 3 = 1 THEN '{"late_fee": {"percent": 5}}'::jsonb
+            ELSE '{}'::jsonb END
+FROM generate_series(1, :leases) g
+"""
+
+SEED_PAYMENTS_SQL = """
+INSERT INTO bench_payments (id, lease_id, tenant_id, landlord_id, amount, payment_date, due_date, status, late_fee)
+SELECT gen_random_uuid(), l.id, l.tenant_id, l.landlord_id, l.monthly_rent,
+       DATE '2026-11-20' - (g % 60), DATE '2026-11-20' - (g % 60), 'pending', 0
+FROM bench_leases l, generate_series(1, :per_lease) g
+"""
+
+
+def synthetic_columns(n: int, rng: np.random.Generator) -> dict:
+    return {
+        "amount": rng.uniform(800, 3000, n).round(2),
+        "due_date": np.datetime64(AS_OF, "D") - rng.integers(1, 60, n),
+        "current_fee": np.zeros(n),
+        "is_late": rng.random(n) < 0.2,
+        "enabled": rng.random(n) < 0.95,
+        "grace_days": rng.integers(0, 8, n),
+        "flat": rng.choice([0.0, 25.0, 50.0], n),
+        "percent": rng.choice([0.0, 5.0], n),
+        "daily": rng.choice([0.0, 5.0, 10.0], n),
+        "max_fee": rng.choice([0.0, 150.0, 200.0], n),
+    }
+
+
+def per_row_fees(cols: dict, count: int) -> list:
+    """The straightforward Python loop, for comparison"""
+    fees = []
+    for i in range(count):
+        days_late = (AS_OF - cols["due_date"][i].astype(date)).days
+        if not cols["enabled"][i] or days_late <= cols["grace_days"][i]:
+            fees.append(None)
+            continue
+        fee = cols["flat"][i] + cols["amount"][i] * cols["percent"][i] / 100
+        fee += cols["daily"][i] * max(days_late - cols["grace_days"][i], 0)
+        if cols["max_fee"][i] > 0:
+            fee = min(fee, cols["max_fee"][i])
+        fees.append(round(fee, 2))
+    return fees
+
+
+async def run_database(payments: int, batch: int):
+    leases = max(payments // 10, 1)
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE TEMP TABLE bench_leases (LIKE leases INCLUDING DEFAULTS)"))
+        await conn.execute(text("CREATE TEMP TABLE bench_payments (LIKE payments INCLUDING DEFAULTS)"))
+        print(f"🌱 Seeding {leases * 10:,} payments on {leases:,} leases...")
+        started = time.perf_counter()
+        await conn.execute(text(SEED_LEASES_SQL), {"leases": leases})
+        await conn.execute(text(SEED_PAYMENTS_SQL), {"per_lease": 10})
+        await conn.execute(text("ALTER TABLE bench_payments ADD PRIMARY KEY (id)"))
+        await conn.execute(text("ALTER TABLE bench_leases ADD PRIMARY KEY (id)"))
+        await conn.execute(text("ANALYZE bench_leases"))
+        await conn.execute(text("ANALYZE bench_payments"))
+        await conn.commit()
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+
+        db = AsyncSession(bind=conn)
+        for label, dry_run in (("dry run", True), ("first run", False), ("repeat run", False)):
+            result = await assess_late_fees(
+                db, AS_OF, dry_run=dry_run, batch_size=batch,
+                payments_table="bench_payments", leases_table="bench_leases",
+            )
+            print(f"   {label:10} scanned {result.scanned:>9,}  updated {result.updated:>9,}  "
+                  f"{result.seconds:6.2f}s  {result.scanned / result.seconds:>10,.0f} payments/s")
+        await db.close()
+        await conn.execute(text("DROP TABLE bench_leases, bench_payments"))
+        await conn.commit()
+    await engine.dispose()
+
+
+def run_compute(payments: int, sample: int):
+    rng = np.random.default_rng(42)
+    cols = synthetic_columns(payments, rng)
+    print(f"🧮 Computing late fees for {payments:,} payments")
+
+    started = time.perf_counter()
+    fee_cents, overdue, changed = assess_fees(
+        AS_OF, cols["amount"], cols["due_date"], cols["current_fee"], cols["is_late"], cols["enabled"],
+        cols["grace_days"], cols["flat"], cols["percent"], cols["daily"], cols["max_fee"],
+    )
+    elapsed = time.perf_counter() - started
+    print(f"   vectorized   {elapsed * 1000:8.1f} ms  {payments / elapsed:>14,.0f} payments/s  "
+          f"({int(changed.sum()):,} would change)")
+
+    started = time.perf_counter()
+    per_row_fees(cols, sample)
+    elapsed = time.perf_counter() - started
+    print(f"   per-row loop {elapsed * 1000:8.1f} ms  {sample / elapsed:>14,.0f} payments/s  (sample of {sample:,})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payments", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=100_000, help="Rows for the per-row baseline")
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--database", action="store_true", help="Also run the full cycle on temp tables")
+    args = parser.parse_args()
+    run_compute(args.payments, args.sample)
+    if args.database:
+        asyncio.run(run_database(args.payments, args.batch))
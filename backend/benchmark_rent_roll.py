@@ -0,0 +1,67 @@
+"""
+Rent roll benchmark
+
+Seeds temp copies of the leases and payments tables with N active leases
+and times the rent roll for one month, then times a repeat run (which
+must create nothing) to show the cost of the idempotency guard:
+    python benchmark_rent_roll.py --leases 100000
+Redis is not used, so cache invalidation is not part of the timings.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.services.rent_roll import generate_rent_roll
+
+SEED_SQL = """
+INSERT INTO bench_leases (id, property_id, tenant_id, landlord_id, start_date, end_date, monthly_rent, status, terms)
+SELECT gen_random_uuid(), gen_random_uuid(), gen_random_uuid(), landlords.ids[1 + (g % :landlords)],
+       DATE '2024-01-01' + (g % 365), DATE '2027-12-31', 900 + (g % 2000), 'active',
+       CASE WHEN g % 4 = 0 THEN jsonb_build_object('rent_due_day', 1 + g % 31) ELSE '{}'::jsonb END
+FROM generate_series(1, :leases) g,
+     (SELECT array_agg(gen_random_uuid()) AS ids FROM generate_series(1, :landlords)) landlords
+"""
+
+
+async def run_benchmark(leases: int, landlords: int, month: date):
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE TEMP TABLE bench_leases (LIKE leases INCLUDING DEFAULTS)"))
+        await conn.execute(text("CREATE TEMP TABLE bench_payments (LIKE payments INCLUDING DEFAULTS)"))
+        await conn.execute(text("CREATE INDEX ON bench_payments (lease_id, due_date)"))
+        await conn.execute(text("CREATE INDEX ON bench_leases (start_date, end_date) WHERE status = 'active'"))
+
+        print(f"🌱 Seeding {leases:,} active leases across {landlords:,} landlords...")
+        started = time.perf_counter()
+        await conn.execute(text(SEED_SQL), {"leases": leases, "landlords": landlords})
+        await conn.execute(text("ANALYZE bench_leases"))
+        await conn.commit()
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+        print()
+
+        db = AsyncSession(bind=conn)
+        for label in ("first run", "repeat run"):
+            result = await generate_rent_roll(db, month, leases_table="bench_leases", payments_table="bench_payments")
+            rate = result.created / result.seconds if result.created else 0
+            print(f"🧾 {label:11} {result.created:>9,} payments  {result.affected_users:>9,} users  "
+                  f"{result.seconds:6.2f}s  {rate:>9,.0f} payments/s")
+            await conn.execute(text("ANALYZE bench_payments"))
+            await conn.commit()
+        await db.close()
+
+        await conn.execute(text("DROP TABLE bench_leases, bench_payments"))
+        await conn.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leases", type=int, default=100_000)
+    parser.add_argument("--landlords", type=int, default=2_000)
+    parser.add_argument("--month", default="2026-11", help="YYYY-MM")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.leases, args.landlords, date.fromisoformat(f"{args.month}-01")))
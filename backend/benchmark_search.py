@@ -0,0 +1,97 @@
+"""
+Full-text search latency benchmark
+
+Copies the documents table definition (generated search_vector and GIN
+index included, foreign keys excluded) into a temp table, fills it with
+synthetic rows and times ranked, permission-filtered queries:
+    python benchmark_search.py --rows 1000000
+Requires migration 009_full_text_search.sql to be applied.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+WORDS = [
+    "water", "heater", "invoice", "lease", "renewal", "inspection", "roof", "leak",
+    "plumbing", "receipt", "insurance", "policy", "hvac", "filter", "deposit", "refund",
+    "parking", "garage", "appliance", "dishwasher", "mold", "paint", "carpet", "window",
+    "smoke", "detector", "pest", "control", "landscaping", "snow", "removal", "electric",
+]
+
+QUERIES = ["water heater invoice", "roof leak", "lease renewal", "smoke detector", "\"pest control\" receipt"]
+
+SEED_SQL = """
+INSERT INTO bench_documents (id, property_id, uploaded_by, file_name, file_path, description, extracted_text, created_at)
+SELECT
+  gen_random_uuid(),
+  props.ids[1 + (g % :properties)],
+  CAST(:owner AS uuid),
+  w[1 + (g * 7) % cardinality(w)] || '_' || w[1 + (g * 13) % cardinality(w)] || '_' || g || '.pdf',
+  'bench/' || g,
+  w[1 + (g * 3) % cardinality(w)] || ' ' || w[1 + (g * 5) % cardinality(w)] || ' ' || w[1 + (g * 11) % cardinality(w)],
+  array_to_string(ARRAY(SELECT w[1 + ((g + i) * 17) % cardinality(w)] FROM generate_series(1, 60) i), ' '),
+  now() - (g % 1000) * interval '1 hour'
+FROM generate_series(1, :rows) g,
+     (SELECT CAST(:words AS text[]) AS w) words,
+     (SELECT array_agg(gen_random_uuid()) AS ids FROM generate_series(1, :properties)) props
+"""
+
+SEARCH_SQL = """
+SELECT id, ts_rank_cd(search_vector, q) AS rank
+FROM bench_documents, websearch_to_tsquery('english', :query) q
+WHERE search_vector @@ q
+  AND property_id = ANY(:property_ids)
+ORDER BY rank DESC, created_at DESC
+LIMIT 20
+"""
+
+
+async def run_benchmark(rows: int, properties: int, landlord_properties: int, repeats: int):
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE TEMP TABLE bench_documents (LIKE documents INCLUDING ALL)"))
+
+        print(f"🌱 Seeding {rows:,} documents across {properties:,} properties...")
+        started = time.perf_counter()
+        await conn.execute(text(SEED_SQL), {
+            "rows": rows, "properties": properties, "words": WORDS,
+            "owner": "00000000-0000-0000-0000-000000000000",
+        })
+        await conn.execute(text("ANALYZE bench_documents"))
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+
+        # One landlord's slice of the portfolio
+        result = await conn.execute(text(
+            "SELECT array_agg(property_id) FROM "
+            "(SELECT DISTINCT property_id FROM bench_documents LIMIT :n) s"
+        ), {"n": landlord_properties})
+        property_ids = result.scalar()
+        print(f"🔐 Filtering to {len(property_ids)} properties")
+        print()
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                hits = (await conn.execute(text(SEARCH_SQL), {"query": query, "property_ids": property_ids})).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"   {query!r:28} {len(hits):>3} hits  p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms")
+
+        await conn.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--properties", type=int, default=20_000)
+    parser.add_argument("--landlord-properties", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.rows, args.properties, args.landlord_properties, args.repeats))
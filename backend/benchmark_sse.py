@@ -0,0 +1,119 @@
+"""
+SSE idle-connection load test
+
+Opens many concurrent connections to /api/v1/notifications/stream against a
+single uvicorn worker, keeps them idle through several heartbeats and
+reports how many stayed healthy, plus the worker's own view from /metrics:
+    uvicorn app.main:app --workers 1 --limit-concurrency 20000 &
+    python benchmark_sse.py --connections 10000 --user-id <profile uuid>
+Raise the open-file limit on both sides first (ulimit -n 65536).
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from app.core.auth import create_access_token
+
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.heartbeats = 0
+        self.dropped = 0
+        self.connect_ms = []
+
+
+async def hold_connection(host: str, port: int, path: str, token: str, duration: float, stats: Stats):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write((
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n"
+            f"Authorization: Bearer {token}\r\n\r\n"
+        ).encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        if b" 200 " not in status_line:
+            stats.failed += 1
+            writer.close()
+            return
+        stats.connected += 1
+        stats.connect_ms.append((time.perf_counter() - started) * 1000)
+    except OSError:
+        stats.failed += 1
+        return
+
+    deadline = time.monotonic() + duration
+    try:
+        while (remaining := deadline - time.monotonic()) > 0:
+            line = await asyncio.wait_for(reader.readline(), timeout=remaining)
+            if not line:
+                stats.dropped += 1
+                return
+            if b": ping" in line:
+                stats.heartbeats += 1
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        writer.close()
+
+
+async def read_metrics(host: str, port: int) -> dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    body = (await reader.read()).decode().split("\r\n\r\n", 1)[-1]
+    writer.close()
+    values = {}
+    for line in body.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            values[name] = float(value)
+    return values
+
+
+async def run_load_test(url: str, connections: int, user_id: str, duration: float, ramp: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < connections + 100:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, connections + 1000), hard))
+
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = "/api/v1/notifications/stream"
+    token = create_access_token(data={"sub": user_id})
+    stats = Stats()
+
+    print(f"🔌 Opening {connections:,} SSE connections to {host}:{port} ({ramp}/s)...")
+    tasks = []
+    started = time.perf_counter()
+    for i in range(connections):
+        tasks.append(asyncio.create_task(hold_connection(host, port, path, token, duration, stats)))
+        if (i + 1) % ramp == 0:
+            await asyncio.sleep(1)
+    await asyncio.sleep(2)
+    print(f"   {stats.connected:,} connected, {stats.failed:,} failed in {time.perf_counter() - started:.1f}s")
+    if stats.connect_ms:
+        stats.connect_ms.sort()
+        p99 = stats.connect_ms[min(len(stats.connect_ms) - 1, int(len(stats.connect_ms) * 0.99))]
+        print(f"   connect p50 {statistics.median(stats.connect_ms):.1f} ms  p99 {p99:.1f} ms")
+
+    server = await read_metrics(host, port)
+    print(f"📈 Worker reports {int(server.get('sse_connections', 0)):,} open SSE connections")
+
+    print(f"😴 Holding idle for {duration:.0f}s...")
+    await asyncio.gather(*tasks)
+    print(f"   {stats.heartbeats:,} heartbeats received, {stats.dropped:,} connections dropped early")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--user-id", required=True, help="Profile id the test token is issued for")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to hold connections idle")
+    parser.add_argument("--ramp", type=int, default=1000, help="New connections per second")
+    args = parser.parse_args()
+    asyncio.run(run_load_test(args.url, args.connections, args.user_id, args.duration, args.ramp))
@@ -0,0 +1,77 @@
+"""
+Upload throughput benchmark for the configured storage backend
+
+Run against a local S3-compatible stand-in, e.g. MinIO:
+    docker run -p 9000:9000 minio/minio server /data
+    STORAGE_TYPE=s3 S3_BUCKET=leasewell S3_ENDPOINT_URL=http://localhost:9000 \\
+        AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin \\
+        python benchmark_storage.py --size-mb 256 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.storage import get_storage
+
+
+def make_source_file(size_mb: int) -> Path:
+    """Write a file of random bytes to upload"""
+    fd, name = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    return Path(name)
+
+
+async def run_benchmark(size_mb: int, runs: int):
+    """Upload the same file several times and report MB/s"""
+    storage = get_storage()
+
+    if storage.name == "s3":
+        try:
+            storage.client.create_bucket(Bucket=settings.S3_BUCKET)
+        except Exception:
+            pass  # Bucket already exists
+
+    print(f"📦 Backend: {storage.name}")
+    print(f"📏 File size: {size_mb} MB, runs: {runs}")
+    if storage.name == "s3":
+        print(f"   multipart chunk: {settings.S3_MULTIPART_CHUNK_MB} MB, "
+              f"concurrency: {settings.S3_MULTIPART_CONCURRENCY}")
+    print()
+
+    source = make_source_file(size_mb)
+    timings = []
+    try:
+        for run in range(runs):
+            # put_file consumes its input, so upload a fresh copy each run
+            copy = source.with_suffix(f".{run}")
+            shutil.copyfile(source, copy)
+            key = f"benchmark/upload-{run}.bin"
+
+            started = time.perf_counter()
+            await storage.put_file(key, copy, "application/octet-stream")
+            elapsed = time.perf_counter() - started
+            timings.append(elapsed)
+            print(f"   run {run + 1}: {elapsed:.2f}s ({size_mb / elapsed:.1f} MB/s)")
+
+            await storage.delete(key)
+    finally:
+        source.unlink(missing_ok=True)
+
+    best = min(timings)
+    print()
+    print(f"✅ Best: {size_mb / best:.1f} MB/s, mean: {size_mb * runs / sum(timings):.1f} MB/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=128)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.size_mb, args.runs))
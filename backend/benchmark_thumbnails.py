@@ -0,0 +1,72 @@
+"""
+Thumbnail/preview rendering throughput for a batch of photos
+
+Generates synthetic camera-sized JPEGs and renders every derivative size
+through the same process pool the API uses:
+    python benchmark_thumbnails.py --photos 1000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from app.core.images import render_derivatives, DERIVATIVE_SIZES
+
+
+def make_photo(path: str, width: int, height: int, seed: int):
+    """Write a noisy gradient JPEG so the encoder does real work"""
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40 + seed % 20)
+    Image.merge("RGB", (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT))).save(
+        path, "JPEG", quality=90
+    )
+
+
+def render_one(args):
+    source_path, out_dir = args
+    os.makedirs(out_dir, exist_ok=True)
+    return render_derivatives(source_path, out_dir)
+
+
+def run_benchmark(photos: int, workers: int, width: int, height: int, distinct: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🖼  Creating {distinct} source photos ({width}x{height})...")
+        sources = []
+        for i in range(distinct):
+            path = os.path.join(tmp, f"src_{i}.jpg")
+            make_photo(path, width, height, i)
+            sources.append(path)
+        source_mb = sum(os.path.getsize(p) for p in sources) / distinct / 1024 / 1024
+
+        jobs = [(sources[i % distinct], os.path.join(tmp, "out", str(i))) for i in range(photos)]
+
+        print(f"⚙️  Rendering {photos} photos x {len(DERIVATIVE_SIZES)} sizes with {workers} workers...")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_one, jobs, chunksize=8))
+        elapsed = time.perf_counter() - started
+
+        out_bytes = {name: 0 for name in DERIVATIVE_SIZES}
+        for outputs in results:
+            for name, path in outputs:
+                out_bytes[name] += os.path.getsize(path)
+
+    print()
+    print(f"✅ {photos / elapsed:.1f} photos/s ({elapsed:.1f}s total)")
+    print(f"   average source: {source_mb:.2f} MB")
+    for name, total in out_bytes.items():
+        print(f"   average {name}: {total / photos / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--photos", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--distinct", type=int, default=20, help="distinct source images to cycle through")
+    args = parser.parse_args()
+    run_benchmark(args.photos, args.workers, args.width, args.height, args.distinct)
@@ -0,0 +1,24 @@
+"""
+Shared fixtures; Redis is replaced by fakeredis (with Lua) so scripts run for real
+"""
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core import redis_client as cache
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine function against a fresh fake Redis on its own event loop"""
+    def runner(test, *args):
+        async def main():
+            cache.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True, max_connections=2 ** 31)  # unbounded, like redis.from_url
+            try:
+                return await test(*args)
+            finally:
+                await cache.redis_client.aclose()
+                cache.redis_client = None
+        return asyncio.run(main())
+    return runner
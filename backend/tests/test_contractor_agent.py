@@ -0,0 +1,235 @@
+"""
+Contractor agent outcomes against the fake quote source: statuses, backoff,
+re-claimed attempts and quote replacement on re-runs
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.sql.dml import Delete, Insert
+
+from app.core.config import settings
+from app.core.quote_sources import FakeQuoteSource, QuoteRequest, get_quote_source, set_quote_source
+from app.services import contractor_agent
+from app.services.contractor_agent import (
+    FINISH_SQL, AgentJob, AgentRunResult, retry_delay, run_contractor_agent, save_outcomes, shop,
+)
+
+
+class FakeResult:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.ids
+
+
+class FakeAgentDb:
+    """maintenance_requests agent columns and contractor_quotes standing in for Postgres"""
+
+    def __init__(self):
+        self.requests = {}
+        self.quotes = []
+
+    def add_request(self, status="pending", attempts=0):
+        request_id = uuid4()
+        self.requests[request_id] = {"agent_status": status, "agent_attempts": attempts, "agent_next_attempt_at": None}
+        return request_id
+
+    def quotes_for(self, request_id):
+        return [q for q in self.quotes if q["maintenance_request_id"] == request_id]
+
+    async def claim(self, limit):
+        """What claim_jobs does: due pending requests become shopping with one more attempt"""
+        now = datetime.now(timezone.utc)
+        jobs = []
+        for request_id, row in self.requests.items():
+            if len(jobs) == limit:
+                break
+            if row["agent_status"] != "pending" or (row["agent_next_attempt_at"] or now) > now:
+                continue
+            row["agent_status"] = "shopping"
+            row["agent_attempts"] += 1
+            jobs.append(make_job(request_id, row["agent_attempts"]))
+        return jobs
+
+    def finish(self, params):
+        saved = []
+        for request_id, attempts, status, next_attempt in zip(
+            params["ids"], params["attempts"], params["statuses"], params["next_attempts"]
+        ):
+            row = self.requests[request_id]
+            if row["agent_status"] == "shopping" and row["agent_attempts"] == attempts:
+                row["agent_status"] = status
+                row["agent_next_attempt_at"] = next_attempt
+                saved.append(request_id)
+        return saved
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, db: FakeAgentDb):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        await asyncio.sleep(0)
+        if isinstance(statement, Insert):
+            self.db.quotes.extend(params)
+            return FakeResult([])
+        if isinstance(statement, Delete):
+            values = statement.compile().params
+            request_ids = next(v for v in values.values() if isinstance(v, list))
+            status = next(v for v in values.values() if isinstance(v, str))
+            self.db.quotes = [
+                q for q in self.db.quotes
+                if not (q["maintenance_request_id"] in request_ids and q["status"] == status)
+            ]
+            return FakeResult([])
+        assert statement.text == FINISH_SQL
+        return FakeResult(self.db.finish(params))
+
+    async def commit(self):
+        pass
+
+
+def make_job(request_id, attempts=1):
+    return AgentJob(
+        request=QuoteRequest(
+            maintenance_request_id=request_id,
+            landlord_id=uuid4(),
+            title="Leaking kitchen sink",
+            description="Water under the sink",
+            category="plumbing",
+            priority="medium",
+            address="1 Example St",
+            city="Springfield",
+            state="IL",
+            zip_code="00000",
+        ),
+        attempts=attempts,
+    )
+
+
+@pytest.fixture
+def agent_db(monkeypatch):
+    db = FakeAgentDb()
+    monkeypatch.setattr(contractor_agent, "AsyncSessionLocal", db.session)
+    monkeypatch.setattr(contractor_agent, "claim_jobs", db.claim)
+    yield db
+    set_quote_source(None)
+
+
+def test_save_outcomes_sets_completed_retry_and_failed(agent_db, monkeypatch):
+    monkeypatch.setattr(settings, "CONTRACTOR_AGENT_MAX_ATTEMPTS", 3)
+    failing = [agent_db.add_request("shopping", 1), agent_db.add_request("shopping", 3)]
+    ok = agent_db.add_request("shopping", 1)
+    source = FakeQuoteSource(fail_ids=failing)
+    set_quote_source(source)
+
+    async def main():
+        jobs = [make_job(ok, 1), make_job(failing[0], 1), make_job(failing[1], 3)]
+        outcomes = await asyncio.gather(*(shop(get_quote_source(), job) for job in jobs))
+        result = AgentRunResult()
+        before = datetime.now(timezone.utc)
+        await save_outcomes(outcomes, result)
+        return result, before
+
+    result, before = asyncio.run(main())
+
+    assert (result.completed, result.retried, result.failed) == (1, 1, 1)
+    assert agent_db.requests[ok]["agent_status"] == "completed"
+    assert agent_db.requests[failing[0]]["agent_status"] == "pending"
+    assert agent_db.requests[failing[1]]["agent_status"] == "failed"
+    assert agent_db.requests[failing[1]]["agent_next_attempt_at"] is None
+
+    retry_at = agent_db.requests[failing[0]]["agent_next_attempt_at"]
+    assert before + retry_delay(1) <= retry_at <= datetime.now(timezone.utc) + retry_delay(1)
+
+    assert len(agent_db.quotes_for(ok)) == settings.CONTRACTOR_QUOTES_PER_REQUEST == result.quotes
+    assert not agent_db.quotes_for(failing[0]) and not agent_db.quotes_for(failing[1])
+    assert source.calls == 3
+
+
+def test_retry_delay_doubles_per_attempt(monkeypatch):
+    monkeypatch.setattr(settings, "CONTRACTOR_AGENT_RETRY_SECONDS", 300)
+    assert [retry_delay(n) for n in (1, 2, 3, 4)] == [
+        timedelta(seconds=300), timedelta(seconds=600), timedelta(seconds=1200), timedelta(seconds=2400),
+    ]
+
+
+def test_reclaimed_attempt_is_dropped(agent_db):
+    # Another worker took the stale claim over, so the request is on attempt 2
+    request_id = agent_db.add_request("shopping", 2)
+    set_quote_source(FakeQuoteSource())
+
+    async def main():
+        outcome = await shop(get_quote_source(), make_job(request_id, 1))
+        result = AgentRunResult()
+        await save_outcomes([outcome], result)
+        return outcome, result
+
+    outcome, result = asyncio.run(main())
+
+    assert outcome.error is None and outcome.quotes
+    assert (result.completed, result.retried, result.failed, result.quotes) == (0, 0, 0, 0)
+    assert agent_db.requests[request_id] == {"agent_status": "shopping", "agent_attempts": 2, "agent_next_attempt_at": None}
+    assert not agent_db.quotes
+
+
+def test_rerun_replaces_received_quotes(agent_db):
+    request_id = agent_db.add_request()
+    set_quote_source(FakeQuoteSource())
+
+    first = asyncio.run(run_contractor_agent())
+    quotes = agent_db.quotes_for(request_id)
+    assert first.completed == 1 and len(quotes) == settings.CONTRACTOR_QUOTES_PER_REQUEST
+
+    # The landlord accepted one quote, then queued the request again
+    quotes[0]["status"] = "accepted"
+    agent_db.requests[request_id]["agent_status"] = "pending"
+
+    second = asyncio.run(run_contractor_agent())
+    quotes = agent_db.quotes_for(request_id)
+    assert second.completed == 1
+    assert len(quotes) == settings.CONTRACTOR_QUOTES_PER_REQUEST + 1
+    assert [q["status"] for q in quotes].count("accepted") == 1
+    assert len({q["id"] for q in quotes}) == len(quotes)
+
+
+def test_run_drains_queue_and_retries_failures(agent_db, monkeypatch):
+    monkeypatch.setattr(settings, "CONTRACTOR_AGENT_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "CONTRACTOR_AGENT_MAX_ATTEMPTS", 3)
+    ids = [agent_db.add_request() for _ in range(10)]
+    set_quote_source(FakeQuoteSource(latency=0.001, fail_ids=ids[:3]))
+
+    result = asyncio.run(run_contractor_agent())
+
+    assert (result.completed, result.retried, result.failed) == (7, 3, 0)
+    assert result.quotes == 7 * settings.CONTRACTOR_QUOTES_PER_REQUEST
+    for request_id in ids[:3]:
+        row = agent_db.requests[request_id]
+        assert row["agent_status"] == "pending" and row["agent_next_attempt_at"] is not None
+        assert not agent_db.quotes_for(request_id)
+    assert all(agent_db.requests[i]["agent_status"] == "completed" for i in ids[3:])
+
+
+def test_fake_source_is_deterministic_per_request():
+    request = make_job(uuid4()).request
+
+    async def main():
+        return await FakeQuoteSource().get_quotes(request, 3), await FakeQuoteSource().get_quotes(request, 3)
+
+    first, second = asyncio.run(main())
+    assert first == second and len(first) == 3
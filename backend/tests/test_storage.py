@@ -0,0 +1,155 @@
+"""
+S3 storage backend against moto's in-process S3, and HTTP Range parsing for downloads
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from boto3.s3.transfer import TransferConfig
+from fastapi import HTTPException
+from moto import mock_aws
+
+from app.core.storage import S3Storage
+from app.api.v1.endpoints.documents import _parse_range
+
+BUCKET = "leasewell-test"
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN", "AWS_PROFILE"):
+        monkeypatch.delenv(name, raising=False)
+    with mock_aws():
+        storage = S3Storage(BUCKET, "us-east-1", access_key="testing", secret_key="testing")
+        storage.client.create_bucket(Bucket=BUCKET)
+        yield storage
+
+
+def write_file(tmp_path: Path, name: str, data: bytes) -> Path:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+async def read_all(storage, key, **kwargs) -> bytes:
+    return b"".join([chunk async for chunk in storage.iter_chunks(key, **kwargs)])
+
+
+def test_put_file_uploads_and_removes_the_local_copy(s3, tmp_path):
+    data = os.urandom(4096)
+    path = write_file(tmp_path, "lease.pdf", data)
+
+    async def main():
+        await s3.put_file("documents/ab/lease.pdf", path, "application/pdf")
+        return await s3.exists("documents/ab/lease.pdf"), await s3.size("documents/ab/lease.pdf")
+
+    exists, size = asyncio.run(main())
+    assert exists and size == len(data)
+    assert not path.exists()
+    head = s3.client.head_object(Bucket=BUCKET, Key="documents/ab/lease.pdf")
+    assert head["ContentType"] == "application/pdf"
+
+
+def test_put_file_multipart(s3, tmp_path):
+    # Smallest part size S3 accepts, so an 11 MB file goes up in three parts
+    s3.transfer_config = TransferConfig(multipart_threshold=5 * MB, multipart_chunksize=5 * MB, max_concurrency=3)
+    data = os.urandom(11 * MB)
+    path = write_file(tmp_path, "photos.zip", data)
+
+    async def main():
+        await s3.put_file("documents/cd/photos.zip", path)
+        return await read_all(s3, "documents/cd/photos.zip", chunk_size=MB)
+
+    assert asyncio.run(main()) == data
+    etag = s3.client.head_object(Bucket=BUCKET, Key="documents/cd/photos.zip")["ETag"]
+    assert etag.strip('"').endswith("-3")
+
+
+def test_iter_chunks_ranges(s3, tmp_path):
+    data = bytes(range(256)) * 40
+    path = write_file(tmp_path, "blob.bin", data)
+
+    async def main():
+        await s3.put_file("blob.bin", path)
+        return (
+            await read_all(s3, "blob.bin", chunk_size=1000),
+            await read_all(s3, "blob.bin", start=100, end=199),
+            await read_all(s3, "blob.bin", start=len(data) - 10),
+            [len(chunk) async for chunk in s3.iter_chunks("blob.bin", chunk_size=4096)],
+        )
+
+    whole, middle, tail, sizes = asyncio.run(main())
+    assert whole == data
+    assert middle == data[100:200]
+    assert tail == data[-10:]
+    assert sizes == [4096, 4096, len(data) - 8192]
+
+
+def test_missing_keys(s3):
+    async def main():
+        assert not await s3.exists("nope")
+        with pytest.raises(FileNotFoundError):
+            await s3.size("nope")
+        with pytest.raises(FileNotFoundError):
+            await read_all(s3, "nope")
+        # Deleting a missing object is not an error, as with LocalStorage
+        await s3.delete("nope")
+
+    asyncio.run(main())
+
+
+def test_delete(s3, tmp_path):
+    path = write_file(tmp_path, "old.txt", b"superseded")
+
+    async def main():
+        await s3.put_file("old.txt", path, "text/plain")
+        await s3.delete("old.txt")
+        return await s3.exists("old.txt")
+
+    assert asyncio.run(main()) is False
+
+
+def test_presigned_url(s3):
+    url = asyncio.run(s3.presigned_url("documents/ef/report.pdf", "Q3 report.pdf", "application/pdf", expires_in=120))
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    assert parsed.path.endswith("/documents/ef/report.pdf")
+    assert BUCKET in parsed.netloc + parsed.path
+    if "X-Amz-Expires" in query:
+        assert query["X-Amz-Expires"] == ["120"]
+    else:
+        assert abs(int(query["Expires"][0]) - (time.time() + 120)) < 10
+    assert query["response-content-type"] == ["application/pdf"]
+    assert 'filename="Q3 report.pdf"' in query["response-content-disposition"][0]
+
+    bare = parse_qs(urlparse(asyncio.run(s3.presigned_url("documents/ef/report.pdf"))).query)
+    assert "response-content-disposition" not in bare and "response-content-type" not in bare
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-10", None),
+    ("bytes=0-99,200-299", None),  # multi-range: full body
+    ("bytes=abc-def", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),  # end clamped to the last byte
+    ("bytes=-100", (900, 999)),  # suffix range
+    ("bytes=-5000", (0, 999)),  # suffix longer than the file
+    ("bytes=999-999", (999, 999)),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1500-1600", "bytes=500-100"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(HTTPException) as exc:
+        _parse_range(header, 1000)
+    assert exc.value.status_code == 416
+    assert exc.value.headers["Content-Range"] == "bytes */1000"
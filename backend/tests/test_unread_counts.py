@@ -0,0 +1,159 @@
+"""
+Unread counters under concurrent writers, seeding readers and reconciliation
+"""
+import asyncio
+import random
+import uuid
+
+import pytest
+
+from app.core import redis_client as cache
+from app.core import unread_counts
+from app.core.unread_counts import (
+    counter_key, get_unread_count, adjust_unread, increment_unread, decrement_unread,
+    reset_unread, reconcile_unread_counters,
+)
+
+
+class FakeDb:
+    """Unread counts per user standing in for Postgres; reads yield to other tasks"""
+
+    def __init__(self):
+        self.unread = {}
+
+    async def count(self, db, user_ids):
+        await asyncio.sleep(0)
+        counts = {str(user_id): self.unread.get(str(user_id), 0) for user_id in user_ids}
+        await asyncio.sleep(0)
+        return {user_id: count for user_id, count in counts.items() if count}
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDb()
+    monkeypatch.setattr(unread_counts, "_count_from_db", db.count)
+    return db
+
+
+def test_concurrent_increments_and_decrements_are_not_lost(run):
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        await cache.redis_client.set(counter_key(user_id), 10)
+        writes = [increment_unread([user_id]) for _ in range(300)] + [decrement_unread(user_id) for _ in range(200)]
+        random.Random(1).shuffle(writes)
+        await asyncio.gather(*writes)
+        return await get_unread_count(user_id)
+
+    assert run(scenario) == 110
+
+
+def test_decrements_never_go_below_zero(run):
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        await cache.redis_client.set(counter_key(user_id), 3, ex=60)
+        await asyncio.gather(*(decrement_unread(user_id, 2) for _ in range(20)))
+        return await cache.redis_client.get(counter_key(user_id)), await cache.redis_client.ttl(counter_key(user_id))
+
+    value, ttl = run(scenario)
+    assert value == "0"
+    assert ttl > 0  # KEEPTTL keeps the expiry when clamping
+
+
+def test_adjusting_a_cold_counter_does_not_create_it(run):
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        await asyncio.gather(*(adjust_unread({user_id: 1}) for _ in range(50)))
+        return await cache.redis_client.exists(counter_key(user_id))
+
+    assert run(scenario) == 0
+
+
+def test_counters_converge_with_concurrent_writers_seeders_and_reconciler(run, fake_db):
+    users = [str(uuid.uuid4()) for _ in range(5)]
+    rng = random.Random(7)
+
+    async def writer(user_id):
+        # Commit first, then adjust the counter, like the endpoints do
+        for _ in range(40):
+            if rng.random() < 0.6 or not fake_db.unread.get(user_id):
+                fake_db.unread[user_id] = fake_db.unread.get(user_id, 0) + 1
+                await asyncio.sleep(0)
+                await increment_unread([user_id])
+            else:
+                fake_db.unread[user_id] -= 1
+                await asyncio.sleep(0)
+                await decrement_unread(user_id)
+
+    async def mark_all_read(user_id):
+        await asyncio.sleep(0.001)
+        fake_db.unread[user_id] = 0
+        await reset_unread(user_id)
+
+    async def seeder(user_id):
+        for _ in range(10):
+            await cache.redis_client.delete(counter_key(user_id))  # expired or evicted
+            count = await get_unread_count(user_id, fake_db)
+            assert count >= 0
+
+    async def reconciler():
+        for _ in range(10):
+            await reconcile_unread_counters(fake_db, batch_size=2)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(
+            *(writer(user_id) for user_id in users),
+            *(seeder(user_id) for user_id in users),
+            mark_all_read(users[0]),
+            reconciler(),
+        )
+        values = [await cache.redis_client.get(counter_key(user_id)) for user_id in users]
+        assert all(value is None or int(value) >= 0 for value in values)
+
+        # Once writers are quiet, one reconciliation pass plus a read is exact
+        await reconcile_unread_counters(fake_db)
+        return [await get_unread_count(user_id, fake_db) for user_id in users]
+
+    assert run(scenario) == [fake_db.unread.get(user_id, 0) for user_id in users]
+
+
+def test_reconcile_keeps_a_counter_that_changed_while_it_was_checked(run, fake_db, monkeypatch):
+    user_id = str(uuid.uuid4())
+    fake_db.unread[user_id] = 5
+
+    async def count_during_write(db, user_ids):
+        counts = await FakeDb.count(fake_db, db, user_ids)
+        # A notification lands between the MGET and the compare-and-delete
+        fake_db.unread[user_id] += 1
+        await increment_unread([user_id])
+        return counts
+
+    monkeypatch.setattr(unread_counts, "_count_from_db", count_during_write)
+
+    async def scenario():
+        await cache.redis_client.set(counter_key(user_id), 9)  # drifted
+        result = await reconcile_unread_counters(fake_db)
+        return result, await cache.redis_client.get(counter_key(user_id))
+
+    result, value = run(scenario)
+    assert result == {"checked": 1, "repaired": 0}
+    assert value == "10"
+
+
+def test_reconcile_drops_drifted_counters_only(run, fake_db):
+    drifted, accurate = str(uuid.uuid4()), str(uuid.uuid4())
+    fake_db.unread.update({drifted: 2, accurate: 4})
+
+    async def scenario():
+        await cache.redis_client.set(counter_key(drifted), 7)
+        await cache.redis_client.set(counter_key(accurate), 4)
+        result = await reconcile_unread_counters(fake_db)
+        return result, await get_unread_count(drifted, fake_db), await get_unread_count(accurate)
+
+    assert run(scenario) == ({"checked": 2, "repaired": 1}, 2, 4)
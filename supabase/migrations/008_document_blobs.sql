@@ -0,0 +1,23 @@
+-- =====================================================
+-- CONTENT-ADDRESSED DOCUMENT STORAGE
+-- Uploads are stored once per SHA-256 and reference counted
+-- =====================================================
+
+CREATE TABLE document_blobs (
+  sha256 TEXT PRIMARY KEY,
+  file_path TEXT NOT NULL,
+  size BIGINT NOT NULL,
+  mime_type TEXT,
+  ref_count INTEGER NOT NULL DEFAULT 0 CHECK (ref_count >= 0),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Documents point at their blob by hash; legacy rows keep a NULL hash
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE INDEX idx_documents_content_hash ON documents(content_hash);
+
+-- Comments
+COMMENT ON TABLE document_blobs IS 'Deduplicated document content keyed by SHA-256';
+COMMENT ON COLUMN document_blobs.ref_count IS 'Number of documents referencing this blob; the blob is deleted when it reaches zero';
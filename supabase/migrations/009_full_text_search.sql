@@ -0,0 +1,34 @@
+-- =====================================================
+-- FULL-TEXT SEARCH
+-- Weighted tsvector columns with GIN indexes for documents and
+-- maintenance requests; PDF text is filled in by a background worker
+-- =====================================================
+
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS extracted_text TEXT,
+  ADD COLUMN IF NOT EXISTS text_extracted_at TIMESTAMP WITH TIME ZONE;
+
+ALTER TABLE documents
+  ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(file_name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(extracted_text, '')), 'C')
+  ) STORED;
+
+ALTER TABLE maintenance_requests
+  ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+  ) STORED;
+
+CREATE INDEX idx_documents_search ON documents USING GIN (search_vector);
+CREATE INDEX idx_maintenance_search ON maintenance_requests USING GIN (search_vector);
+
+-- Queue of PDFs still waiting for text extraction
+CREATE INDEX idx_documents_text_pending ON documents(created_at)
+  WHERE text_extracted_at IS NULL AND mime_type = 'application/pdf';
+
+-- Comments
+COMMENT ON COLUMN documents.extracted_text IS 'Plain text extracted from the file (PDFs), used for search';
+COMMENT ON COLUMN documents.search_vector IS 'Weighted search vector: file name (A), description (B), extracted text (C)';
@@ -0,0 +1,31 @@
+-- =====================================================
+-- EMAIL OUTBOX
+-- Transactional emails are written in the same transaction as the
+-- invitation or reset token and delivered by a background worker
+-- =====================================================
+
+CREATE TABLE email_outbox (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  to_email TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  html TEXT NOT NULL,
+  category TEXT,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  claimed_at TIMESTAMP WITH TIME ZONE,
+  last_error TEXT,
+  provider_message_id TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  sent_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Only undelivered mail is scanned by the worker
+CREATE INDEX idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status = 'pending';
+-- Claims whose worker died are found by age
+CREATE INDEX idx_email_outbox_sending ON email_outbox(claimed_at) WHERE status = 'sending';
+
+-- Comments
+COMMENT ON TABLE email_outbox IS 'Transactional outbox drained by the email delivery worker';
+COMMENT ON COLUMN email_outbox.next_attempt_at IS 'Earliest time of the next delivery attempt (exponential backoff)';
+COMMENT ON COLUMN email_outbox.claimed_at IS 'When a worker claimed the message for sending; stale claims are taken over';
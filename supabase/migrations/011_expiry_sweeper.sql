@@ -0,0 +1,15 @@
+-- =====================================================
+-- EXPIRY SWEEPER
+-- Partial indexes so the background sweeper only scans rows that can
+-- still expire, no matter how much history accumulates
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_invitations_pending_expiry
+  ON invitations(expires_at) WHERE status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_leases_active_end_date
+  ON leases(end_date) WHERE status = 'active';
+
+-- Comments
+COMMENT ON INDEX idx_invitations_pending_expiry IS 'Pending invitations by expiry, scanned by the expiry sweeper';
+COMMENT ON INDEX idx_leases_active_end_date IS 'Active leases by end date, scanned by the expiry sweeper';
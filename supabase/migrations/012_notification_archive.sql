@@ -0,0 +1,38 @@
+-- =====================================================
+-- NOTIFICATION RETENTION
+-- Read notifications older than the retention window are moved to an
+-- archive table in small batches, keeping the hot table and its indexes
+-- small. Archived rows stay readable on request
+-- =====================================================
+
+CREATE TABLE notifications_archive (
+  id UUID PRIMARY KEY,
+  user_id UUID REFERENCES profiles(id) ON DELETE CASCADE NOT NULL,
+  title TEXT NOT NULL,
+  message TEXT NOT NULL,
+  type TEXT,
+  read BOOLEAN DEFAULT TRUE,
+  action_url TEXT,
+  metadata JSONB DEFAULT '{}'::jsonb,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_notifications_archive_user_created ON notifications_archive(user_id, created_at DESC);
+CREATE INDEX idx_notifications_archive_created ON notifications_archive(created_at);
+
+-- Listing is per user, newest first
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at DESC);
+
+-- Only read rows are candidates for archiving
+CREATE INDEX IF NOT EXISTS idx_notifications_read_created ON notifications(created_at) WHERE read = TRUE;
+
+ALTER TABLE notifications_archive ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own archived notifications"
+  ON notifications_archive FOR SELECT
+  USING (auth.uid() = user_id);
+
+-- Comments
+COMMENT ON TABLE notifications_archive IS 'Read notifications past the retention window, moved by the retention job';
+COMMENT ON COLUMN notifications_archive.archived_at IS 'When the row was moved out of notifications';
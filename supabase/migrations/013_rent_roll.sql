@@ -0,0 +1,14 @@
+-- =====================================================
+-- RENT ROLL
+-- The monthly rent roll skips leases that already have a payment with
+-- the same due date; this index keeps that check an index probe
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_payments_lease_due_date ON payments(lease_id, due_date);
+
+-- Active leases overlapping a month
+CREATE INDEX IF NOT EXISTS idx_leases_active_dates ON leases(start_date, end_date) WHERE status = 'active';
+
+-- Comments
+COMMENT ON INDEX idx_payments_lease_due_date IS 'Idempotency guard lookup for the monthly rent roll';
+COMMENT ON COLUMN leases.terms IS 'Lease terms; rent_due_day (1-31) sets the rent due day, default 1';
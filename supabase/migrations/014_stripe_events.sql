@@ -0,0 +1,28 @@
+-- =====================================================
+-- STRIPE WEBHOOK EVENTS
+-- Webhooks are verified, stored and acknowledged immediately; a worker
+-- applies them to payments. The Stripe event id is the primary key, so
+-- redeliveries and replays are ignored on insert
+-- =====================================================
+
+CREATE TABLE stripe_events (
+  id TEXT PRIMARY KEY,
+  type TEXT NOT NULL,
+  payload JSONB NOT NULL,
+  livemode BOOLEAN DEFAULT FALSE,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processed', 'ignored', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  stripe_created_at TIMESTAMP WITH TIME ZONE,
+  received_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Only unprocessed events are scanned by the worker, in retry order
+CREATE INDEX idx_stripe_events_pending ON stripe_events(next_attempt_at) WHERE status = 'pending';
+
+-- Comments
+COMMENT ON TABLE stripe_events IS 'Raw Stripe webhook events, deduplicated by event id and processed asynchronously';
+COMMENT ON COLUMN stripe_events.next_attempt_at IS 'Earliest time the worker picks the event up again; pushed back exponentially on each failed attempt';
+COMMENT ON COLUMN stripe_events.stripe_created_at IS 'Event creation time at Stripe; orders events for the same payment intent';
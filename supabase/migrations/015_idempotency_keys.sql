@@ -0,0 +1,23 @@
+-- =====================================================
+-- IDEMPOTENCY KEYS
+-- Clients send an Idempotency-Key header on create requests; the first
+-- request stores its response in the same transaction as the rows it
+-- creates, and retries with the same key get that response back
+-- =====================================================
+
+CREATE TABLE idempotency_keys (
+  user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  key TEXT NOT NULL,
+  fingerprint TEXT NOT NULL,
+  status_code INTEGER,
+  response JSONB,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, key)
+);
+
+-- Expired keys are purged by the expiry sweeper
+CREATE INDEX idx_idempotency_keys_created_at ON idempotency_keys(created_at);
+
+-- Comments
+COMMENT ON TABLE idempotency_keys IS 'Responses of create requests, replayed for retries with the same Idempotency-Key';
+COMMENT ON COLUMN idempotency_keys.fingerprint IS 'sha256 of method, path and body; a reused key with a different request is rejected';
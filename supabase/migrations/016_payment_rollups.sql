@@ -0,0 +1,110 @@
+-- =====================================================
+-- MONTHLY PAYMENT ROLLUPS
+-- Per landlord, property and due month totals, kept current by a
+-- statement-level trigger on payments that applies the net change of
+-- each INSERT/UPDATE/DELETE statement in one upsert. Reports read
+-- these rows instead of scanning payment history; the backend can
+-- rebuild them from scratch (python -m app.services.payment_rollups)
+-- =====================================================
+
+CREATE TABLE payment_monthly_rollups (
+  landlord_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  property_id UUID NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  payment_count INTEGER NOT NULL DEFAULT 0,
+  paid_count INTEGER NOT NULL DEFAULT 0,
+  late_count INTEGER NOT NULL DEFAULT 0,
+  billed DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  collected DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  refunded DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  outstanding DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  late_fees DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (landlord_id, property_id, month)
+);
+
+-- Reports filter by landlord and a month range across properties
+CREATE INDEX idx_payment_rollups_landlord_month ON payment_monthly_rollups(landlord_id, month);
+
+-- =====================================================
+-- FUNCTION: Apply a statement's payment changes to the rollups
+-- New rows count +1 and old rows -1; groups that net to zero (e.g.
+-- updates that only touch notes) are skipped. Rows are upserted in key
+-- order so concurrent statements lock rollup rows consistently
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION apply_payment_rollup_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+  changes TEXT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    changes := 'SELECT 1 AS sign, * FROM new_rows';
+  ELSIF TG_OP = 'DELETE' THEN
+    changes := 'SELECT -1 AS sign, * FROM old_rows';
+  ELSE
+    changes := 'SELECT 1 AS sign, * FROM new_rows UNION ALL SELECT -1 AS sign, * FROM old_rows';
+  END IF;
+
+  EXECUTE format($sql$
+    INSERT INTO payment_monthly_rollups AS r (
+      landlord_id, property_id, month, payment_count, paid_count, late_count,
+      billed, collected, refunded, outstanding, late_fees
+    )
+    SELECT * FROM (
+      SELECT c.landlord_id, l.property_id, date_trunc('month', c.due_date)::date AS month,
+             SUM(c.sign) AS payment_count,
+             COALESCE(SUM(c.sign) FILTER (WHERE c.status = 'paid'), 0) AS paid_count,
+             COALESCE(SUM(c.sign) FILTER (WHERE c.status = 'late'), 0) AS late_count,
+             SUM(c.sign * c.amount) AS billed,
+             COALESCE(SUM(c.sign * c.amount) FILTER (WHERE c.status = 'paid'), 0) AS collected,
+             COALESCE(SUM(c.sign * c.amount) FILTER (WHERE c.status = 'refunded'), 0) AS refunded,
+             COALESCE(SUM(c.sign * (c.amount + COALESCE(c.late_fee, 0)))
+                      FILTER (WHERE c.status IN ('pending', 'late', 'failed')), 0) AS outstanding,
+             SUM(c.sign * COALESCE(c.late_fee, 0)) AS late_fees
+      FROM (%s) c
+      JOIN leases l ON l.id = c.lease_id
+      GROUP BY 1, 2, 3
+    ) d
+    WHERE (d.payment_count, d.paid_count, d.late_count, d.billed, d.collected, d.refunded, d.outstanding, d.late_fees)
+          <> (0, 0, 0, 0, 0, 0, 0, 0)
+    ORDER BY 1, 2, 3
+    ON CONFLICT (landlord_id, property_id, month) DO UPDATE SET
+      payment_count = r.payment_count + EXCLUDED.payment_count,
+      paid_count = r.paid_count + EXCLUDED.paid_count,
+      late_count = r.late_count + EXCLUDED.late_count,
+      billed = r.billed + EXCLUDED.billed,
+      collected = r.collected + EXCLUDED.collected,
+      refunded = r.refunded + EXCLUDED.refunded,
+      outstanding = r.outstanding + EXCLUDED.outstanding,
+      late_fees = r.late_fees + EXCLUDED.late_fees,
+      updated_at = NOW()
+  $sql$, changes);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER payments_rollup_insert AFTER INSERT ON payments
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_payment_rollup_changes();
+
+CREATE TRIGGER payments_rollup_update AFTER UPDATE ON payments
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_payment_rollup_changes();
+
+CREATE TRIGGER payments_rollup_delete AFTER DELETE ON payments
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_payment_rollup_changes();
+
+-- Landlords can read their own rollups; the backend maintains them
+ALTER TABLE payment_monthly_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Landlords can view own payment rollups"
+  ON payment_monthly_rollups FOR SELECT
+  USING (landlord_id = auth.uid());
+
+-- Comments
+COMMENT ON TABLE payment_monthly_rollups IS 'Payment totals per landlord, property and due month, maintained by trigger';
+COMMENT ON COLUMN payment_monthly_rollups.outstanding IS 'Amount plus late fees of pending, late and failed payments (arrears)';
+COMMENT ON COLUMN payment_monthly_rollups.collected IS 'Amount of paid payments; collection rate is collected / billed';
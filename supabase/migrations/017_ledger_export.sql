@@ -0,0 +1,15 @@
+-- =====================================================
+-- LEDGER EXPORT INDEXES
+-- CSV exports stream a user's payments / transactions in date order
+-- from a server-side cursor; these indexes return rows already ordered,
+-- so the first rows arrive without sorting the whole history
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_payments_landlord_payment_date ON payments(landlord_id, payment_date, id);
+CREATE INDEX IF NOT EXISTS idx_payments_tenant_payment_date ON payments(tenant_id, payment_date, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_landlord_date ON transactions(landlord_id, transaction_date, id);
+
+-- Comments
+COMMENT ON INDEX idx_payments_landlord_payment_date IS 'Ordered scan for GET /payments/export.csv (landlords)';
+COMMENT ON INDEX idx_payments_tenant_payment_date IS 'Ordered scan for GET /payments/export.csv (tenants)';
+COMMENT ON INDEX idx_transactions_landlord_date IS 'Ordered scan for GET /transactions/export.csv';
@@ -0,0 +1,23 @@
+-- =====================================================
+-- CONTRACTOR AGENT JOBS
+-- Maintenance requests with agent_status = 'pending' are claimed by the
+-- contractor agent worker (SKIP LOCKED), shopped for quotes and marked
+-- completed or failed; failed attempts are retried with backoff
+-- =====================================================
+
+ALTER TABLE maintenance_requests
+  ADD COLUMN IF NOT EXISTS agent_attempts INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS agent_next_attempt_at TIMESTAMP WITH TIME ZONE,
+  ADD COLUMN IF NOT EXISTS agent_duration_ms INTEGER,
+  ADD COLUMN IF NOT EXISTS agent_error TEXT;
+
+-- Claims look up queued and in-flight work per landlord, oldest first
+CREATE INDEX idx_maintenance_agent_queue
+  ON maintenance_requests(landlord_id, created_at)
+  WHERE agent_status IN ('pending', 'shopping');
+
+-- Comments
+COMMENT ON COLUMN maintenance_requests.agent_attempts IS 'Quote collection attempts, including the one in progress';
+COMMENT ON COLUMN maintenance_requests.agent_next_attempt_at IS 'Earliest retry of a pending request after a failed attempt';
+COMMENT ON COLUMN maintenance_requests.agent_duration_ms IS 'Wall time of the last quote collection attempt';
+COMMENT ON COLUMN maintenance_requests.agent_error IS 'Error of the last failed attempt';
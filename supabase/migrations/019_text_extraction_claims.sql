@@ -0,0 +1,12 @@
+-- =====================================================
+-- TEXT EXTRACTION CLAIMS
+-- The extraction worker marks a batch as claimed and commits before it
+-- extracts, so no row lock is held while files are parsed; claims of a
+-- worker that died are taken over once they are stale
+-- =====================================================
+
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS text_claimed_at TIMESTAMP WITH TIME ZONE;
+
+-- Comments
+COMMENT ON COLUMN documents.text_claimed_at IS 'When a text extraction worker claimed the document; NULL if unclaimed';